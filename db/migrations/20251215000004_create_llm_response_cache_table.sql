@@ -0,0 +1,34 @@
+-- llm_response_cacheテーブル作成（AI応答キャッシュ、PICKLES_RESPONSE_CACHE_SUPABASE=1で使用）
+create table public.llm_response_cache (
+    -- モデル・推論設定・プロンプト・分析タイプのSHA-256
+    key text primary key,
+
+    -- 生成条件
+    model text not null,
+    analysis_type text not null,
+
+    -- 応答
+    response text not null,
+    latency_seconds double precision,
+
+    -- タイムスタンプ
+    created_at timestamptz default now()
+);
+
+-- インデックス
+create index idx_llm_response_cache_created_at on public.llm_response_cache(created_at desc);
+
+-- RLS有効化
+alter table public.llm_response_cache enable row level security;
+
+-- ポリシー（service_roleのみアクセス可能）
+create policy "Service role only"
+  on public.llm_response_cache
+  for all
+  using (auth.role() = 'service_role')
+  with check (auth.role() = 'service_role');
+
+-- コメント
+comment on table public.llm_response_cache is 'AI応答キャッシュ（同一プロンプトの再実行時に再利用）';
+comment on column public.llm_response_cache.response is 'AI応答本文（Markdown形式）';
+comment on column public.llm_response_cache.latency_seconds is '応答生成にかかった秒数（キャッシュヒット時の短縮時間）';
@@ -1,9 +1,14 @@
+import io
 import os
+import codecs
 import datetime
 import re
-from typing import List, Dict, Optional
+from bisect import bisect_left
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
 from dotenv import load_dotenv
-from utils import logger, get_google_service, GoogleAPIError
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseDownload
+from utils import logger, get_google_service, GoogleAPIError, CredentialCache, CacheStore
 
 load_dotenv()
 
@@ -16,11 +21,59 @@ class GdocsInputError(Exception):
 class GdocsInput:
     """Google Docsからデータを取得するInputクラス"""
     
-    def __init__(self, service_account_key: str = None):
+    # アクセス拒否として扱うHTTPステータス（認証失敗・共有なし・存在しない）
+    ACCESS_DENIED_STATUSES = {401, 403, 404}
+    
+    # 日付ヘッダー（例: # 2025-01-15）
+    DATE_HEADER_PATTERN = re.compile(r'^#\s*(\d{4}-\d{2}-\d{2})')
+    
+    # パーサーが使うフィールドのみ取得する（スタイル・リスト・画像・ヘッダーなどは除外）
+    DOCUMENT_FIELDS = "body.content(paragraph.elements.textRun.content)"
+    # 更新確認に使うDrive APIのファイル情報（Docs APIのrevisionIdは編集者にしか返らないため、
+    # 閲覧者として共有されたサービスアカウントでも取得できるversionを使う）
+    VERSION_FIELDS = "name,version"
+    # 前回の段落数がない場合に文書の大きさを確認するフィールド（構造要素ごとの終了位置のみで、本文のJSONより十分小さい）
+    SIZE_PROBE_FIELDS = "body.content(endIndex)"
+    # 提案（サジェスト）を含まない表示で取得する
+    SUGGESTIONS_VIEW_MODE = "PREVIEW_WITHOUT_SUGGESTIONS"
+    
+    # 本文の取得方法
+    # auto: 段落数から自動選択（初回は構造要素数、以降は前回取得時の段落数）
+    # docs: Docs APIの構造化JSON / export: Drive APIのテキストエクスポート
+    BACKEND_AUTO = "auto"
+    BACKEND_DOCS = "docs"
+    BACKEND_EXPORT = "export"
+    BACKENDS = {BACKEND_AUTO, BACKEND_DOCS, BACKEND_EXPORT}
+    
+    # 自動選択時にテキストエクスポートを使う段落数（構造化JSONがテキストの数倍になる長い日誌）
+    EXPORT_AUTO_MIN_PARAGRAPHS = 2000
+    EXPORT_MIME_TYPE = "text/plain"
+    EXPORT_CHUNK_SIZE = 1024 * 1024
+    
+    # テキストエクスポートで箇条書きの段落の先頭に付く記号（ネストの深さに応じた字下げを含む）
+    EXPORT_LIST_MARKER_PATTERN = re.compile(r'^[ \t]*\* ')
+    
+    # 段落テキストと日付ヘッダー索引を保持する最大ドキュメント数
+    DOCUMENT_CACHE_MAX_ENTRIES = 100
+    
+    # 事前取得したバージョンを使う実行の識別子（マルチユーザー実行の親プロセスが設定し、
+    # 同じ実行の各ユーザーのmain.pyに環境変数として引き継がれる）
+    PREFETCH_RUN_ID_ENV = "PICKLES_GDOCS_PREFETCH_RUN_ID"
+    
+    def __init__(self, service_account_key: str = None, backend: str = None):
+        self._backend = backend or os.getenv("PICKLES_GDOCS_BACKEND", self.BACKEND_AUTO)
+        if self._backend not in self.BACKENDS:
+            raise GdocsInputError(f"未対応のGoogle Docs取得方法: {self._backend}")
+        
         # 統一されたGoogle APIサービスを使用
         try:
             self._google_service = get_google_service(service_account_key)
-            self._service = self._google_service.get_docs_service()
+            # アクセス確認専用のリクエストは送らず、実際の取得結果をドキュメント単位で記録する
+            self._credential_cache = CredentialCache("gdocs")
+            # バージョンが変わらない限り段落テキストと日付ヘッダー索引を再利用するためのキャッシュ
+            self._document_cache = CacheStore("gdocs_documents", max_entries=self.DOCUMENT_CACHE_MAX_ENTRIES)
+            # マルチユーザー実行時にバッチリクエストで事前取得したタイトル・バージョン
+            self._metadata_cache = CacheStore("gdocs_metadata", max_entries=self.DOCUMENT_CACHE_MAX_ENTRIES)
             logger.info("Google Docs統合サービス初期化完了", "gdocs")
         except GoogleAPIError as e:
             logger.error("Google Docs統合サービス初期化失敗", "gdocs", error=str(e))
@@ -33,26 +86,169 @@ class GdocsInput:
         cutoff_date = self._calculate_cutoff_date(days)
         logger.start("Google Docs文書取得", "gdocs", doc_id=doc_id[:12]+"...", days=days, cutoff_date=cutoff_date)
         
+        credential = self._google_service.credential_fingerprint
+        
         try:
-            # アクセステストを実行
-            if not self._google_service.test_docs_access(doc_id):
+            # アクセス拒否と記録済みのドキュメントはTTLの間APIを呼ばずにエラーとする
+            cached = self._credential_cache.get(credential, scope=doc_id)
+            if cached and not cached["valid"]:
+                logger.error("Google Docsアクセス拒否（キャッシュ）", "gdocs", error=cached["error"])
                 raise GdocsInputError(f"Google Docsへのアクセスが拒否されました。ドキュメント共有設定を確認してください: {doc_id}")
             
-            # ドキュメント内容を取得
-            document = self._service.documents().get(documentId=doc_id).execute()
-            logger.success("Google Docsアクセス成功", "gdocs", title=document.get('title', 'Unknown'))
+            # まずバージョンのみ取得し、未更新ならキャッシュ済みの段落を使う（認証・共有設定の確認を兼ねる）
+            cache_key = f"{credential}:{doc_id}"
+            cached_document = self._document_cache.get(cache_key)
+            metadata = self._pop_prefetched_metadata(cache_key) or self._get_metadata(doc_id, cached_document)
             
-            # ドキュメントをパースして日誌エントリを抽出
-            entries = self._parse_document_content(document, cutoff_date)
+            if not cached:
+                self._credential_cache.mark_valid(credential, scope=doc_id)
+            logger.success("Google Docsアクセス成功", "gdocs", title=metadata.get('title', 'Unknown'))
+            
+            if self._is_cached_version(cached_document, metadata):
+                logger.info("ドキュメント未更新のためキャッシュを使用", "gdocs",
+                           paragraphs=len(cached_document["paragraphs"]))
+                paragraphs = cached_document["paragraphs"]
+                header_index = [tuple(header) for header in cached_document["header_index"]]
+            else:
+                # 本文テキストを取得して段落と日付ヘッダー索引を作成
+                paragraphs = self._fetch_paragraphs(doc_id, self._select_backend(cached_document, metadata))
+                header_index = self._store_paragraphs(paragraphs, metadata.get('version'), cache_key)
+            
+            # カットオフ以降の末尾部分のみパースして日誌エントリを抽出
+            entries = self._parse_from_tail(paragraphs, header_index, cutoff_date)
             logger.complete("Google Docs文書取得", "gdocs", count=len(entries))
             
             return entries
             
+        except GdocsInputError:
+            raise
         except GoogleAPIError as e:
             raise GdocsInputError(f"Google API統合エラー: {e}")
         except Exception as e:
             raise GdocsInputError(f"Google Docsデータ取得エラー: {e}")
     
+    def prefetch_documents(self, doc_urls: List[str], run_id: str) -> Dict[str, int]:
+        """複数ユーザーのGoogle Docsをバッチリクエストでまとめて事前取得
+        
+        Drive APIのバージョンを一括取得して事前取得キャッシュに保存し、更新されたドキュメントは
+        本文も一括取得して段落キャッシュに保存する（バージョンを取得できない場合は実行IDで保存する）。
+        以降のfetch_gdocs_documentsは環境変数PICKLES_GDOCS_PREFETCH_RUN_IDがrun_idと一致する間
+        （同じ実行の間）だけ事前取得した結果を使うため、ユーザーごとのAPI呼び出しが不要になる。
+        アクセス拒否はドキュメント単位で記録し、その他の失敗は通常の取得に任せる。
+        
+        Args:
+            doc_urls: 事前取得するGoogle DocsのURL
+            run_id: 事前取得した結果を使う実行の識別子
+        
+        Returns:
+            事前取得の結果件数（prefetched, refreshed, denied, failed）
+        """
+        credential = self._google_service.credential_fingerprint
+        doc_ids = []
+        for doc_url in doc_urls:
+            try:
+                doc_ids.append(self._extract_doc_id_from_url(doc_url))
+            except GdocsInputError as e:
+                logger.warning("事前取得対象外のURL", "gdocs", error=str(e))
+        
+        summary = {"prefetched": 0, "refreshed": 0, "denied": 0, "failed": 0}
+        if not doc_ids:
+            return summary
+        
+        logger.start("Google Docs事前取得", "gdocs", documents=len(doc_ids))
+        cached_documents = {doc_id: self._document_cache.get(f"{credential}:{doc_id}") for doc_id in doc_ids}
+        
+        files = self._google_service.batch_get_files(doc_ids, fields=self.VERSION_FIELDS, supportsAllDrives=True)
+        # 自動選択で前回の段落数がないドキュメントは文書の大きさもまとめて確認
+        probe_ids = [doc_id for doc_id, result in files.items()
+                     if result["error"] is None and self._needs_size_probe(cached_documents[doc_id])]
+        probes = self._google_service.batch_get_documents(probe_ids, fields=self.SIZE_PROBE_FIELDS) if probe_ids else {}
+        
+        stale_versions = {}
+        for doc_id, result in files.items():
+            if not self._record_prefetch_result(doc_id, result, summary):
+                continue
+            cache_key = f"{credential}:{doc_id}"
+            metadata = self._summarize_file(result["file"])
+            # バージョンを取得できない場合は、取得した本文をこの実行の間だけ使う
+            metadata["version"] = metadata["version"] or f"run:{run_id}"
+            probe = probes.get(doc_id)
+            if probe and probe["error"] is None:
+                metadata["structural_element_count"] = self._count_structural_elements(probe["document"])
+            self._metadata_cache.set(cache_key, {"run_id": run_id, "metadata": metadata})
+            summary["prefetched"] += 1
+            
+            # 本文の再取得が必要なドキュメント（テキストエクスポートを使う長い日誌は個別に取得）
+            cached_document = cached_documents[doc_id]
+            if self._is_cached_version(cached_document, metadata):
+                continue
+            if self._select_backend(cached_document, metadata) == self.BACKEND_DOCS:
+                stale_versions[doc_id] = metadata["version"]
+        
+        if stale_versions:
+            documents = self._google_service.batch_get_documents(list(stale_versions), fields=self.DOCUMENT_FIELDS,
+                                                                 suggestionsViewMode=self.SUGGESTIONS_VIEW_MODE)
+            for doc_id, result in documents.items():
+                if not self._record_prefetch_result(doc_id, result, summary):
+                    continue
+                paragraphs = [text for text in self._extract_paragraph_texts(result["document"]) if text.strip()]
+                self._store_paragraphs(paragraphs, stale_versions[doc_id], f"{credential}:{doc_id}")
+                summary["refreshed"] += 1
+        
+        logger.complete("Google Docs事前取得", "gdocs", **summary)
+        return summary
+    
+    def _record_prefetch_result(self, doc_id: str, result: Dict, summary: Dict[str, int]) -> bool:
+        """バッチ取得の結果を記録（成功した場合はTrue）"""
+        credential = self._google_service.credential_fingerprint
+        error = result["error"]
+        if error is None:
+            self._credential_cache.mark_valid(credential, scope=doc_id)
+            return True
+        
+        if isinstance(error, HttpError) and error.resp.status in self.ACCESS_DENIED_STATUSES:
+            self._credential_cache.mark_invalid(credential, str(error), scope=doc_id)
+            summary["denied"] += 1
+        else:
+            summary["failed"] += 1
+        logger.warning("Google Docs事前取得失敗", "gdocs", doc_id=doc_id[:12]+"...", error=str(error))
+        return False
+    
+    def _pop_prefetched_metadata(self, cache_key: str) -> Optional[dict]:
+        """同じ実行で事前取得したタイトル・バージョンを取得（再実行時に最新を取得するよう一度使ったら削除）"""
+        run_id = os.getenv(self.PREFETCH_RUN_ID_ENV)
+        prefetched = self._metadata_cache.get(cache_key) if run_id else None
+        if not prefetched:
+            return None
+        
+        self._metadata_cache.delete(cache_key)
+        if prefetched["run_id"] != run_id:
+            # 以前の実行で事前取得したまま使われなかった結果は使わない
+            return None
+        logger.info("事前取得したバージョンを使用", "gdocs")
+        return prefetched["metadata"]
+    
+    def _get_document(self, doc_id: str, **params) -> dict:
+        """Docs APIでドキュメントを取得（アクセス拒否は記録してGdocsInputErrorに変換）"""
+        return self._execute(doc_id, self._google_service.get_docs_service().documents().get(documentId=doc_id, **params))
+    
+    def _get_file(self, doc_id: str, **params) -> dict:
+        """Drive APIでファイル情報を取得（アクセス拒否は記録してGdocsInputErrorに変換）"""
+        return self._execute(doc_id, self._google_service.get_drive_service().files().get(
+            fileId=doc_id, supportsAllDrives=True, **params))
+    
+    def _execute(self, doc_id: str, request) -> dict:
+        """APIリクエストを実行（アクセス拒否は記録してGdocsInputErrorに変換）"""
+        try:
+            return request.execute()
+        except HttpError as e:
+            if e.resp.status not in self.ACCESS_DENIED_STATUSES:
+                raise
+            credential = self._google_service.credential_fingerprint
+            self._credential_cache.mark_invalid(credential, str(e), scope=doc_id)
+            logger.warning("Google Docsアクセス拒否", "gdocs", status=e.resp.status, error=str(e))
+            raise GdocsInputError(f"Google Docsへのアクセスが拒否されました。ドキュメント共有設定を確認してください: {doc_id}")
+    
     def _extract_doc_id_from_url(self, doc_url: str) -> str:
         """Google Docs URLからドキュメントIDを抽出"""
         # https://docs.google.com/document/d/DOCUMENT_ID/edit... の形式
@@ -67,43 +263,188 @@ class GdocsInput:
     
     def _parse_document_content(self, document: dict, cutoff_date: str) -> List[Dict[str, str]]:
         """ドキュメント内容をパースして日誌エントリを抽出"""
-        content = document.get('body', {}).get('content', [])
-        entries = []
-        current_entry = None
+        paragraphs = [text for text in self._extract_paragraph_texts(document) if text.strip()]
+        return self._parse_from_tail(paragraphs, self._build_header_index(paragraphs), cutoff_date)
+    
+    def _get_metadata(self, doc_id: str, cached_document: Optional[dict]) -> dict:
+        """更新確認用のタイトル・バージョンを取得（自動選択で前回の段落数がない場合は文書の大きさも確認）"""
+        metadata = self._summarize_file(self._get_file(doc_id, fields=self.VERSION_FIELDS))
+        if self._needs_size_probe(cached_document):
+            document = self._get_document(doc_id, fields=self.SIZE_PROBE_FIELDS)
+            metadata["structural_element_count"] = self._count_structural_elements(document)
+        return metadata
+    
+    def _needs_size_probe(self, cached_document: Optional[dict]) -> bool:
+        """本文の取得方法を決めるために文書の大きさの確認が必要か"""
+        return self._backend == self.BACKEND_AUTO and not cached_document
+    
+    @staticmethod
+    def _summarize_file(file: dict) -> dict:
+        """Drive APIのファイル情報からタイトル・バージョンを抽出"""
+        return {"title": file.get("name"), "version": file.get("version")}
+    
+    @staticmethod
+    def _count_structural_elements(document: dict) -> int:
+        """文書の構造要素（段落・表・セクション区切り）の数"""
+        return len(document.get("body", {}).get("content", []))
+    
+    @staticmethod
+    def _is_cached_version(cached_document: Optional[dict], metadata: dict) -> bool:
+        """キャッシュ済みの段落が最新のバージョンのものか"""
+        return bool(cached_document and metadata.get("version")
+                    and cached_document.get("version") == metadata["version"])
+    
+    def _select_backend(self, cached_document: Optional[dict], metadata: Optional[dict] = None) -> str:
+        """本文の取得方法を決定
+        
+        自動選択時は前回取得時の段落数で判断し、初回は更新確認時に取得した構造要素数
+        （段落・表・セクション区切りの数で、段落数の目安）で判断する。
+        """
+        backend = self._backend
+        if backend == self.BACKEND_AUTO:
+            if cached_document:
+                paragraph_count = len(cached_document["paragraphs"])
+            else:
+                paragraph_count = (metadata or {}).get("structural_element_count", 0)
+            backend = self.BACKEND_EXPORT if paragraph_count >= self.EXPORT_AUTO_MIN_PARAGRAPHS else self.BACKEND_DOCS
+        
+        logger.info("Google Docs取得方法", "gdocs", backend=backend)
+        return backend
+    
+    def _fetch_paragraphs(self, doc_id: str, backend: str) -> List[str]:
+        """空でない段落テキストを取得（テキストエクスポートに失敗した場合はDocs APIで取得）"""
+        if backend == self.BACKEND_EXPORT:
+            try:
+                return [text for text in self._iter_exported_paragraphs(doc_id) if text.strip()]
+            except HttpError as e:
+                logger.warning("テキストエクスポート失敗（Docs APIで取得）", "gdocs", 
+                              status=e.resp.status, error=str(e))
+        
+        document = self._get_document(doc_id, fields=self.DOCUMENT_FIELDS,
+                                      suggestionsViewMode=self.SUGGESTIONS_VIEW_MODE)
+        return [text for text in self._extract_paragraph_texts(document) if text.strip()]
+    
+    def _iter_exported_paragraphs(self, doc_id: str) -> Iterator[str]:
+        """Drive APIのテキストエクスポートをチャンク単位で受信し、1行を1段落として返す
         
-        for element in content:
+        Docs APIの段落テキストと揃えるため、BOMと改行コード（CRLF）、箇条書きの「* 」を除き
+        各行末に改行を付ける。段落内のソフト改行（Shift+Enter）はエクスポートでは改行になるため
+        別の段落として扱う。番号付きリストの番号はエクスポートにのみ含まれ、Docs APIとの差分として残る。
+        """
+        request = self._google_service.get_drive_service().files().export_media(
+            fileId=doc_id, mimeType=self.EXPORT_MIME_TYPE
+        )
+        buffer = io.BytesIO()
+        downloader = MediaIoBaseDownload(buffer, request, chunksize=self.EXPORT_CHUNK_SIZE)
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        pending = ""
+        done = False
+        
+        while not done:
+            _, done = downloader.next_chunk()
+            pending += decoder.decode(buffer.getvalue(), final=done)
+            buffer.seek(0)
+            buffer.truncate()
+            
+            # 最後の行は次のチャンクに続く可能性があるため持ち越す
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield self._normalize_exported_line(line)
+        
+        if pending:
+            yield self._normalize_exported_line(pending)
+    
+    def _normalize_exported_line(self, line: str) -> str:
+        """エクスポートの1行をDocs APIの段落テキストと同じ形式に変換"""
+        return self.EXPORT_LIST_MARKER_PATTERN.sub("", line.rstrip("\r"), count=1) + "\n"
+    
+    def _store_paragraphs(self, paragraphs: List[str], version: Optional[str],
+                          cache_key: str) -> List[Tuple[int, str]]:
+        """日付ヘッダー索引を作成し、段落テキストとともにバージョンでキャッシュ"""
+        header_index = self._build_header_index(paragraphs)
+        
+        if version:
+            self._document_cache.set(cache_key, {
+                "version": version,
+                "paragraphs": paragraphs,
+                "header_index": header_index
+            })
+        
+        return header_index
+    
+    def _build_header_index(self, paragraphs: List[str]) -> List[Tuple[int, str]]:
+        """日付ヘッダー段落の位置と日付の一覧を作成"""
+        header_index = []
+        for position, text_content in enumerate(paragraphs):
+            stripped = text_content.lstrip()
+            if not stripped.startswith('#'):
+                continue
+            date_match = self.DATE_HEADER_PATTERN.match(stripped)
+            if date_match:
+                header_index.append((position, date_match.group(1)))
+        return header_index
+    
+    def _parse_from_tail(self, paragraphs: List[str], header_index: List[Tuple[int, str]],
+                         cutoff_date: str) -> List[Dict[str, str]]:
+        """カットオフ日以降の最初の日付ヘッダーから末尾までをパース
+        
+        日誌は末尾に追記されていく前提で、ヘッダーの日付が昇順に並んでいる場合のみ
+        末尾側から読み始める。並びが崩れている場合は全体を走査する。
+        """
+        header_dates = [entry_date for _, entry_date in header_index]
+        is_ordered = all(a <= b for a, b in zip(header_dates, header_dates[1:]))
+        
+        if not is_ordered:
+            logger.info("日付ヘッダーが昇順でないため全体をパース", "gdocs", headers=len(header_index))
+            return self._parse_paragraphs(paragraphs, cutoff_date)
+        
+        first = bisect_left(header_dates, cutoff_date)
+        start = header_index[first][0] if first < len(header_index) else len(paragraphs)
+        logger.debug("末尾からパース", "gdocs", start=start, paragraphs=len(paragraphs))
+        
+        return self._parse_paragraphs(paragraphs[start:], cutoff_date)
+    
+    def _extract_paragraph_texts(self, document: dict) -> Iterator[str]:
+        """ドキュメント本文の段落テキストを先頭から順に返す"""
+        for element in document.get('body', {}).get('content', []):
             if 'paragraph' in element:
-                paragraph = element['paragraph']
-                text_content = self._extract_paragraph_text(paragraph)
-                
-                if not text_content.strip():
-                    continue
-                
-                # 日付ヘッダーを検出（例: # 2025-01-15）
-                date_match = re.match(r'^#\s*(\d{4}-\d{2}-\d{2})', text_content.strip())
-                
-                if date_match:
-                    # 前のエントリを保存
-                    if current_entry and self._is_recent_entry(current_entry['date'], cutoff_date):
-                        entries.append(current_entry)
-                    
-                    # 新しいエントリを開始
-                    entry_date = date_match.group(1)
-                    current_entry = {
-                        'date': entry_date,
-                        'title': f"Journal Entry {entry_date}",
-                        'text': ""
-                    }
+                yield self._extract_paragraph_text(element['paragraph'])
+    
+    def _parse_paragraphs(self, paragraphs: Iterable[str], cutoff_date: str) -> List[Dict[str, str]]:
+        """段落テキストを1回走査して、カットオフ日以降の日誌エントリを抽出
+        
+        カットオフ日より前のエントリは本文を蓄積せずに読み飛ばす。
+        """
+        cutoff = datetime.date.fromisoformat(cutoff_date)
+        entries = []
+        current_date = None  # 抽出中のエントリの日付（期間外のエントリを読み飛ばし中はNone）
+        current_parts = []
+        
+        for text_content in paragraphs:
+            stripped = text_content.strip()
+            if not stripped:
+                continue
+            
+            # 日付ヘッダーを検出（例: # 2025-01-15）
+            date_match = self.DATE_HEADER_PATTERN.match(stripped)
+            
+            if date_match:
+                # 前のエントリを保存
+                if current_date:
+                    entries.append(self._build_entry(current_date, current_parts))
                 
-                elif current_entry:
-                    # 現在のエントリにテキストを追加
-                    if current_entry['text']:
-                        current_entry['text'] += "\n"
-                    current_entry['text'] += text_content
+                # 新しいエントリを開始
+                entry_date = date_match.group(1)
+                current_date = entry_date if self._is_recent_entry(entry_date, cutoff) else None
+                current_parts = []
+            
+            elif current_date:
+                # 現在のエントリにテキストを追加
+                current_parts.append(text_content)
         
         # 最後のエントリを保存
-        if current_entry and self._is_recent_entry(current_entry['date'], cutoff_date):
-            entries.append(current_entry)
+        if current_date:
+            entries.append(self._build_entry(current_date, current_parts))
         
         # 日付の新しい順でソート
         entries.sort(key=lambda x: x['date'], reverse=True)
@@ -114,6 +455,15 @@ class GdocsInput:
         
         return entries
     
+    @staticmethod
+    def _build_entry(entry_date: str, parts: List[str]) -> Dict[str, str]:
+        """日付と段落テキストから日誌エントリを作成"""
+        return {
+            'date': entry_date,
+            'title': f"Journal Entry {entry_date}",
+            'text': "\n".join(parts)
+        }
+    
     def _extract_paragraph_text(self, paragraph: dict) -> str:
         """段落からテキストを抽出"""
         elements = paragraph.get('elements', [])
@@ -127,12 +477,10 @@ class GdocsInput:
         
         return ''.join(text_parts)
     
-    def _is_recent_entry(self, entry_date: str, cutoff_date: str) -> bool:
+    def _is_recent_entry(self, entry_date: str, cutoff: datetime.date) -> bool:
         """エントリが指定期間内かどうかを判定"""
         try:
-            entry_datetime = datetime.datetime.strptime(entry_date, '%Y-%m-%d')
-            cutoff_datetime = datetime.datetime.strptime(cutoff_date, '%Y-%m-%d')
-            return entry_datetime >= cutoff_datetime
+            return datetime.date.fromisoformat(entry_date) >= cutoff
         except ValueError as e:
             logger.warning("日付パースエラー", "gdocs", 
                          entry_date=entry_date, error=str(e))
@@ -0,0 +1,146 @@
+"""レート制限とリトライ付きのNotion APIクライアントラッパー"""
+import time
+import random
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+import httpx
+from notion_client.errors import APIErrorCode, HTTPResponseError, RequestTimeoutError
+from utils import logger, fingerprint, TokenBucket
+
+
+class NotionRetryError(Exception):
+    """リトライ上限に達したNotion APIエラー"""
+    pass
+
+
+def is_object_not_found(error: Exception) -> bool:
+    """削除済み・共有解除などで対象オブジェクトが見つからないエラーか判定"""
+    return getattr(error, "code", None) == APIErrorCode.ObjectNotFound
+
+
+def is_unauthorized(error: Exception) -> bool:
+    """APIキーが無効・失効している認証エラーか判定"""
+    return getattr(error, "code", None) == APIErrorCode.Unauthorized
+
+
+def is_validation_error(error: Exception) -> bool:
+    """存在しないプロパティの指定など、リクエスト内容が不正なエラーか判定"""
+    return getattr(error, "code", None) == APIErrorCode.ValidationError
+
+
+# 同じAPIキーを使うすべてのクライアント・スレッドで共有するトークンバケット
+_token_buckets: Dict[str, TokenBucket] = {}
+_token_buckets_lock = threading.Lock()
+
+
+def _get_shared_bucket(api_key: str, rate: float) -> TokenBucket:
+    """APIキーごとに共有されるトークンバケットを取得"""
+    key = fingerprint(api_key)
+    with _token_buckets_lock:
+        if key not in _token_buckets:
+            _token_buckets[key] = TokenBucket(rate)
+        return _token_buckets[key]
+
+
+class RateLimitedNotionClient:
+    """notion_client.Clientの呼び出しにレート制限とリトライを適用するラッパー
+
+    責務:
+    - APIキー単位で共有するトークンバケットによる流量制御
+    - 429・5xx・タイムアウト時のジッター付き指数バックオフ（Retry-Afterを優先）
+    - スロットル・リトライ・待機時間の集計
+    """
+
+    # Notion APIの平均レート制限（3リクエスト/秒）
+    DEFAULT_RATE = 3.0
+
+    MAX_RETRIES = 5
+    BASE_DELAY = 1.0
+    MAX_DELAY = 30.0
+    RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, client: Any, api_key: str, rate: float = None):
+        self._bucket = _get_shared_bucket(api_key, rate or self.DEFAULT_RATE)
+        self._stats = {"requests": 0, "throttled": 0, "retries": 0, "wait_seconds": 0.0}
+        self._stats_lock = threading.Lock()
+
+        # NotionInputが使用するエンドポイントのみを公開
+        self.search = self._wrap(client.search)
+        self.users = SimpleNamespace(me=self._wrap(client.users.me))
+        self.databases = SimpleNamespace(
+            query=self._wrap(client.databases.query),
+            retrieve=self._wrap(client.databases.retrieve)
+        )
+        self.blocks = SimpleNamespace(
+            children=SimpleNamespace(list=self._wrap(client.blocks.children.list))
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """リクエスト統計を取得"""
+        with self._stats_lock:
+            return {**self._stats, "wait_seconds": round(self._stats["wait_seconds"], 2)}
+
+    def _wrap(self, func: Callable) -> Callable:
+        def call(*args, **kwargs):
+            return self._call(func, *args, **kwargs)
+        return call
+
+    def _call(self, func: Callable, *args, **kwargs) -> Any:
+        """レート制限とリトライを適用してAPIを呼び出す"""
+        for attempt in range(self.MAX_RETRIES + 1):
+            self._record(wait_seconds=self._bucket.acquire(), requests=1)
+
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not self._is_retryable(e):
+                    raise
+                if attempt == self.MAX_RETRIES:
+                    logger.error("Notion APIリトライ上限到達", "notion",
+                                error_type=type(e).__name__, attempts=attempt + 1)
+                    raise NotionRetryError(f"Notion APIリトライ上限到達: {e}") from e
+
+                self._wait_before_retry(e, attempt)
+
+    def _wait_before_retry(self, error: Exception, attempt: int):
+        """エラー種別に応じてリトライ前に待機"""
+        delay = self._backoff_delay(attempt)
+        status = getattr(error, "status", None)
+
+        if status == 429:
+            # スロットル時は共有バケットを止め、同じキーを使う全スレッドを待機させる
+            delay = self._retry_after(error) or delay
+            self._bucket.pause(delay)
+            self._record(throttled=1, retries=1)
+        else:
+            time.sleep(delay)
+            self._record(retries=1, wait_seconds=delay)
+
+        logger.warning("Notion APIリトライ", "notion",
+                      status=status or type(error).__name__,
+                      attempt=attempt + 1, delay=round(delay, 2))
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """フルジッター付き指数バックオフの待機秒数"""
+        return random.uniform(0, min(self.MAX_DELAY, self.BASE_DELAY * (2 ** attempt)))
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """リトライ対象のエラーか判定"""
+        if isinstance(error, HTTPResponseError):
+            return error.status in self.RETRYABLE_STATUSES
+        return isinstance(error, (RequestTimeoutError, httpx.TransportError))
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Retry-Afterヘッダーの秒数を取得"""
+        headers = getattr(error, "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+    def _record(self, **increments):
+        with self._stats_lock:
+            for name, value in increments.items():
+                self._stats[name] += value
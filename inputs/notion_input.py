@@ -1,10 +1,16 @@
 import os
 import datetime
-from typing import List, Dict, Optional
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+from typing import List, Dict, Optional, Callable, Any, Iterable, Iterator, Tuple
 from notion_client import Client
 from dotenv import load_dotenv
-from utils import logger
-from models.user import mask_name
+from utils import logger, CacheStore, CredentialCache, fingerprint
+from .notion_api import (
+    RateLimitedNotionClient, NotionRetryError, is_object_not_found, is_unauthorized, is_validation_error
+)
 
 load_dotenv()
 
@@ -17,8 +23,66 @@ class NotionInputError(Exception):
 class NotionInput:
     """Notionからデータを取得するInputクラス"""
     
-    def __init__(self, api_key: str = None):
+    # ページ本文取得の既定並列数（Notion APIの平均3リクエスト/秒の制限に合わせる）
+    DEFAULT_MAX_WORKERS = 3
+    
+    # ブロックツリー走査の上限（ネストの深さ・1ページあたりの総ブロック数）
+    BLOCK_TREE_MAX_DEPTH = 8
+    BLOCK_TREE_MAX_BLOCKS = 3000
+    
+    # 子ブロックを持っていても別ページとして扱うため走査しないブロック型
+    NON_RECURSIVE_BLOCK_TYPES = {"child_page", "child_database"}
+    
+    # ユーザーごとのページキャッシュに保持する最大ページ数
+    PAGE_CACHE_MAX_ENTRIES = 5000
+    
+    # ページ検索で確認する最大ページ数
+    SEARCH_MAX_TOTAL_PAGES = 500
+    # 最終編集日がカットオフより前のページに到達した後、日付プロパティが対象期間のページを探し続ける連続ページ数
+    SEARCH_MAX_CONSECUTIVE_OLD_PAGES = 50
+    
+    # データベースエントリ本文の取得方法
+    # auto: 初回実行時のサンプルから判定 / properties: プロパティに本文があればページ本体を取得しない / blocks: 常にページ本体も取得
+    CONTENT_MODE_AUTO = "auto"
+    CONTENT_MODE_PROPERTIES = "properties"
+    CONTENT_MODE_BLOCKS = "blocks"
+    CONTENT_MODES = {CONTENT_MODE_AUTO, CONTENT_MODE_PROPERTIES, CONTENT_MODE_BLOCKS}
+    
+    # 期間フィルタに使う日付プロパティの優先候補（該当がなければ最初の日付型プロパティ）
+    DATE_PROPERTY_CANDIDATES = ("Date", "date", "日付")
+    
+    # データベーススキーマを再取得するまでの秒数
+    SCHEMA_CACHE_TTL = 24 * 60 * 60
+    # データベースの検索結果を再検索するまでの秒数（新しく作られた・共有・名前変更されたデータベースを反映する）
+    DATABASE_CACHE_TTL = 24 * 60 * 60
+    
+    # タイトル・本文の抽出に使うプロパティ型（これ以外はfilter_propertiesで取得対象から外す）
+    EXTRACTED_PROPERTY_TYPES = {
+        "title", "rich_text", "select", "multi_select", "url",
+        "email", "phone_number", "number", "checkbox"
+    }
+    
+    # 複数データベースモードで同時に取得するデータベース数と、日誌と判定するタイトルのキーワード
+    MULTI_DATABASE_MAX_PARALLEL = 3
+    JOURNAL_TITLE_KEYWORDS = ("journal", "diary", "日記", "日誌", "ジャーナル")
+    
+    # プロパティのみモードと判定するのに必要な最小エントリ数と、判定結果を再確認するまでの秒数
+    CONTENT_MODE_SAMPLE_SIZE = 5
+    CONTENT_MODE_TTL = 7 * 24 * 60 * 60
+    
+    def __init__(self, api_key: str = None, max_workers: int = None, content_mode: str = None,
+                 multi_database: bool = None):
         self._api_key = api_key or os.getenv("NOTION_API_KEY")
+        self._max_workers = max_workers or int(os.getenv("PICKLES_NOTION_MAX_WORKERS", self.DEFAULT_MAX_WORKERS))
+        
+        self._content_mode = content_mode or os.getenv("PICKLES_NOTION_CONTENT_MODE", self.CONTENT_MODE_AUTO)
+        if self._content_mode not in self.CONTENT_MODES:
+            raise NotionInputError(f"未対応の本文取得モード: {self._content_mode}")
+        
+        # 年ごとなど複数のデータベースに分かれた日誌をまとめて取得するか
+        if multi_database is None:
+            multi_database = os.getenv("PICKLES_NOTION_MULTI_DATABASE") == "1"
+        self._multi_database = multi_database
         
         # デバッグ: APIキーの状態を確認
         if self._api_key:
@@ -27,18 +91,48 @@ class NotionInput:
         else:
             logger.warning("Notion APIキーが設定されていません", "notion")
         
+        # ユーザー単位のキャッシュキー（APIキーそのものは保存しない）
+        self._cache_key = fingerprint(self._api_key)
+        
+        # last_edited_timeが変わっていないページは本文を再取得しないためのキャッシュ
+        self._page_cache = CacheStore(f"notion_pages:{self._cache_key}",
+                                      max_entries=self.PAGE_CACHE_MAX_ENTRIES)
+        # 毎回のデータベース検索を省き、選択結果を実行間で固定するためのキャッシュ
+        self._database_cache = CacheStore("notion_databases")
+        # データベースごとに判定した本文取得方法を保持するキャッシュ
+        self._content_mode_cache = CacheStore("notion_content_modes")
+        # データベースごとの期間フィルタ用プロパティを保持するキャッシュ
+        self._schema_cache = CacheStore("notion_schemas")
+        self._content_samples: Dict[str, List[Tuple[bool, bool]]] = {}
+        self._content_samples_lock = threading.Lock()
+        self._cache_stats = {"hits": 0, "misses": 0}
+        self._cache_stats_lock = threading.Lock()
+        
         # テストモードの場合はモックを使用
         if os.getenv('PICKLES_TEST_MODE') == '1':
             from tests.fixtures.mock_handlers import mock_notion_api
-            self._client = mock_notion_api()(auth=self._api_key)
+            raw_client = mock_notion_api()(auth=self._api_key)
         else:
-            self._client = Client(auth=self._api_key)
+            raw_client = Client(auth=self._api_key)
         
-        self._check_api_connection()
+        # すべてのAPI呼び出しにレート制限とリトライを適用
+        self._client = RateLimitedNotionClient(raw_client, self._api_key)
+        
+        # 接続確認専用のリクエストは送らず、最初の実リクエストの成否で認証情報を検証する
+        self._credential_cache = CredentialCache("notion")
+        self._credential_verified = self._check_cached_credential()
     
     
     def fetch_notion_documents(self, days: int = 7) -> List[Dict[str, str]]:
         """Notionから最近のドキュメントを取得（データベース優先、フォールバック付き）"""
+        return list(self.iter_notion_documents(days))
+    
+    def iter_notion_documents(self, days: int = 7) -> Iterator[Dict[str, str]]:
+        """Notionから最近のドキュメントを順に返す（データベース優先、フォールバック付き）
+        
+        ページ検索にフォールバックした場合は、検索結果1ページ分と本文取得中のページだけを保持し、
+        本文を取得できた文書から検索結果の順に返す。
+        """
         cutoff_date = self._calculate_cutoff_date(days)
         logger.start("Notion文書取得", "notion", days=days, cutoff_date=cutoff_date)
         
@@ -47,109 +141,395 @@ class NotionInput:
             database_entries = self._try_fetch_database_entries(cutoff_date)
             if database_entries:
                 logger.complete("データベースエントリ取得", "notion", count=len(database_entries))
-                return database_entries
+                self._mark_credential_verified()
+                self._log_fetch_stats()
+                yield from database_entries
+                return
             
             # データベースが見つからない場合は通常の検索を実行
             logger.info("データベース未発見、ページ検索にフォールバック", "notion")
-            page_results = self._fetch_page_search_results(cutoff_date)
-            logger.complete("ページ検索結果取得", "notion", count=len(page_results))
-            return page_results
+            document_count = 0
+            for document in self._iter_page_search_results(cutoff_date):
+                self._mark_credential_verified()
+                document_count += 1
+                yield document
+            
+            logger.complete("ページ検索結果取得", "notion", count=document_count)
+            self._mark_credential_verified()
+            self._log_fetch_stats()
             
         except Exception as e:
+            if is_unauthorized(e):
+                # 無効なAPIキーはTTLの間APIを呼ばずにエラーとする
+                self._credential_cache.mark_invalid(self._api_key, str(e))
+                logger.error("Notion API接続エラー", "notion", error=str(e))
+                raise NotionInputError(f"Notion API接続エラー: {e}")
             raise NotionInputError(f"データ取得エラー: {e}")
     
+    def _check_cached_credential(self) -> bool:
+        """キャッシュ済みの検証結果を確認（無効と記録済みの場合はAPIを呼ばずにエラー）"""
+        result = self._credential_cache.get(self._api_key)
+        if result is None:
+            return False
+        
+        if not result["valid"]:
+            logger.error("Notion API接続エラー（キャッシュ）", "notion", error=result["error"])
+            raise NotionInputError(f"Notion API接続エラー: {result['error']}")
+        
+        logger.success("Notion API接続成功", "notion", cached=True)
+        return True
+    
+    def _mark_credential_verified(self):
+        """実リクエストの成功をもって認証情報を有効として記録"""
+        if self._credential_verified:
+            return
+        self._credential_verified = True
+        self._credential_cache.mark_valid(self._api_key)
+        logger.success("Notion API接続成功", "notion")
+    
     def _try_fetch_database_entries(self, cutoff_date: str) -> List[Dict[str, str]]:
         """データベースからエントリ取得を試行"""
         try:
-            # 利用可能なデータベースを検索
-            logger.debug("データベース検索開始", "notion")
-            search_response = self._client.search(
-                filter={"value": "database", "property": "object"}
-            )
-            
-            databases = search_response.get("results", [])
-            logger.info("データベース検索完了", "notion", found_count=len(databases))
-            
+            databases = self._resolve_databases()
             if not databases:
-                logger.warning("データベースが見つからない", "notion")
-                return []
-            
-            # 最初に見つかったデータベースからエントリを取得
-            database_id = databases[0].get("id")
-            database_title = databases[0].get("title", [])
-            db_name = database_title[0].get("plain_text", "Unknown") if database_title else "Unknown"
-            logger.info("データベース選択", "notion", db_name=db_name, db_id=database_id[:12]+"...")
-            
-            if not database_id:
                 return []
             
-            # データベースからエントリを取得
-            return self._fetch_database_entries(database_id, cutoff_date)
+            try:
+                return self._fetch_entries_from_databases(databases, cutoff_date)
+            except Exception as e:
+                # キャッシュ済みのデータベースが削除・共有解除された場合のみ再検索する
+                if not (databases[0]["cached"] and is_object_not_found(e)):
+                    raise
+                logger.warning("キャッシュ済みデータベースが見つからないため再検索", "notion", error=str(e))
+                self.invalidate_database_cache()
+                databases = self._resolve_databases()
+                return self._fetch_entries_from_databases(databases, cutoff_date) if databases else []
             
         except Exception as e:
+            # リトライ失敗・認証エラーはページ検索にフォールバックせずに中断
+            if isinstance(e, NotionRetryError) or is_unauthorized(e):
+                raise
             logger.error("データベースアクセスエラー", "notion", error=str(e))
             return []  # データベースアクセスに失敗した場合は空リストを返す
     
-    def _fetch_database_entries(self, database_id: str, cutoff_date: str) -> List[Dict[str, str]]:
-        """指定されたデータベースからエントリを取得"""
+    def _fetch_entries_from_databases(self, databases: List[Dict[str, Any]], cutoff_date: str) -> List[Dict[str, str]]:
+        """1つまたは複数のデータベースからエントリを取得（複数の場合は並列取得して統合）"""
+        if len(databases) == 1:
+            return self._fetch_database_entries(databases[0]["id"], cutoff_date)
+        
+        max_workers = min(self.MULTI_DATABASE_MAX_PARALLEL, len(databases))
+        logger.info("複数データベース並列取得開始", "notion", databases=len(databases), workers=max_workers)
+        
+        # 各データベースの本文取得はそれぞれのワーカープール（max_workers）内で行う
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._fetch_database_entries_or_skip, database, cutoff_date)
+                for database in databases
+            ]
+            entry_lists = [future.result() for future in futures]
+        
+        return self._merge_database_entries(entry_lists)
+    
+    def _fetch_database_entries_or_skip(self, database: Dict[str, Any], cutoff_date: str) -> List[Dict[str, str]]:
+        """データベースからエントリを取得（他のデータベースに影響しないエラーはスキップ）"""
         try:
-            response = self._client.databases.query(
-                database_id=database_id,
-                filter={
-                    "property": "Date",
-                    "date": {"on_or_after": cutoff_date}
-                },
-                sorts=[{"property": "Date", "direction": "ascending"}]
-            )
-            
-            pages = response.get("results", [])
-            entries = []
-            
-            for page in pages:
-                entry = self._extract_database_entry(page)
-                if entry:
-                    entries.append(entry)
-            
-            return entries
+            return self._fetch_database_entries(database["id"], cutoff_date)
+        except Exception as e:
+            if isinstance(e, NotionRetryError) or is_unauthorized(e) or is_object_not_found(e):
+                raise
+            logger.warning("データベース取得失敗（スキップ）", "notion",
+                          db_name=database["title"], db_id=database["id"][:12]+"...", error=str(e))
+            return []
+    
+    @staticmethod
+    def _merge_database_entries(entry_lists: List[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        """複数データベースのエントリを重複除去し、日付の古い順に統合"""
+        merged = []
+        seen = set()
+        
+        for entries in entry_lists:
+            for entry in entries:
+                # データベース間で複製されたエントリは日付・タイトル・本文が一致するものとして除去
+                key = (entry["date"], entry["title"], entry["text"])
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(entry)
+        
+        merged.sort(key=lambda entry: entry["date"])
+        
+        logger.info("複数データベース統合完了", "notion",
+                   total=sum(len(entries) for entries in entry_lists),
+                   merged=len(merged))
+        return merged
+    
+    def _resolve_databases(self) -> List[Dict[str, Any]]:
+        """使用するデータベースを取得（キャッシュがないか期限切れなら検索して保存）
+        
+        通常は最初に見つかったデータベースのみ、複数データベースモードでは
+        日誌と思われるデータベース（日付プロパティやタイトルで判定）をすべて返す。
+        検索結果は保存からDATABASE_CACHE_TTLを過ぎると再検索する。通常のモードでは
+        以前選択したデータベースが再検索の結果に残っていれば引き続きそれを使う。
+        """
+        cached = self._database_cache.get(self._cache_key, max_age=self.DATABASE_CACHE_TTL)
+        if cached:
+            discovered = self._cached_database_list(cached)
+        else:
+            discovered = self._discover_databases()
+            if not discovered:
+                return []
+            expired = None if self._multi_database else self._database_cache.get(self._cache_key)
+            if expired:
+                discovered = self._keep_previous_selection(discovered, self._cached_database_list(expired))
+            self._database_cache.set(self._cache_key, {"databases": discovered})
+        
+        selected = [db for db in discovered if db["journal_like"]] if self._multi_database else []
+        selected = selected or discovered[:1]
+        
+        for database in selected:
+            logger.info("データベース選択（キャッシュ）" if cached else "データベース選択", "notion",
+                       db_name=database["title"], db_id=database["id"][:12]+"...")
+        
+        return [{"id": db["id"], "title": db["title"], "cached": bool(cached)} for db in selected]
+    
+    @staticmethod
+    def _cached_database_list(cached: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """キャッシュ済みのデータベース一覧（以前の形式（単一データベース）のキャッシュにも対応）"""
+        return cached.get("databases") or [{**cached, "journal_like": True}]
+    
+    @staticmethod
+    def _keep_previous_selection(discovered: List[Dict[str, Any]],
+                                 previous: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """再検索の結果に以前の先頭のデータベースが残っていれば先頭に置き、選択が変わらないようにする"""
+        previous_id = previous[0]["id"] if previous else None
+        kept = [db for db in discovered if db["id"] == previous_id]
+        return kept + [db for db in discovered if db["id"] != previous_id]
+    
+    def _discover_databases(self) -> List[Dict[str, Any]]:
+        """利用可能なデータベースを検索"""
+        logger.debug("データベース検索開始", "notion")
+        search_response = self._client.search(
+            filter={"value": "database", "property": "object"}
+        )
+        
+        results = search_response.get("results", [])
+        logger.info("データベース検索完了", "notion", found_count=len(results))
+        
+        if not results:
+            logger.warning("データベースが見つからない", "notion")
+            return []
+        
+        databases = []
+        seen = set()
+        for result in results:
+            database_id = result.get("id")
+            if not database_id or database_id in seen:
+                continue
+            seen.add(database_id)
             
-        except Exception:
-            # Dateプロパティがない場合は、作成日でフィルタリング
-            return self._fetch_database_entries_by_created_time(database_id, cutoff_date)
+            database_title = result.get("title", [])
+            db_name = database_title[0].get("plain_text", "Unknown") if database_title else "Unknown"
+            databases.append({
+                "id": database_id,
+                "title": db_name,
+                "journal_like": self._is_journal_like_database(result, db_name)
+            })
+        
+        return databases
+    
+    def _is_journal_like_database(self, database: dict, title: str) -> bool:
+        """日誌として使われていそうなデータベースか判定（日付プロパティの有無・タイトル）"""
+        properties = database.get("properties", {})
+        has_date_property = any(prop.get("type") == "date" for prop in properties.values())
+        lowered_title = title.lower()
+        return has_date_property or any(keyword in lowered_title for keyword in self.JOURNAL_TITLE_KEYWORDS)
     
-    def _fetch_database_entries_by_created_time(self, database_id: str, cutoff_date: str) -> List[Dict[str, str]]:
-        """作成日でデータベースエントリを取得（Dateプロパティがない場合の代替）"""
+    def invalidate_database_cache(self):
+        """キャッシュ済みのデータベース選択を破棄し、次回の取得時に再検索させる"""
+        self._database_cache.delete(self._cache_key)
+        logger.info("データベースキャッシュを破棄", "notion")
+    
+    def _fetch_database_entries(self, database_id: str, cutoff_date: str) -> List[Dict[str, str]]:
+        """指定されたデータベースからエントリを取得（期間の絞り込みはサーバー側で行う）"""
+        schema = self._resolve_database_schema(database_id)
+        
         try:
-            response = self._client.databases.query(
-                database_id=database_id,
-                sorts=[{"property": "Created time", "direction": "ascending"}]
-            )
-            
-            pages = response.get("results", [])
-            entries = []
+            return self._query_database_entries(database_id, schema, cutoff_date)
+        except Exception as e:
+            # スキーマが古い（プロパティの削除・型変更）場合に備え、再取得してプロパティを絞り込まずに再試行
+            if not is_validation_error(e):
+                raise
+            logger.warning("クエリ条件が不正なためスキーマを再取得して再試行", "notion",
+                          db_id=database_id[:12]+"...", error=str(e))
+            self._schema_cache.delete(self._schema_cache_key(database_id))
+            schema = self._resolve_database_schema(database_id)
+            return self._query_database_entries(database_id, schema, cutoff_date, trim_properties=False)
+    
+    def _query_database_entries(self, database_id: str, schema: Dict[str, Any], cutoff_date: str,
+                                trim_properties: bool = True) -> List[Dict[str, str]]:
+        """スキーマに応じた期間フィルタでデータベースをクエリし、エントリを抽出"""
+        date_property = schema["date_property"]
+        
+        if date_property:
+            query = {
+                "filter": {"property": date_property["name"], "date": {"on_or_after": cutoff_date}},
+                "sorts": [{"property": date_property["name"], "direction": "ascending"}]
+            }
+        else:
+            # 日付プロパティがない場合は作成日でフィルタリング
+            query = {
+                "filter": {"timestamp": "created_time", "created_time": {"on_or_after": cutoff_date}},
+                "sorts": [{"timestamp": "created_time", "direction": "ascending"}]
+            }
+        
+        # 抽出に使わないプロパティ（リレーション・ロールアップ・数式など）は取得しない
+        property_ids = self._select_property_ids(schema) if trim_properties else None
+        if property_ids:
+            query["filter_properties"] = property_ids
+        
+        content_mode = self._resolve_content_mode(database_id)
+        extract = self._database_entry_extractor(database_id, content_mode,
+                                                 date_property["name"] if date_property else None)
+        row_batches = self._iter_database_query(database_id, **query)
+        entries = self._extract_streaming(extract, row_batches)
+        self._remember_content_mode(database_id, content_mode)
+        
+        return [entry for entry in entries if entry]
+    
+    def _resolve_database_schema(self, database_id: str) -> Dict[str, Any]:
+        """データベースのスキーマから期間フィルタに使う日付プロパティを決定（キャッシュ付き）"""
+        cache_key = self._schema_cache_key(database_id)
+        cached = self._schema_cache.get(cache_key, max_age=self.SCHEMA_CACHE_TTL)
+        if cached:
+            return {**cached, "cached": True}
+        
+        database = self._client.databases.retrieve(database_id=database_id)
+        properties = {
+            name: {"id": prop.get("id"), "type": prop.get("type")}
+            for name, prop in database.get("properties", {}).items()
+        }
+        
+        date_names = [name for name, prop in properties.items() if prop["type"] == "date"]
+        preferred = [name for name in self.DATE_PROPERTY_CANDIDATES if name in date_names]
+        date_name = (preferred or date_names or [None])[0]
+        date_property = {"name": date_name, "id": properties[date_name]["id"]} if date_name else None
+        
+        logger.info("データベーススキーマ取得", "notion", 
+                   date_property=date_name or "created_time", property_count=len(properties))
+        
+        schema = {"date_property": date_property, "properties": properties}
+        self._schema_cache.set(cache_key, schema)
+        return {**schema, "cached": False}
+    
+    def _select_property_ids(self, schema: Dict[str, Any]) -> Optional[List[str]]:
+        """エントリ抽出に必要なプロパティIDを取得（絞り込めない場合はNone）
+        
+        スキーマのIDはパーセントエンコード済みで、クエリ文字列に渡すと二重にエンコードされるため復号して返す。
+        """
+        date_property = schema["date_property"]
+        property_ids = [
+            unquote(prop["id"]) for prop in schema["properties"].values()
+            if prop["id"] and (prop["type"] in self.EXTRACTED_PROPERTY_TYPES
+                               or (date_property and prop["id"] == date_property["id"]))
+        ]
+        if not property_ids or len(property_ids) == len(schema["properties"]):
+            return None
+        
+        return property_ids
+    
+    def _schema_cache_key(self, database_id: str) -> str:
+        return f"{self._cache_key}:{database_id}"
+    
+    def _iter_database_query(self, database_id: str, **query) -> Iterator[List[dict]]:
+        """データベースクエリをページネーションし、取得したページ単位で結果を返す"""
+        start_cursor = None
+        page_count = 0
+        
+        while True:
+            params = {"page_size": 100, **query}  # 最大値
+            if start_cursor:
+                params["start_cursor"] = start_cursor
             
-            for page in pages:
-                if self._is_recent_page(page, cutoff_date):
-                    entry = self._extract_database_entry(page)
-                    if entry:
-                        entries.append(entry)
+            response = self._client.databases.query(database_id=database_id, **params)
+            page_count += 1
+            rows = response.get("results", [])
+            logger.debug("データベースクエリ進捗", "notion", page=page_count, rows=len(rows))
+            yield rows
             
-            return entries
+            start_cursor = response.get("next_cursor")
+            if not response.get("has_more") or not start_cursor:
+                return
+    
+    def _extract_streaming(self, func: Callable[[dict], Any], row_batches: Iterable[List[dict]]) -> List[Any]:
+        """クエリ結果をページ単位で受け取り次第、本文取得に回して元の順序で結果を返す
+        
+        次のクエリページを取得している間に、前のページの本文取得をワーカープールで進める。
+        保持する生データは処理中のページと取得中のページの分だけになる。
+        """
+        results = []
+        
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            pending = []
+            for rows in row_batches:
+                results.extend(future.result() for future in pending)
+                pending = [executor.submit(func, row) for row in rows]
+            results.extend(future.result() for future in pending)
+        
+        return results
+    
+    def _iter_page_search_results(self, cutoff_date: str) -> Iterator[Dict[str, str]]:
+        """ページ検索結果の本文を並列取得し、検索結果の順に文書を返す
+        
+        本文取得は最大でワーカー数の2倍までしか先行させず、保持するページ数を抑える。
+        """
+        stats = {"total_pages": 0, "filtered_by_date": 0}
+        recent_but_no_content = 0
+        document_count = 0
+        max_in_flight = self._max_workers * 2
+        
+        executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        pending = deque()
+        try:
+            for page in self._iter_recent_search_pages(cutoff_date, stats):
+                pending.append(executor.submit(self._extract_document_info, page))
+                if len(pending) < max_in_flight:
+                    continue
+                
+                doc = pending.popleft().result()
+                if self._has_content(doc):
+                    document_count += 1
+                    yield doc
+                elif doc:
+                    recent_but_no_content += 1
             
-        except Exception:
-            return []
+            while pending:
+                doc = pending.popleft().result()
+                if self._has_content(doc):
+                    document_count += 1
+                    yield doc
+                elif doc:
+                    recent_but_no_content += 1
+        finally:
+            # 途中で読み捨てられた場合は未着手の本文取得を取り消す
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        logger.info("Notion文書取得統計", "notion", 
+                   total_pages=stats["total_pages"],
+                   filtered_by_date=stats["filtered_by_date"], 
+                   recent_no_content=recent_but_no_content, 
+                   final_documents=document_count)
     
-    def _fetch_page_search_results(self, cutoff_date: str) -> List[Dict[str, str]]:
-        """通常のページ検索結果を取得（日付による早期終了付き）"""
-        logger.debug("ページ検索開始", "notion", cutoff_date=cutoff_date)
+    def _iter_recent_search_pages(self, cutoff_date: str, stats: Dict[str, int]) -> Iterator[dict]:
+        """最終編集日の新しい順にページを検索し、対象期間のページを返す
         
-        all_pages = []
-        has_more = True
+        最終編集日がカットオフより前のページに到達した後は、作成日・最終編集日とも
+        カットオフより前になり、日付プロパティでのみ対象期間に入りうる。そのため
+        日付プロパティが対象期間のページが連続SEARCH_MAX_CONSECUTIVE_OLD_PAGES件見つからなければ検索を終了する。
+        """
+        logger.debug("ページ検索開始", "notion", cutoff_date=cutoff_date)
         start_cursor = None
-        consecutive_old_pages = 0  # 連続して古いページの数
-        max_consecutive_old = 50   # 連続して古いページがこの数を超えたら終了
-        max_total_pages = 500      # 最大取得ページ数
+        consecutive_old_pages = 0
         
-        while has_more and len(all_pages) < max_total_pages:
+        while stats["total_pages"] < self.SEARCH_MAX_TOTAL_PAGES:
             params = {
                 "filter": {"value": "page", "property": "object"},
                 "sort": {"direction": "descending", "timestamp": "last_edited_time"},
@@ -161,89 +541,74 @@ class NotionInput:
             
             response = self._client.search(**params)
             pages = response.get("results", [])
-            
-            # 各ページの日付をチェックして早期終了判定
             recent_pages_in_batch = 0
+            
             for page in pages:
+                last_edited = page.get("last_edited_time", "")
+                edited_before_cutoff = bool(last_edited) and last_edited[:10] < cutoff_date
+                if edited_before_cutoff and consecutive_old_pages >= self.SEARCH_MAX_CONSECUTIVE_OLD_PAGES:
+                    logger.info("最終編集日がカットオフを過ぎたため検索終了", "notion",
+                              total_fetched=stats["total_pages"], last_edited=last_edited[:10],
+                              consecutive_old=consecutive_old_pages)
+                    return
+                
+                stats["total_pages"] += 1
                 is_recent = self._is_recent_page(page, cutoff_date)
+                
+                # 最初の10件と最近のページの詳細を表示
+                if stats["total_pages"] <= 10 or is_recent:
+                    logger.debug("ページ詳細情報", "notion", 
+                               page_num=stats["total_pages"], title=self._extract_page_title(page)[:30], 
+                               created=page.get("created_time", "")[:10], edited=last_edited[:10], 
+                               is_recent=is_recent)
+                
                 if is_recent:
                     recent_pages_in_batch += 1
-                    consecutive_old_pages = 0  # 最近のページが見つかったらカウンターリセット
+                    consecutive_old_pages = 0
+                    yield page
                 else:
-                    consecutive_old_pages += 1
-                
-                # 連続して古いページが続いたら早期終了
-                if consecutive_old_pages >= max_consecutive_old:
-                    logger.info("連続古ページによる早期終了", "notion", 
-                              consecutive_old=consecutive_old_pages, 
-                              total_fetched=len(all_pages) + len(pages[:pages.index(page)]))
-                    all_pages.extend(pages[:pages.index(page) + 1])
-                    has_more = False
-                    break
-            
-            if has_more:  # 早期終了していない場合のみページを追加
-                all_pages.extend(pages)
-                has_more = response.get("has_more", False)
-                start_cursor = response.get("next_cursor")
-                
-                logger.debug("ページ検索進捗", "notion", 
-                           current_count=len(all_pages), 
-                           recent_in_batch=recent_pages_in_batch,
-                           consecutive_old=consecutive_old_pages,
-                           has_more=has_more)
+                    stats["filtered_by_date"] += 1
+                    if edited_before_cutoff:
+                        consecutive_old_pages += 1
+            
+            start_cursor = response.get("next_cursor")
+            has_more = bool(response.get("has_more") and start_cursor)
+            logger.debug("ページ検索進捗", "notion", 
+                       current_count=stats["total_pages"], 
+                       recent_in_batch=recent_pages_in_batch,
+                       has_more=has_more)
+            
+            if not has_more:
+                logger.info("ページ検索完了", "notion", total_pages=stats["total_pages"])
+                return
         
         # 最大ページ数に達した場合の警告
-        if len(all_pages) >= max_total_pages:
-            logger.warning("最大取得ページ数に到達", "notion", max_pages=max_total_pages)
-        
-        logger.info("ページ検索完了", "notion", total_pages=len(all_pages))
-        
-        documents = []
-        filtered_count = 0
-        recent_but_no_content = 0
+        logger.warning("最大取得ページ数に到達", "notion", max_pages=self.SEARCH_MAX_TOTAL_PAGES)
+    
+    @staticmethod
+    def _has_content(doc: Optional[Dict[str, str]]) -> bool:
+        """本文が空でない文書か判定"""
+        return bool(doc and doc.get("text", "").strip())
+    
+    def _map_concurrently(self, func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """ワーカープールで並列実行し、入力と同じ順序で結果を返す"""
+        if not items:
+            return []
         
-        for i, page in enumerate(all_pages):
-            page_title = self._extract_page_title(page)
-            created_time = page.get("created_time", "")
-            last_edited = page.get("last_edited_time", "")
-            is_recent = self._is_recent_page(page, cutoff_date)
-            
-            # 最初の10件と最近のページの詳細を表示
-            if i < 10 or is_recent:
-                logger.debug("ページ詳細情報", "notion", 
-                           page_num=i+1, title=page_title[:30], 
-                           created=created_time[:10], edited=last_edited[:10], 
-                           is_recent=is_recent)
-            
-            if is_recent:
-                doc = self._extract_document_info(page)
-                if doc:
-                    # コンテンツが空でないかチェック
-                    if doc.get("text", "").strip():
-                        documents.append(doc)
-                        logger.debug("ドキュメント追加", "notion", chars=len(doc['text']))
-                    else:
-                        recent_but_no_content += 1
-                        logger.debug("コンテンツ空により除外", "notion")
-                else:
-                    logger.debug("ドキュメント情報抽出失敗", "notion")
-            else:
-                filtered_count += 1
+        max_workers = min(self._max_workers, len(items))
+        logger.debug("並列取得開始", "notion", items=len(items), workers=max_workers)
         
-        logger.info("Notion文書取得統計", "notion", 
-                   total_pages=len(all_pages),
-                   filtered_by_date=filtered_count, 
-                   recent_no_content=recent_but_no_content, 
-                   final_documents=len(documents))
-        return documents
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # executor.mapは入力順に結果を返すため、並び順はそのまま保たれる
+            return list(executor.map(func, items))
     
-    def _extract_date_property(self, page: dict) -> Optional[str]:
+    def _extract_date_property(self, page: dict, property_name: str = "Date") -> Optional[str]:
         """ページから日付プロパティを抽出"""
         properties = page.get("properties", {})
         
         # 日付プロパティをチェック
-        if "Date" in properties and properties["Date"].get("date"):
-            return properties["Date"]["date"]["start"]
+        if property_name in properties and properties[property_name].get("date"):
+            return properties[property_name]["date"]["start"]
         
         return None
     
@@ -253,6 +618,10 @@ class NotionInput:
         if not page_id:
             return None
         
+        cached_entry = self._get_cached_entry("page", page)
+        if cached_entry:
+            return self._with_last_edited_time(cached_entry, page)
+        
         title = self._extract_page_title(page)
         
         # ページタイプを確認
@@ -265,26 +634,119 @@ class NotionInput:
         # データベースエントリの場合は日付プロパティを優先
         date = self._extract_date_property(page) or page.get("created_time", "")[:10]
         
-        return {
+        entry = {
             "date": date,
             "title": title,
-            "text": content
+            "text": content or ""
         }
+        
+        # 本文取得に失敗した場合はキャッシュしない
+        if content is not None:
+            self._store_cached_entry("page", page, entry)
+        
+        return self._with_last_edited_time(entry, page)
+    
+    def _with_last_edited_time(self, entry: Dict[str, str], page: dict) -> Dict[str, str]:
+        """日付プロパティのないページに最終編集日時を付与
+        
+        _is_recent_pageと同じく、作成日より後に編集されたページも期間内として
+        扱えるようにする（直近N日分の切り出しで使用）。
+        """
+        if self._extract_date_property(page) or not page.get("last_edited_time"):
+            return entry
+        return {**entry, "last_edited_time": page["last_edited_time"]}
+    
+    def _database_entry_extractor(self, database_id: str, content_mode: str,
+                                  date_property: Optional[str]) -> Callable[[dict], Optional[Dict[str, str]]]:
+        """データベースの本文取得方法・日付プロパティに応じたエントリ抽出関数を返す"""
+        def extract(page: dict) -> Optional[Dict[str, str]]:
+            return self._extract_database_entry(page, content_mode, date_property, database_id)
+        
+        return extract
+    
+    def _resolve_content_mode(self, database_id: str) -> str:
+        """データベースの本文取得方法を決定（自動判定済みの結果があれば使用）"""
+        if self._content_mode != self.CONTENT_MODE_AUTO:
+            return self._content_mode
+        
+        cached = self._content_mode_cache.get(self._content_mode_key(database_id), max_age=self.CONTENT_MODE_TTL)
+        mode = cached["mode"] if cached else self.CONTENT_MODE_AUTO
+        if cached:
+            logger.info("本文取得モード（判定済み）", "notion", mode=mode)
+        
+        # 未判定の場合は全件ページ本体を取得し、その結果をサンプルとして判定する
+        # （propertiesと判定済みでも、ページ本体を取得したエントリで毎回判定を確認し直す）
+        if mode != self.CONTENT_MODE_BLOCKS:
+            with self._content_samples_lock:
+                self._content_samples[database_id] = []
+        return mode
+    
+    def _remember_content_mode(self, database_id: str, content_mode: str):
+        """今回の実行でページ本体を取得したエントリから本文取得方法を判定して保存
+        
+        ページ本体に本文があるエントリが1件でもあれば常にページ本体も取得するモードとする
+        （propertiesと判定済みの場合も、テキストプロパティが空で本体を取得したエントリに本文があれば切り替える）。
+        ページ本体がすべて空で、テキストプロパティに本文があるエントリが
+        CONTENT_MODE_SAMPLE_SIZE件以上ある場合のみプロパティのみモードとし、
+        判定材料が足りない場合は次回に持ち越す。
+        """
+        with self._content_samples_lock:
+            samples = self._content_samples.pop(database_id, [])
+        
+        if self._content_mode != self.CONTENT_MODE_AUTO or not samples:
+            return
+        
+        if any(has_page_content for _, has_page_content in samples):
+            mode = self.CONTENT_MODE_BLOCKS
+        elif content_mode == self.CONTENT_MODE_PROPERTIES:
+            return
+        elif sum(1 for has_text_property, _ in samples if has_text_property) >= self.CONTENT_MODE_SAMPLE_SIZE:
+            mode = self.CONTENT_MODE_PROPERTIES
+        else:
+            logger.info("本文取得モード判定を持ち越し", "notion", samples=len(samples))
+            return
+        
+        self._content_mode_cache.set(self._content_mode_key(database_id), {"mode": mode})
+        logger.info("本文取得モード判定", "notion", mode=mode, samples=len(samples))
+    
+    def _content_mode_key(self, database_id: str) -> str:
+        return f"{self._cache_key}:{database_id}"
     
-    def _extract_database_entry(self, page: dict) -> Optional[Dict[str, str]]:
+    def _extract_database_entry(self, page: dict, content_mode: str = CONTENT_MODE_BLOCKS,
+                                date_property: Optional[str] = "Date",
+                                database_id: str = None) -> Optional[Dict[str, str]]:
         """データベースページからエントリを抽出"""
         page_id = page.get("id", "")
         if not page_id:
             return None
         
+        # ページ本体を取得せずに作成したエントリは、プロパティのみモードの場合のみ使う
+        cached_entry = self._get_cached_entry("database", page,
+                                              allow_properties_only=content_mode == self.CONTENT_MODE_PROPERTIES)
+        if cached_entry:
+            return cached_entry
+        
         # データベースページのタイトル抽出（プロパティから）
         title = self._extract_database_title(page)
         
         # まずプロパティからコンテンツを抽出
         property_content = self._extract_database_content_from_properties(page)
         
+        # 本文の有無は本文として出力されるテキストプロパティで判断する
+        # （チェックボックス・数値などは常に値が出力され、タイトルは本文に含まれないため）
+        has_text_property = self._has_text_property_content(page)
+        
+        # プロパティのみモードでは、テキストプロパティに本文があればページ本体を取得しない
+        skip_page_content = content_mode == self.CONTENT_MODE_PROPERTIES and has_text_property
+        
         # 次にページ本体のコンテンツを取得
-        page_content = self._get_page_content(page_id)
+        page_content = None if skip_page_content else self._get_page_content(page_id)
+        
+        # 判定中・判定の確認中はエントリごとにテキストプロパティとページ本体の本文の有無を記録
+        if content_mode != self.CONTENT_MODE_BLOCKS and page_content is not None:
+            with self._content_samples_lock:
+                self._content_samples.setdefault(database_id, []).append(
+                    (has_text_property, bool(page_content.strip())))
         
         # プロパティとページ本体のコンテンツを結合
         content = ""
@@ -301,13 +763,56 @@ class NotionInput:
                           has_page_content=bool(page_content))
         
         # データベースエントリの日付プロパティを優先的に取得
-        date = self._extract_date_property(page) or page.get("created_time", "")[:10]
+        date_value = self._extract_date_property(page, date_property) if date_property else None
+        date = date_value or page.get("created_time", "")[:10]
         
-        return {
+        entry = {
             "date": date,
             "title": title,
             "text": content
         }
+        
+        # 本文取得に失敗した場合はキャッシュしない
+        if page_content is not None or skip_page_content:
+            self._store_cached_entry("database", page, entry, properties_only=skip_page_content)
+        
+        return entry
+    
+    def _get_cached_entry(self, kind: str, page: dict, allow_properties_only: bool = True) -> Optional[Dict[str, str]]:
+        """last_edited_timeが一致するキャッシュ済みエントリを取得
+        
+        Args:
+            allow_properties_only: ページ本体を取得せずに作成したエントリも使うか
+        """
+        last_edited_time = page.get("last_edited_time")
+        cached = self._page_cache.get(f"{kind}:{page['id']}") if last_edited_time else None
+        is_hit = (bool(cached) and cached.get("last_edited_time") == last_edited_time
+                  and (allow_properties_only or not cached.get("properties_only")))
+        
+        with self._cache_stats_lock:
+            self._cache_stats["hits" if is_hit else "misses"] += 1
+        
+        return cached["entry"] if is_hit else None
+    
+    def _store_cached_entry(self, kind: str, page: dict, entry: Dict[str, str], properties_only: bool = False):
+        """抽出したエントリをlast_edited_timeとともにキャッシュ"""
+        last_edited_time = page.get("last_edited_time")
+        if not last_edited_time:
+            return
+        
+        self._page_cache.set(f"{kind}:{page['id']}", {
+            "last_edited_time": last_edited_time,
+            "entry": entry,
+            "properties_only": properties_only
+        })
+    
+    def _log_fetch_stats(self):
+        """ページキャッシュとAPIリクエストの統計をログ出力"""
+        logger.info("ページキャッシュ統計", "notion", 
+                   hits=self._cache_stats["hits"], 
+                   misses=self._cache_stats["misses"],
+                   enabled=self._page_cache.enabled)
+        logger.info("Notion APIリクエスト統計", "notion", **self._client.stats())
     
     def _extract_database_title(self, page: dict) -> str:
         """データベースページのタイトルを抽出"""
@@ -394,6 +899,16 @@ class NotionInput:
         
         return "\n".join(content_parts)
     
+    @staticmethod
+    def _has_text_property_content(page: dict) -> bool:
+        """本文として出力されるテキストプロパティ（rich_text）に空でない本文があるか判定"""
+        for prop_value in page.get("properties", {}).values():
+            if prop_value.get("type") == "rich_text":
+                text = "".join(rt.get("plain_text", "") for rt in prop_value.get("rich_text") or [])
+                if text.strip():
+                    return True
+        return False
+    
     def _extract_page_title(self, page: dict) -> str:
         """ページタイトルを抽出"""
         properties = page.get("properties", {})
@@ -405,11 +920,10 @@ class NotionInput:
         
         return page.get("title", "Untitled")
     
-    def _get_page_content(self, page_id: str) -> str:
-        """ページのコンテンツを取得"""
+    def _get_page_content(self, page_id: str) -> Optional[str]:
+        """ページのコンテンツを取得（ネストしたブロックを含む、取得失敗時はNone）"""
         try:
-            blocks_response = self._client.blocks.children.list(page_id)
-            blocks = blocks_response.get("results", [])
+            blocks = self._fetch_block_tree(page_id)
             
             content_parts = []
             for block in blocks:
@@ -432,10 +946,80 @@ class NotionInput:
             
             return content
             
+        except NotionRetryError:
+            # リトライしても取得できなかったページを黙って欠落させない
+            raise
         except Exception as e:
             logger.error("ページコンテンツ取得エラー", "notion", 
                         page_id=page_id[:12]+"...", error=str(e))
-            return ""  # エラー時は空文字を返す
+            return None  # 空のページと区別するためエラー時はNoneを返す
+    
+    def _fetch_block_tree(self, page_id: str) -> List[dict]:
+        """ページ配下のブロックツリーを階層ごとに取得し、文書順に平坦化して返す
+        
+        同じ階層の兄弟サブツリーは並列に取得する。深さと総ブロック数の上限に
+        達した時点で走査を打ち切る。
+        """
+        children_by_parent = {page_id: self._list_block_children(page_id)}
+        total_blocks = len(children_by_parent[page_id])
+        frontier = self._blocks_to_descend(children_by_parent[page_id])
+        depth = 1
+        
+        while frontier and depth < self.BLOCK_TREE_MAX_DEPTH and total_blocks < self.BLOCK_TREE_MAX_BLOCKS:
+            parent_ids = [block["id"] for block in frontier]
+            children_lists = self._map_concurrently(self._list_block_children, parent_ids)
+            
+            frontier = []
+            for parent_id, children in zip(parent_ids, children_lists):
+                children_by_parent[parent_id] = children
+                total_blocks += len(children)
+                frontier.extend(self._blocks_to_descend(children))
+            depth += 1
+        
+        if frontier:
+            logger.warning("ブロックツリーの走査上限に到達", "notion", 
+                          page_id=page_id[:12]+"...", depth=depth, total_blocks=total_blocks)
+        
+        return self._flatten_block_tree(page_id, children_by_parent)
+    
+    def _list_block_children(self, block_id: str) -> List[dict]:
+        """子ブロックをページネーションしながらすべて取得"""
+        blocks = []
+        start_cursor = None
+        
+        while len(blocks) < self.BLOCK_TREE_MAX_BLOCKS:
+            params = {"page_size": 100}  # 最大値
+            if start_cursor:
+                params["start_cursor"] = start_cursor
+            
+            response = self._client.blocks.children.list(block_id, **params)
+            blocks.extend(response.get("results", []))
+            
+            start_cursor = response.get("next_cursor")
+            if not response.get("has_more") or not start_cursor:
+                break
+        
+        return blocks
+    
+    def _blocks_to_descend(self, blocks: List[dict]) -> List[dict]:
+        """子ブロックを取得する必要があるブロックを抽出"""
+        return [
+            block for block in blocks
+            if block.get("has_children") and block.get("id")
+            and block.get("type") not in self.NON_RECURSIVE_BLOCK_TYPES
+        ]
+    
+    def _flatten_block_tree(self, page_id: str, children_by_parent: Dict[str, List[dict]]) -> List[dict]:
+        """親ブロックの直後に子ブロックが並ぶ文書順に平坦化"""
+        flattened = []
+        stack = list(reversed(children_by_parent.get(page_id, [])))
+        
+        while stack and len(flattened) < self.BLOCK_TREE_MAX_BLOCKS:
+            block = stack.pop()
+            flattened.append(block)
+            stack.extend(reversed(children_by_parent.get(block.get("id"), [])))
+        
+        return flattened
     
     def _extract_text_from_block(self, block: dict) -> str:
         """ブロックからテキストを抽出（拡張版）"""
@@ -505,25 +1089,6 @@ class NotionInput:
         
         return is_recent
     
-    def _check_api_connection(self):
-        """API接続を確認"""
-        try:
-            # ユーザー情報を取得してAPIキーが有効か確認
-            user_info = self._client.users.me()
-            logger.success("Notion API接続成功", "notion", user=mask_name(user_info.get('name', 'Unknown User')))
-            
-            # 簡単な検索を実行してアクセス権限を確認
-            test_search = self._client.search(
-                filter={"value": "page", "property": "object"},
-                page_size=1
-            )
-            accessible_pages = len(test_search.get("results", []))
-            logger.info("Notionアクセス権限確認", "notion", accessible_pages=f"{accessible_pages}+")
-            
-        except Exception as e:
-            logger.error("Notion API接続エラー", "notion", error=str(e))
-            raise NotionInputError(f"Notion API接続エラー: {e}")
-    
     @staticmethod
     def _calculate_cutoff_date(days: int) -> str:
         """カットオフ日付を計算"""
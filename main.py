@@ -8,7 +8,8 @@ Input-Throughput-Output アーキテクチャによる
 
 import os
 import sys
-from typing import List, Dict
+from datetime import date, timedelta
+from typing import List, Dict, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -24,7 +25,8 @@ from models import AnalysisRun, Delivery
 class PicklesSystem:
     """Picklesシステムメインクラス"""
     
-    def __init__(self, user_config: Dict[str, str] = None):
+    def __init__(self, user_config: Dict[str, str] = None, use_response_cache: bool = True,
+                 refresh_notion_databases: bool = False):
         # user_configから各種設定を取得
         notion_api_key = user_config.get('notion_api_key') if user_config else None
         gdocs_url = user_config.get('gdocs_url') if user_config else None
@@ -40,8 +42,9 @@ class PicklesSystem:
 
         self._notion_api_key = notion_api_key
         self._notion_input = None  # NotionとGoogle Docs両対応のため、実際に使用時まで初期化を遅延
+        self._refresh_notion_databases = refresh_notion_databases
         self._gdocs_url = gdocs_url
-        self._analyzer = DocumentAnalyzer(user_name=user_name, language=language)
+        self._analyzer = DocumentAnalyzer(user_name=user_name, language=language, use_cache=use_response_cache)
         self._delivery = ReportDelivery(email_config=email_config)
         # グローバルloggerインスタンスを使用
         
@@ -67,18 +70,9 @@ class PicklesSystem:
         if delivery_methods is None:
             delivery_methods = ["console"]
         
-        # バリデーション
-        if data_source not in [DataSources.NOTION, DataSources.GDOCS]:
-            return {"error": f"未対応のデータソース: {data_source}"}
-        
-        # Google Docsの場合はURLが必要（コマンドライン引数または.env）
-        if data_source == DataSources.GDOCS and not self._gdocs_url:
-            return {"error": "Google Docsを使用する場合は--gdocs-urlでURLを指定するか、.envにGOOGLE_DOCS_URLを設定してください"}
-        
-        # daysの最小値チェック
-        if days < 7:
-            logger.error("分析日数が最小値未満", "system", days=days, minimum=7)
-            return {"error": "分析日数は最低7日必要です"}
+        error_msg = self._validate_request(data_source, days)
+        if error_msg:
+            return {"error": error_msg}
 
         # 分析実行を作成（Supabaseに記録）
         analysis_run = AnalysisRun.create(
@@ -91,42 +85,11 @@ class PicklesSystem:
         try:
             # 分析実行中に変更
             analysis_run.mark_running()
-            # コンテキスト用データ取得（days > 7の場合）
-            context_data = None
-            week_data = None
+            week_data, context_data = self._load_data(data_source, days)
             
-            if days > 7:
-                # コンテキスト分析用にdays日分のデータを取得
-                logger.start(f"{data_source}からの{days}日間データ取得（コンテキスト用）", "data", days=days)
-                context_data = self._fetch_data(data_source, days)
-
-                if not context_data:
-                    logger.warning("コンテキストデータが見つかりません（空データとして処理を継続）", "data", source=data_source, days=days)
-                    context_data = []
-
-                logger.success("コンテキストデータ取得完了", "data", count=len(context_data), source=data_source)
-                
-                # 直近7日分のデータも取得
-                logger.start(f"{data_source}からの直近7日間データ取得", "data", days=7)
-                week_data = self._fetch_data(data_source, 7)
-                
-                if not week_data:
-                    logger.warning("直近7日間のデータが見つかりません", "data", source=data_source)
-                    # フォールバック: context_dataから直近7日分を正しく抽出
-                    week_data = self._extract_recent_days_from_context(context_data, 7)
-                
-                logger.success("直近7日間データ取得完了", "data", count=len(week_data), source=data_source)
-            else:
-                # days == 7の場合は通常の処理
-                logger.start(f"{data_source}からのデータ取得", "data", days=days)
-                raw_data = self._fetch_data(data_source, days)
-
-                if not raw_data:
-                    logger.warning("データが見つかりません（空データとして処理を継続）", "data", source=data_source, days=days)
-                    raw_data = []
-
-                logger.success("データ取得完了", "data", count=len(raw_data), source=data_source)
-                week_data = raw_data
+            # 端末でのコンソール配信時のみ生成中のインサイトを逐次表示（バッチ・cron実行ではストリーミングしない）
+            is_interactive_console = DeliveryMethods.CONSOLE in delivery_methods and sys.stdout.isatty()
+            on_text_delta = self._delivery.write_insights_delta if is_interactive_console else None
             
             # 分析実行
             if days > 7:
@@ -137,7 +100,8 @@ class PicklesSystem:
                     analysis_type=analysis_type,
                     apply_filters=True,
                     language=language,
-                    context_data=context_data
+                    context_data=context_data,
+                    on_text_delta=on_text_delta
                 )
             else:
                 logger.start(f"{analysis_type}分析処理", "ai", data_count=len(week_data))
@@ -145,72 +109,207 @@ class PicklesSystem:
                     week_data,
                     analysis_type=analysis_type,
                     apply_filters=True,
-                    language=language
+                    language=language,
+                    on_text_delta=on_text_delta
                 )
             
             logger.complete(f"{analysis_type}分析処理", "ai", analyzed_count=analysis_result['data_count'])
 
-            # 分析完了をSupabaseに記録
-            analysis_run.mark_completed(
-                content=analysis_result.get('insights', ''),
-                raw_data_count=analysis_result.get('raw_data_count', 0),
-                filtered_data_count=analysis_result.get('filtered_data_count', 0),
-                avg_text_length=analysis_result.get('avg_text_length', 0)
+            return self._complete_and_deliver(analysis_run, analysis_result, delivery_methods)
+            
+        except Exception as e:
+            return self._fail_run(analysis_run, e)
+    
+    def prepare_analysis(self,
+                         user_id: str,
+                         data_source: str = "notion",
+                         analysis_type: str = "comprehensive",
+                         language: str = None,
+                         days: int = 7) -> Dict[str, any]:
+        """AI APIへのリクエスト直前まで分析を実行（OpenAI Batch APIでまとめて送信する場合に使用）
+
+        分析実行の記録・データ取得・プロンプト作成までを行う。
+        返り値をcomplete_analysisにAI APIの応答とともに渡して分析と配信を完了する。
+
+        Returns:
+            analysis_run: 分析実行レコード
+            analysis: DocumentAnalyzer.prepare_analysisの結果
+            （失敗時は {"error": エラーメッセージ}）
+        """
+        error_msg = self._validate_request(data_source, days)
+        if error_msg:
+            return {"error": error_msg}
+
+        analysis_run = AnalysisRun.create(
+            user_id=user_id,
+            analysis_type=analysis_type,
+            days_analyzed=days,
+            source_used=data_source
+        )
+
+        try:
+            analysis_run.mark_running()
+            week_data, context_data = self._load_data(data_source, days)
+            prepared = self._analyzer.prepare_analysis(
+                week_data,
+                analysis_type=analysis_type,
+                language=language,
+                context_data=context_data
             )
+            return {"analysis_run": analysis_run, "analysis": prepared}
 
-            # レポート配信
-            logger.start("レポート配信処理", "system", methods=delivery_methods)
-            delivery_results = {}
-
-            # 各配信方法に対してDeliveryレコードを作成
-            for method in delivery_methods:
-                # 配信方法がemail系の場合はemail_toを設定
-                email_to = None
-                if 'email' in method and self._delivery.to_email:
-                    email_to = self._delivery.to_email
-
-                delivery = Delivery.create(
-                    analysis_run_id=analysis_run.id,
-                    delivery_method=method,
-                    email_to=email_to
-                )
+        except Exception as e:
+            return self._fail_run(analysis_run, e)
+    
+    def build_request_body(self, prepared: Dict[str, any]) -> Optional[Dict[str, any]]:
+        """prepare_analysisの結果からAI APIのリクエストボディを作成（API呼び出しが不要な場合はNone）"""
+        messages = prepared["analysis"]["messages"]
+        return self._analyzer.build_request_body(messages) if messages is not None else None
+    
+    def complete_analysis(self,
+                          prepared: Dict[str, any],
+                          response_body: Dict[str, any] = None,
+                          delivery_methods: List[str] = None,
+                          latency: float = None) -> Dict[str, str]:
+        """prepare_analysisの結果とAI APIの応答から分析を完了し、レポートを配信
 
-                try:
-                    # 個別に配信実行
-                    result = self._delivery.deliver_report(
-                        analysis_result,
-                        delivery_methods=[method],
-                        report_format="comprehensive"
-                    )
-
-                    # 成功判定
-                    if method in result and "成功" in str(result[method]):
-                        delivery.mark_sent()
-                        delivery_results[method] = result[method]
-                    else:
-                        error_msg = result.get(method, "配信失敗")
-                        delivery.mark_failed(str(error_msg))
-                        delivery_results[method] = error_msg
-
-                except Exception as e:
-                    delivery.mark_failed(str(e))
-                    delivery_results[method] = f"配信エラー: {str(e)}"
-
-            logger.complete("レポート配信処理", "system", method_count=len(delivery_methods))
-
-            return delivery_results
-            
-        except (NotionInputError, GdocsInputError, AnalysisError, OutputError) as e:
-            error_msg = str(e)
-            logger.error("アプリケーションエラー", "system", error_type=type(e).__name__, details=error_msg)
-            analysis_run.mark_failed(error_msg)
-            return {"error": error_msg}
+        Args:
+            prepared: prepare_analysisの結果
+            response_body: AI APIのレスポンスボディ（API呼び出しが不要だった場合はNone）
+            delivery_methods: 配信方法
+            latency: 応答の生成にかかった秒数
+        """
+        if delivery_methods is None:
+            delivery_methods = ["console"]
+
+        analysis_run = prepared["analysis_run"]
+        try:
+            insights = prepared["analysis"]["insights"]
+            if response_body is not None:
+                insights = self._analyzer.parse_response_body(response_body)
+            analysis_result = self._analyzer.complete_analysis(prepared["analysis"], insights, latency)
+            logger.complete(f"{prepared['analysis']['analysis_type']}分析処理", "ai",
+                            analyzed_count=analysis_result['data_count'])
+
+            # コンソール配信時は逐次表示していないため、インサイトを含めて出力される
+            return self._complete_and_deliver(analysis_run, analysis_result, delivery_methods)
 
         except Exception as e:
-            error_msg = f"予期しないエラー: {e}"
-            logger.error("予期しないエラー", "system", error_type=type(e).__name__, details=str(e))
-            analysis_run.mark_failed(error_msg)
-            return {"error": error_msg}
+            return self._fail_run(analysis_run, e)
+    
+    def fail_analysis(self, prepared: Dict[str, any], error: str) -> Dict[str, str]:
+        """prepare_analysis後にAI APIの応答が得られなかった分析を失敗として記録"""
+        return self._fail_run(prepared["analysis_run"], AnalysisError(error))
+    
+    def _validate_request(self, data_source: str, days: int) -> Optional[str]:
+        """分析リクエストを検証（問題がある場合はエラーメッセージを返す）"""
+        if data_source not in [DataSources.NOTION, DataSources.GDOCS]:
+            return f"未対応のデータソース: {data_source}"
+        
+        # Google Docsの場合はURLが必要（コマンドライン引数または.env）
+        if data_source == DataSources.GDOCS and not self._gdocs_url:
+            return "Google Docsを使用する場合は--gdocs-urlでURLを指定するか、.envにGOOGLE_DOCS_URLを設定してください"
+        
+        # daysの最小値チェック
+        if days < 7:
+            logger.error("分析日数が最小値未満", "system", days=days, minimum=7)
+            return "分析日数は最低7日必要です"
+        
+        return None
+    
+    def _load_data(self, data_source: str, days: int):
+        """分析対象データを取得し、(直近7日間のデータ, コンテキストデータ)を返す
+
+        最も広い期間で1回だけ取得し、直近7日分はメモリ上で切り出す。
+        daysが7日の場合、コンテキストデータはNone。
+        """
+        logger.start(f"{data_source}からの{days}日間データ取得", "data", days=days)
+        raw_data = self._fetch_data(data_source, days)
+        
+        if not raw_data:
+            logger.warning("データが見つかりません（空データとして処理を継続）", "data", source=data_source, days=days)
+            raw_data = []
+        
+        if days <= 7:
+            logger.success("データ取得完了", "data", count=len(raw_data), source=data_source)
+            return raw_data, None
+        
+        # コンテキスト分析用にdays日分のデータをそのまま使用
+        context_data = raw_data
+        logger.success("コンテキストデータ取得完了", "data", count=len(context_data), source=data_source)
+        
+        # 直近7日分は取得済みデータから抽出（再取得しない）
+        week_data = self._extract_recent_days_from_context(context_data, 7)
+        
+        if not week_data:
+            logger.warning("直近7日間のデータが見つかりません", "data", source=data_source)
+        
+        logger.success("直近7日間データ抽出完了", "data", count=len(week_data), source=data_source)
+        return week_data, context_data
+    
+    def _complete_and_deliver(self, analysis_run: AnalysisRun, analysis_result: Dict[str, any],
+                              delivery_methods: List[str]) -> Dict[str, str]:
+        """分析完了を記録し、各配信方法でレポートを配信"""
+        # 分析完了をSupabaseに記録
+        analysis_run.mark_completed(
+            content=analysis_result.get('insights', ''),
+            raw_data_count=analysis_result.get('raw_data_count', 0),
+            filtered_data_count=analysis_result.get('filtered_data_count', 0),
+            avg_text_length=analysis_result.get('avg_text_length', 0)
+        )
+
+        # レポート配信
+        logger.start("レポート配信処理", "system", methods=delivery_methods)
+        delivery_results = {}
+
+        # 各配信方法に対してDeliveryレコードを作成
+        for method in delivery_methods:
+            # 配信方法がemail系の場合はemail_toを設定
+            email_to = None
+            if 'email' in method and self._delivery.to_email:
+                email_to = self._delivery.to_email
+
+            delivery = Delivery.create(
+                analysis_run_id=analysis_run.id,
+                delivery_method=method,
+                email_to=email_to
+            )
+
+            try:
+                # 個別に配信実行
+                result = self._delivery.deliver_report(
+                    analysis_result,
+                    delivery_methods=[method],
+                    report_format="comprehensive"
+                )
+
+                # 成功判定
+                if method in result and "成功" in str(result[method]):
+                    delivery.mark_sent()
+                    delivery_results[method] = result[method]
+                else:
+                    error_msg = result.get(method, "配信失敗")
+                    delivery.mark_failed(str(error_msg))
+                    delivery_results[method] = error_msg
+
+            except Exception as e:
+                delivery.mark_failed(str(e))
+                delivery_results[method] = f"配信エラー: {str(e)}"
+
+        logger.complete("レポート配信処理", "system", method_count=len(delivery_methods))
+
+        return delivery_results
+    
+    def _fail_run(self, analysis_run: AnalysisRun, error: Exception) -> Dict[str, str]:
+        """分析失敗をログ出力・記録し、エラー結果を返す"""
+        if isinstance(error, (NotionInputError, GdocsInputError, AnalysisError, OutputError)):
+            error_msg = str(error)
+            logger.error("アプリケーションエラー", "system", error_type=type(error).__name__, details=error_msg)
+        else:
+            error_msg = f"予期しないエラー: {error}"
+            logger.error("予期しないエラー", "system", error_type=type(error).__name__, details=str(error))
+        analysis_run.mark_failed(error_msg)
+        return {"error": error_msg}
     
     def _fetch_data(self, data_source: str, days: int) -> List[Dict[str, str]]:
         """データ取得"""
@@ -219,6 +318,8 @@ class PicklesSystem:
             # Notion実際使用時のみNotionInputを初期化してAPI接続テストを実行
             if self._notion_input is None:
                 self._notion_input = NotionInput(api_key=self._notion_api_key)
+                if self._refresh_notion_databases:
+                    self._notion_input.invalidate_database_cache()
             return self._notion_input.fetch_notion_documents(days)
         elif data_source == DataSources.GDOCS:
             return GdocsInput().fetch_gdocs_documents(self._gdocs_url, days)
@@ -226,60 +327,44 @@ class PicklesSystem:
             raise ValueError(f"未対応のデータソース: {data_source}")
     
     def _extract_recent_days_from_context(self, context_data: List[Dict[str, str]], days: int) -> List[Dict[str, str]]:
-        """コンテキストデータから直近N日分のデータを正しく抽出
+        """コンテキストデータから直近N日分のデータを抽出
         
-        日付でソートし、最新のN日分のデータを返す。
-        日付が欠落している場合は除外する。
+        入力層の取得条件と同じく「今日のN日前」以降の日付を持つエントリを、
+        元の並び順のまま返す。日付は'YYYY-MM-DD'で始まる文字列（日時を含む）を受け付け、
+        日付が欠落・解析不能なエントリは除外する。
+        Notionのページ検索で取得した日付プロパティのないページは、入力層と同じく
+        作成日（date）と最終編集日時（last_edited_time）のどちらかが期間内であれば含める。
         """
-        from datetime import datetime, timedelta
+        cutoff_date = date.today() - timedelta(days=days)
+        recent_data = []
+        undated_count = 0
         
-        # 日付が存在するデータのみをフィルタリング
-        data_with_dates = [d for d in context_data if d.get('date')]
+        for item in context_data:
+            entry_dates = [entry_date for entry_date in (self._parse_entry_date(item.get('date')),
+                                                         self._parse_entry_date(item.get('last_edited_time')))
+                           if entry_date is not None]
+            if not entry_dates:
+                undated_count += 1
+            elif max(entry_dates) >= cutoff_date:
+                recent_data.append(item)
         
-        if not data_with_dates:
-            logger.warning("日付情報を持つデータがありません", "data")
-            return context_data[:days] if len(context_data) > days else context_data
-        
-        # 日付でソート（新しい順）
-        try:
-            sorted_data = sorted(
-                data_with_dates,
-                key=lambda x: datetime.strptime(x['date'], '%Y-%m-%d'),
-                reverse=True
-            )
-        except (ValueError, KeyError) as e:
-            logger.warning(f"日付のパース中にエラー: {e}", "data")
-            # フォールバック: 元の順序で最初のN件を返す
-            return data_with_dates[:days] if len(data_with_dates) > days else data_with_dates
+        if undated_count:
+            logger.warning("日付を解析できないデータを除外", "data", count=undated_count)
         
-        # 最新の日付を基準に、直近N日間の範囲を計算
-        if sorted_data:
-            try:
-                latest_date = datetime.strptime(sorted_data[0]['date'], '%Y-%m-%d')
-                cutoff_date = latest_date - timedelta(days=days-1)
-                
-                # 直近N日間のデータのみを抽出
-                recent_data = [
-                    d for d in sorted_data
-                    if datetime.strptime(d['date'], '%Y-%m-%d') >= cutoff_date
-                ]
-                
-                # 古い順（昇順）に並び替えて返す
-                recent_data.reverse()
-                
-                logger.info(f"コンテキストから{len(recent_data)}件の直近データを抽出", "data",
-                          latest_date=latest_date.strftime('%Y-%m-%d'),
-                          cutoff_date=cutoff_date.strftime('%Y-%m-%d'))
-                
-                return recent_data
-            except (ValueError, KeyError) as e:
-                logger.warning(f"日付範囲の計算中にエラー: {e}", "data")
+        logger.info(f"コンテキストから{len(recent_data)}件の直近データを抽出", "data",
+                  cutoff_date=cutoff_date.isoformat(), context_count=len(context_data))
         
-        # 最終フォールバック: ソート済みデータの最初のN件を返す
-        result = sorted_data[:days] if len(sorted_data) > days else sorted_data
-        # 古い順（昇順）に並び替えて返す
-        result.reverse()
-        return result
+        return recent_data
+    
+    @staticmethod
+    def _parse_entry_date(value) -> Optional[date]:
+        """エントリの日付文字列（'YYYY-MM-DD'またはISO 8601日時）を日付に変換"""
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(str(value).strip()[:10])
+        except ValueError:
+            return None
     
     def _parse_command_args(self, args: List[str]) -> Dict[str, any]:
         """コマンドライン引数を解析"""
@@ -294,6 +379,8 @@ class PicklesSystem:
             "notion_api_key": None,
             "gdocs_url": None,
             "language": None,
+            "no_cache": False,
+            "refresh_notion_databases": False,
         }
         
         parsed_args = default_args.copy()
@@ -362,6 +449,10 @@ class PicklesSystem:
             elif arg == CommandArgs.LANGUAGE and i + 1 < len(args):
                 parsed_args["language"] = args[i + 1]
                 i += 1
+            elif arg == CommandArgs.NO_CACHE:
+                parsed_args["no_cache"] = True
+            elif arg == CommandArgs.REFRESH_NOTION_DATABASES:
+                parsed_args["refresh_notion_databases"] = True
             
             i += 1
         
@@ -381,7 +472,9 @@ def parse_command_args(args: List[str]) -> Dict[str, any]:
         "email_to": None,
         "notion_api_key": None,
         "gdocs_url": None,
-        "language": None
+        "language": None,
+        "no_cache": False,
+        "refresh_notion_databases": False
     }
     
     parsed_args = default_args.copy()
@@ -445,6 +538,10 @@ def parse_command_args(args: List[str]) -> Dict[str, any]:
         elif arg == CommandArgs.LANGUAGE and i + 1 < len(args):
             parsed_args["language"] = args[i + 1]
             i += 1
+        elif arg == CommandArgs.NO_CACHE:
+            parsed_args["no_cache"] = True
+        elif arg == CommandArgs.REFRESH_NOTION_DATABASES:
+            parsed_args["refresh_notion_databases"] = True
         
         i += 1
     
@@ -475,7 +572,8 @@ def main() -> None:
 
 
     # システムを初期化
-    system = PicklesSystem(user_config=user_config)
+    system = PicklesSystem(user_config=user_config, use_response_cache=not args["no_cache"],
+                           refresh_notion_databases=args["refresh_notion_databases"])
     
     logger.info("Picklesシステム開始", "system")
     
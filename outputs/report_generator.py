@@ -43,6 +43,16 @@ class ReportDelivery:
             self.to_email = os.getenv("EMAIL_TO")
             self.from_email = os.getenv("EMAIL_FROM", self.username)  # デフォルトはusernameを使用
             self.user_name = None
+        
+        # AI分析インサイトを生成中にコンソールへ逐次表示したかどうか（コンソール配信で二重に表示しない）
+        self._insights_streamed = False
+    
+    def write_insights_delta(self, delta: str) -> None:
+        """生成途中のAI分析インサイトをコンソールに逐次表示"""
+        if not self._insights_streamed:
+            print("\n🧠 AI分析インサイト（生成中）\n" + "-" * 20, flush=True)
+            self._insights_streamed = True
+        print(delta, end="", flush=True)
     
     def deliver_report(self, 
                       analysis_result: Dict[str, str],
@@ -64,7 +74,12 @@ class ReportDelivery:
         for method in delivery_methods:
             try:
                 if method == DeliveryMethods.CONSOLE:
-                    print(text_report)
+                    if self._insights_streamed:
+                        # インサイト本文は表示済みのため、統計情報などの枠のみ表示
+                        print()
+                        print(self._format_comprehensive_report(analysis_result, include_insights=False))
+                    else:
+                        print(text_report)
                     results[DeliveryMethods.CONSOLE] = "成功"
                 
                 elif method == DeliveryMethods.EMAIL_TEXT:
@@ -91,7 +106,7 @@ class ReportDelivery:
         
         return results
     
-    def _format_comprehensive_report(self, analysis_result: Dict[str, str]) -> str:
+    def _format_comprehensive_report(self, analysis_result: Dict[str, str], include_insights: bool = True) -> str:
         """包括的なレポートをフォーマット"""
         current_date = datetime.datetime.now().strftime("%Y年%m月%d日")
         
@@ -106,7 +121,7 @@ class ReportDelivery:
             "",
             "🧠 AI分析インサイト",
             "-" * 20,
-            analysis_result.get("insights", "分析結果なし"),
+            analysis_result.get("insights", "分析結果なし") if include_insights else "（生成中に上記へ表示済み）",
             "",
             "=" * 50,
             f"分析対象データ数: {analysis_result.get('data_count', 0)}件",
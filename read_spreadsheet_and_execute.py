@@ -4,16 +4,24 @@ Google Sheetsからユーザーデータを読み込んで、各ユーザーに
 
 使用方法:
 python read_spreadsheet_and_execute.py --spreadsheet-id <SPREADSHEET_ID> --analysis domi --delivery email_html
+
+OpenAI Batch APIで全ユーザーの分析をまとめて実行する場合:
+python read_spreadsheet_and_execute.py --spreadsheet-id <SPREADSHEET_ID> --openai-batch
 """
 
 import argparse
+import os
 import sys
 import subprocess
+import uuid
 from typing import List, Dict
 from googleapiclient.errors import HttpError
 from utils.logger import logger
 from utils.google_service import get_google_service, GoogleAPIError
+from inputs.gdocs_input import GdocsInput
 from models.user import User, mask_name, mask_email
+from throughput.batch import BatchAnalysisClient
+from main import PicklesSystem
 
 
 class GoogleSheetsReader:
@@ -116,7 +124,8 @@ class GoogleSheetsReader:
 
 
 def execute_pickles_for_user(user: User, analysis_type: str,
-                             delivery_methods: str, days: int = 7) -> bool:
+                             delivery_methods: str, days: int = 7,
+                             refresh_notion_databases: bool = False) -> bool:
     """指定されたユーザーに対してPicklesを実行
 
     Args:
@@ -124,6 +133,7 @@ def execute_pickles_for_user(user: User, analysis_type: str,
         analysis_type: 分析タイプ（domi/aga）
         delivery_methods: 配信方法
         days: 取得日数
+        refresh_notion_databases: キャッシュ済みのNotionデータベース選択を破棄して再検索するか
 
     Returns:
         成功したかどうか
@@ -160,6 +170,8 @@ def execute_pickles_for_user(user: User, analysis_type: str,
     elif user.google_docs_url:
         cmd.extend(["--source", "gdocs",
                    "--gdocs-url", user.google_docs_url])
+    if refresh_notion_databases:
+        cmd.append("--refresh-notion-databases")
 
     # デバッグ: 実行コマンドをログ出力（個人情報はマスク）
     # 機密情報を含む引数の次の値をマスク
@@ -211,6 +223,136 @@ def execute_pickles_for_user(user: User, analysis_type: str,
         return False
 
 
+def execute_pickles_with_openai_batch(users: List[User], analysis_type: str,
+                                     delivery_methods: str, days: int = 7,
+                                     refresh_notion_databases: bool = False) -> int:
+    """全ユーザーの分析をOpenAI Batch APIでまとめて実行
+
+    ユーザーごとにプロンプト作成までを行い、AI APIへのリクエストを1つのバッチジョブとして送信する。
+    完了後、分析実行（AnalysisRun）のIDをcustom_idとして結果を各ユーザーに対応付け、
+    分析完了の記録とレポート配信を行う。キャッシュ済み・データなしのユーザーはバッチに含めない。
+
+    Args:
+        users: Userドメインモデルのリスト
+        analysis_type: 分析タイプ（domi/aga）
+        delivery_methods: 配信方法（カンマ区切り）
+        days: 取得日数
+        refresh_notion_databases: キャッシュ済みのNotionデータベース選択を破棄して再検索するか
+
+    Returns:
+        成功したユーザー数
+    """
+    delivery_list = delivery_methods.split(",")
+    prepared_runs = {}
+    request_bodies = {}
+
+    # 1. 各ユーザーのデータ取得とプロンプト作成
+    for i, user in enumerate(users, 1):
+        masked_name = mask_name(user.user_name)
+        logger.info(f"[{i}/{len(users)}] {masked_name}: プロンプト作成", "execution")
+
+        # データソースの決定（優先順位: Notion > Google Docs）
+        if user.notion_api_key:
+            data_source = "notion"
+        elif user.google_docs_url:
+            data_source = "gdocs"
+        else:
+            logger.error(f"❌ {masked_name} データソースなし", "execution")
+            continue
+
+        # 1人の失敗で他のユーザーのバッチ送信を止めないよう、ユーザーごとに失敗を記録して続行
+        user_data = user.to_dict()
+        try:
+            system = PicklesSystem(user_config={
+                'user_name': user_data['user_name'],
+                'email_to': user_data['email_to'],
+                'notion_api_key': user.notion_api_key,
+                'gdocs_url': user.google_docs_url,
+                'language': user_data['language']
+            }, refresh_notion_databases=refresh_notion_databases)
+            prepared = system.prepare_analysis(
+                user_id=user.id,
+                data_source=data_source,
+                analysis_type=analysis_type,
+                language=user_data['language'],
+                days=days
+            )
+        except Exception as e:
+            logger.failed(f"{masked_name}のプロンプト作成", f"{type(e).__name__}: {e}", "execution")
+            continue
+        if "error" in prepared:
+            logger.failed(f"{masked_name}のプロンプト作成", prepared["error"], "execution")
+            continue
+
+        try:
+            request_body = system.build_request_body(prepared)
+        except Exception as e:
+            logger.failed(f"{masked_name}のリクエスト作成", f"{type(e).__name__}: {e}", "execution")
+            system.fail_analysis(prepared, f"リクエスト作成エラー: {e}")
+            continue
+
+        run_id = prepared["analysis_run"].id
+        prepared_runs[run_id] = (user, system, prepared)
+        if request_body is not None:
+            request_bodies[run_id] = request_body
+
+    # 2. AI APIへのリクエストをまとめて実行
+    batch_results = {}
+    if request_bodies:
+        try:
+            batch_results = BatchAnalysisClient().run(request_bodies)
+        except Exception as e:
+            logger.error("バッチ処理エラー", "execution", error_type=type(e).__name__, error=str(e))
+            batch_results = {run_id: {"body": None, "error": str(e)} for run_id in request_bodies}
+
+    # 3. 結果を各ユーザーに対応付けて分析完了・配信
+    success_count = 0
+    for run_id, (user, system, prepared) in prepared_runs.items():
+        masked_name = mask_name(user.user_name)
+        batch_result = batch_results.get(run_id)
+
+        if batch_result and batch_result["error"]:
+            results = system.fail_analysis(prepared, f"バッチ処理エラー: {batch_result['error']}")
+        else:
+            results = system.complete_analysis(
+                prepared,
+                response_body=batch_result["body"] if batch_result else None,
+                delivery_methods=delivery_list
+            )
+
+        failed_methods = [k for k, v in results.items() if "失敗" in str(v) or "エラー" in str(v)]
+        if "error" in results or failed_methods:
+            logger.failed(f"{masked_name}のPickles実行", str(results.get("error", failed_methods)), "execution")
+        else:
+            # 最終分析時刻を更新
+            user.update_last_analysis_at()
+            logger.complete(f"{masked_name}のPickles実行", "execution")
+            success_count += 1
+
+    return success_count
+
+
+def prefetch_gdocs_documents(users: List[User], service_account_key: str = None):
+    """Google Docsユーザーの文書をバッチリクエストでまとめて事前取得
+
+    各ユーザーのmain.py実行時はローカルキャッシュの事前取得結果を使うため、
+    ユーザーごとのGoogle API呼び出しが不要になる。失敗しても各ユーザーの通常取得に任せる。
+    事前取得した結果はこの実行の間だけ使う（実行IDを環境変数で子プロセスに引き継ぐ）。
+    """
+    # データソースの優先順位（Notion > Google Docs）に合わせて対象を決定
+    doc_urls = [user.google_docs_url for user in users
+                if user.google_docs_url and not user.notion_api_key]
+    if not doc_urls:
+        return
+
+    run_id = uuid.uuid4().hex
+    try:
+        GdocsInput(service_account_key).prefetch_documents(doc_urls, run_id)
+        os.environ[GdocsInput.PREFETCH_RUN_ID_ENV] = run_id
+    except Exception as e:
+        logger.warning("Google Docs事前取得をスキップ", "execution", error=str(e))
+
+
 def filter_users_for_batch(users: List[User], batch_id: int, total_batches: int) -> List[User]:
     """バッチ用にユーザーリストをフィルタリング（動的分割）"""
     import math
@@ -254,10 +396,19 @@ def main():
     parser.add_argument("--total-batches", type=int,
                        help="総バッチ数（並列実行用）")
     parser.add_argument("--service-account-key",
-                       help="サービスアカウントキーファイルのパス")
+                       help="サービスアカウントキーのJSON文字列（未指定時は環境変数GOOGLE_SERVICE_ACCOUNT_KEY）")
+    parser.add_argument("--openai-batch", action="store_true",
+                       help="OpenAI Batch APIで全ユーザーの分析をまとめて実行（完了まで最大24時間。"
+                            "GitHub Actionsのジョブ上限6時間を超えるため、PICKLES_BATCH_TIMEOUTを短くすること）")
+    parser.add_argument("--refresh-notion-databases", action="store_true",
+                       help="キャッシュ済みのNotionデータベース選択を破棄して再検索（通常は24時間で自動的に再検索）")
 
     args = parser.parse_args()
 
+    # 事前取得と各ユーザーの分析（main.pyの子プロセス・Batch API実行）で同じ認証情報を使う
+    if args.service_account_key:
+        os.environ["GOOGLE_SERVICE_ACCOUNT_KEY"] = args.service_account_key
+
     try:
         logger.start("Google Sheets読み込み開始", "sheets",
                     spreadsheet_id=args.spreadsheet_id)
@@ -281,18 +432,27 @@ def main():
             logger.info(f"バッチ{args.batch_id}/{args.total_batches}で処理", "execution",
                        batch_users=len(users))
 
-        # 3. 各ユーザーに対して実行
+        # 3. Google Docsユーザーの文書をまとめて事前取得
+        prefetch_gdocs_documents(users, args.service_account_key)
+
+        # 4. 各ユーザーに対して実行
         success_count = 0
         total_count = len(users)
 
         logger.info(f"📊 {total_count}人のユーザーに対して分析実行", "execution")
 
-        for i, user in enumerate(users, 1):
-            logger.info(f"[{i}/{total_count}] {mask_name(user.user_name)}", "execution")
+        if args.openai_batch:
+            success_count = execute_pickles_with_openai_batch(users, args.analysis,
+                                                              args.delivery, args.days,
+                                                              args.refresh_notion_databases)
+        else:
+            for i, user in enumerate(users, 1):
+                logger.info(f"[{i}/{total_count}] {mask_name(user.user_name)}", "execution")
 
-            if execute_pickles_for_user(user, args.analysis,
-                                       args.delivery, args.days):
-                success_count += 1
+                if execute_pickles_for_user(user, args.analysis,
+                                           args.delivery, args.days,
+                                           args.refresh_notion_databases):
+                    success_count += 1
 
         # 結果サマリー
         logger.info("実行結果サマリー", "execution",
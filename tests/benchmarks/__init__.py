@@ -0,0 +1 @@
+# ベンチマークスクリプト
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""コンテキスト付きプロンプトの直近7日間重複排除ベンチマーク
+
+30日間（1日1エントリ）の合成日誌から、DomiPrompts・AgaPromptsのcreate_context_promptで
+プロンプトを作成し、直近7日間をコンテキスト側にも全文で含めていた旧形式と入力トークン数を比較する。
+あわせて、すべてのエントリ本文がプロンプトにちょうど1回ずつ含まれることを確認する。
+
+実行方法:
+    uv run python tests/benchmarks/context_prompt_benchmark.py
+"""
+import io
+import os
+import sys
+import random
+import datetime
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+os.environ["PICKLES_TEST_MODE"] = "1"
+os.environ["PICKLES_CACHE_DISABLED"] = "1"
+
+from throughput import DocumentAnalyzer, TokenBudget
+from utils import AnalysisTypes
+
+DAYS = 30
+WEEK_DAYS = 7
+
+
+def build_entries(days: int = DAYS, seed: int = 0) -> list:
+    """1日1エントリの日誌（新しい順）を生成"""
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    phrases = ["朝から散歩に出かけた。", "仕事で新しい課題に向き合った。", "友人と長く話し込んだ。",
+               "本を読みながら考えごとをした。", "夕方の光がきれいだった。"]
+    return [{
+        "date": (today - datetime.timedelta(days=offset)).isoformat(),
+        "title": f"日誌 {offset}",
+        "text": f"[{offset}] " + "".join(rng.choice(phrases) for _ in range(rng.randint(20, 60)))
+    } for offset in range(days)]
+
+
+def main():
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = DocumentAnalyzer(user_name="テスト", language="japanese")
+    context_data = build_entries()
+    cutoff = (datetime.date.today() - datetime.timedelta(days=WEEK_DAYS)).isoformat()
+    week_data = [item for item in context_data if item["date"] >= cutoff]
+
+    print(f"entries: {len(context_data)} (week: {len(week_data)})")
+    print(f"{'prompt':<8}{'before tokens':>15}{'after tokens':>14}{'reduction':>11}")
+
+    for analysis_type in (AnalysisTypes.DOMI, AnalysisTypes.AGA):
+        with contextlib.redirect_stdout(io.StringIO()):
+            week = analyzer._format_data_for_analysis(week_data)
+            before = analyzer._create_context_analysis_prompt(
+                week, analyzer._format_data_for_analysis(context_data), analysis_type, "japanese")
+            after = analyzer._create_context_analysis_prompt(
+                week, analyzer._format_context_data(context_data, week_data), analysis_type, "japanese")
+
+        # すべてのエントリが重複なく含まれることを確認
+        for item in context_data:
+            assert after.count(item["text"]) == 1, f"エントリが1回だけ含まれていません: {item['date']}"
+
+        before_tokens, after_tokens = TokenBudget.estimate_tokens(before), TokenBudget.estimate_tokens(after)
+        print(f"{analysis_type:<8}{before_tokens:>15,}{after_tokens:>14,}{1 - after_tokens / before_tokens:>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Google Docs日誌パーサーのベンチマーク
+
+10年分（1日1エントリ）の日誌を1つのドキュメントに書き続けた場合を想定した
+合成ドキュメントで、旧実装（文字列の逐次連結・未コンパイル正規表現・エントリごとの日付パース）と
+現在のGdocsInputのパーサーを比較する。両者の抽出結果が一致することも確認する。
+
+- current: ドキュメントJSONから段落抽出・日付ヘッダー索引作成・末尾からのパースまで
+- cached: キャッシュ済みの段落と索引を使い、末尾からのパースのみ（リビジョン未変更時）
+
+実行方法:
+    uv run python tests/benchmarks/gdocs_parser_benchmark.py
+"""
+import io
+import os
+import re
+import sys
+import time
+import random
+import datetime
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from inputs.gdocs_input import GdocsInput
+
+YEARS = 10
+PARAGRAPHS_PER_ENTRY = 6
+WINDOWS = (7, 30, 365)
+
+
+def build_document(years: int = YEARS, seed: int = 0) -> dict:
+    """1日1エントリの日誌ドキュメント（Docs APIのdocuments.get形式）を生成"""
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    start = today - datetime.timedelta(days=365 * years)
+    content = [{"sectionBreak": {}}]
+
+    for offset in range(365 * years + 1):
+        day = start + datetime.timedelta(days=offset)
+        content.append(paragraph([f"# {day.isoformat()}\n"]))
+        for n in range(PARAGRAPHS_PER_ENTRY):
+            # 書式の切り替えで1段落が複数のtextRunに分かれるケースを含める
+            words = " ".join(rng.choice(["今日は", "仕事", "散歩", "読書", "考えた", "focus", "meeting"]) for _ in range(20))
+            content.append(paragraph([f"{words} ", f"({n})\n"]))
+        content.append(paragraph(["\n"]))
+
+    return {"title": "10 Year Journal", "body": {"content": content}}
+
+
+def paragraph(runs):
+    return {"paragraph": {"elements": [{"textRun": {"content": run}} for run in runs]}}
+
+
+def legacy_parse(document: dict, cutoff_date: str):
+    """旧実装のパーサー（比較用）"""
+    content = document.get('body', {}).get('content', [])
+    entries = []
+    current_entry = None
+
+    def is_recent(entry_date):
+        try:
+            return (datetime.datetime.strptime(entry_date, '%Y-%m-%d')
+                    >= datetime.datetime.strptime(cutoff_date, '%Y-%m-%d'))
+        except ValueError:
+            return False
+
+    for element in content:
+        if 'paragraph' in element:
+            text_content = ''.join(
+                e['textRun'].get('content', '') for e in element['paragraph'].get('elements', []) if 'textRun' in e
+            )
+            if not text_content.strip():
+                continue
+            date_match = re.match(r'^#\s*(\d{4}-\d{2}-\d{2})', text_content.strip())
+            if date_match:
+                if current_entry and is_recent(current_entry['date']):
+                    entries.append(current_entry)
+                entry_date = date_match.group(1)
+                current_entry = {'date': entry_date, 'title': f"Journal Entry {entry_date}", 'text': ""}
+            elif current_entry:
+                if current_entry['text']:
+                    current_entry['text'] += "\n"
+                current_entry['text'] += text_content
+
+    if current_entry and is_recent(current_entry['date']):
+        entries.append(current_entry)
+    entries.sort(key=lambda x: x['date'], reverse=True)
+    return entries
+
+
+def timed(func, *args, repeat: int = 3):
+    """最速の実行時間（ミリ秒）と結果を返す"""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    document = build_document()
+    paragraph_count = len(document["body"]["content"]) - 1
+    gdocs = GdocsInput.__new__(GdocsInput)
+
+    print(f"合成ドキュメント: {YEARS}年分 / {paragraph_count:,}段落")
+    print(f"{'days':>6}{'entries':>10}{'legacy ms':>12}{'current ms':>12}{'cached ms':>12}{'speedup':>10}")
+
+    paragraphs = [text for text in gdocs._extract_paragraph_texts(document) if text.strip()]
+    header_index = gdocs._build_header_index(paragraphs)
+
+    for days in WINDOWS:
+        cutoff_date = GdocsInput._calculate_cutoff_date(days)
+        legacy_ms, expected = timed(legacy_parse, document, cutoff_date)
+        # パース完了ログは計測結果の表示を崩すため出力しない
+        with contextlib.redirect_stdout(io.StringIO()):
+            current_ms, actual = timed(gdocs._parse_document_content, document, cutoff_date)
+            cached_ms, cached = timed(gdocs._parse_from_tail, paragraphs, header_index, cutoff_date)
+            full_scan = gdocs._parse_paragraphs(paragraphs, cutoff_date)
+
+        assert actual == expected, f"抽出結果が旧実装と一致しません（days={days}）"
+        assert cached == full_scan == expected, f"末尾からのパース結果が全体走査と一致しません（days={days}）"
+        print(f"{days:>6}{len(actual):>10}{legacy_ms:>12.1f}{current_ms:>12.1f}{cached_ms:>12.2f}"
+              f"{legacy_ms / cached_ms:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
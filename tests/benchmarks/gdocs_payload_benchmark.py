@@ -0,0 +1,67 @@
+"""Google Docs取得時のフィールドマスクによるペイロード削減ベンチマーク
+
+記録済みのモックドキュメント（tests/fixtures/mock_data/gdocs）に、GdocsInputが指定する
+fieldsマスクを適用した部分レスポンス、Drive APIのtext/plainエクスポート、documents.getの
+全体レスポンスのサイズを比較する。あわせて、部分レスポンスとテキストエクスポートからの
+抽出結果が全体レスポンスと一致することを確認する。
+
+実行方法:
+    uv run python tests/benchmarks/gdocs_payload_benchmark.py
+"""
+import io
+import os
+import sys
+import json
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from inputs.gdocs_input import GdocsInput
+from tests.fixtures.mock_handlers import apply_field_mask, export_document_as_text
+
+MOCK_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fixtures", "mock_data", "gdocs")
+
+# 取得対象期間（日誌全体が含まれる十分に長い期間）
+DAYS = 365 * 20
+
+
+def payload_size(document: dict) -> int:
+    """APIレスポンスとしてのJSONバイト数"""
+    return len(json.dumps(document, ensure_ascii=False).encode("utf-8"))
+
+
+def parse_exported_text(gdocs: GdocsInput, exported: bytes, cutoff_date: str):
+    """テキストエクスポートを行単位のパーサーで抽出（_iter_exported_paragraphsと同じ行の扱い）"""
+    text = exported.decode("utf-8-sig")
+    paragraphs = [gdocs._normalize_exported_line(line) for line in text.split("\n")]
+    paragraphs = [p for p in paragraphs if p.strip()]
+    return gdocs._parse_from_tail(paragraphs, gdocs._build_header_index(paragraphs), cutoff_date)
+
+
+def main():
+    gdocs = GdocsInput.__new__(GdocsInput)
+    cutoff_date = GdocsInput._calculate_cutoff_date(DAYS)
+    print(f"fields: {GdocsInput.DOCUMENT_FIELDS}")
+    print(f"{'fixture':<24}{'full bytes':>12}{'masked bytes':>14}{'reduction':>11}"
+          f"{'text bytes':>12}{'reduction':>11}")
+
+    for filename in sorted(f for f in os.listdir(MOCK_DATA_DIR) if f.endswith(".json")):
+        with open(os.path.join(MOCK_DATA_DIR, filename), encoding="utf-8") as f:
+            document = json.load(f)
+        masked = apply_field_mask(document, GdocsInput.DOCUMENT_FIELDS)
+        exported = export_document_as_text(document)
+
+        # 抽出結果が変わらないことを確認（パース時のログは表示しない）
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = gdocs._parse_document_content(document, cutoff_date)
+            assert gdocs._parse_document_content(masked, cutoff_date) == expected, f"抽出結果が一致しません: {filename}"
+            assert parse_exported_text(gdocs, exported, cutoff_date) == expected, \
+                f"テキストエクスポートの抽出結果が一致しません: {filename}"
+
+        full_bytes, masked_bytes, text_bytes = payload_size(document), payload_size(masked), len(exported)
+        print(f"{filename:<24}{full_bytes:>12,}{masked_bytes:>14,}{1 - masked_bytes / full_bytes:>11.1%}"
+              f"{text_bytes:>12,}{1 - text_bytes / full_bytes:>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
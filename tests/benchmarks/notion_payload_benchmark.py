@@ -0,0 +1,96 @@
+"""Notionデータベースクエリのペイロード削減ベンチマーク
+
+記録済みのNotion APIレスポンス（tests/fixtures/mock_data/notion_database）にある、
+リレーション・ロールアップ・数式などを含む日誌テンプレートのデータベースのスキーマと行を使い、
+filter_propertiesで必要なプロパティだけを要求した場合との転送量・JSONデコード時間を比較する。
+
+実行方法:
+    uv run python tests/benchmarks/notion_payload_benchmark.py
+"""
+import io
+import os
+import sys
+import json
+import time
+import contextlib
+from types import SimpleNamespace
+from urllib.parse import unquote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# スキーマをローカルキャッシュに書き込まない
+os.environ["PICKLES_CACHE_DISABLED"] = "1"
+
+from inputs.notion_input import NotionInput
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fixtures", "mock_data",
+                            "notion_database", "journal_database.json")
+
+# 1回のクエリで返る行数（Notion APIのpage_size上限）
+ROWS_PER_QUERY = 100
+DECODE_ITERATIONS = 50
+
+
+def load_recorded_database():
+    """記録済みのdatabases.retrieveとdatabases.queryのレスポンスを読み込む"""
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        recorded = json.load(f)
+    return recorded["database"], recorded["query"]["results"]
+
+
+def repeat_rows(rows, count):
+    """記録済みの行を1クエリ分の行数まで繰り返す（ページIDは行ごとに変える）"""
+    return [{**rows[i % len(rows)], "id": f"{rows[i % len(rows)]['id'][:-4]}{i:04d}"} for i in range(count)]
+
+
+def trim_row(row, property_ids):
+    """filter_properties指定時にサーバーが返す行を再現"""
+    return {**row, "properties": {
+        name: prop for name, prop in row["properties"].items() if unquote(prop["id"]) in property_ids
+    }}
+
+
+def measure(payload):
+    """JSONのバイト数と1回あたりのデコード時間（ミリ秒）を計測"""
+    encoded = json.dumps(payload, ensure_ascii=False)
+    started = time.perf_counter()
+    for _ in range(DECODE_ITERATIONS):
+        json.loads(encoded)
+    elapsed_ms = (time.perf_counter() - started) / DECODE_ITERATIONS * 1000
+    return len(encoded.encode("utf-8")), elapsed_ms
+
+
+def main():
+    database, recorded_rows = load_recorded_database()
+
+    # 記録済みのスキーマから、実際のクエリと同じ手順で取得するプロパティを決める
+    with contextlib.redirect_stdout(io.StringIO()):
+        notion = NotionInput(api_key="secret_benchmark")
+        notion._client = SimpleNamespace(databases=SimpleNamespace(retrieve=lambda database_id: database))
+        schema = notion._resolve_database_schema(database["id"])
+    property_ids = set(notion._select_property_ids(schema))
+
+    rows = repeat_rows(recorded_rows, ROWS_PER_QUERY)
+    trimmed_rows = [trim_row(row, property_ids) for row in rows]
+
+    # 絞り込み後も抽出結果が変わらないことを確認（抽出時のデバッグログは表示しない）
+    with contextlib.redirect_stdout(io.StringIO()):
+        for row, trimmed in zip(rows, trimmed_rows):
+            assert notion._extract_database_title(row) == notion._extract_database_title(trimmed)
+            assert (notion._extract_database_content_from_properties(row)
+                    == notion._extract_database_content_from_properties(trimmed))
+            assert notion._extract_date_property(row) == notion._extract_date_property(trimmed)
+
+    full_bytes, full_ms = measure({"results": rows, "has_more": False})
+    trimmed_bytes, trimmed_ms = measure({"results": trimmed_rows, "has_more": False})
+
+    print(f"記録済みの行数: {len(recorded_rows)} / 1クエリあたりの行数: {ROWS_PER_QUERY}")
+    print(f"取得プロパティ: {len(property_ids)}/{len(schema['properties'])}")
+    print(f"{'':<20}{'bytes':>12}{'bytes/row':>12}{'decode ms':>12}")
+    print(f"{'全プロパティ':<14}{full_bytes:>12,}{full_bytes // ROWS_PER_QUERY:>12,}{full_ms:>12.2f}")
+    print(f"{'filter_properties':<20}{trimmed_bytes:>12,}{trimmed_bytes // ROWS_PER_QUERY:>12,}{trimmed_ms:>12.2f}")
+    print(f"削減率: {1 - trimmed_bytes / full_bytes:.1%}（デコード時間 {1 - trimmed_ms / full_ms:.1%}）")
+
+
+if __name__ == "__main__":
+    main()
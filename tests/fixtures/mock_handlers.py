@@ -1,7 +1,11 @@
 """テスト用モックハンドラー"""
 import os
+import re
+import copy
 import json
 from unittest.mock import Mock
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpMockSequence, HttpRequest
 from functools import lru_cache
 
 
@@ -115,7 +119,7 @@ def mock_notion_api():
             })
             
             # blocks.children.list()のモック
-            def mock_blocks_list(page_id):
+            def mock_blocks_list(page_id, **kwargs):
                 # 対応するドキュメントを検索
                 matching_doc = None
                 for doc in self._mock_data.get("documents", []):
@@ -175,9 +179,183 @@ def mock_openai_api():
                 ]
             })
             
-            # createメソッドのモック
-            self.responses.create = Mock(return_value=mock_response)
-    
+            # createメソッドのモック（stream=Trueの場合はテキスト断片のイベント列を返す）
+            def mock_create(stream=False, **kwargs):
+                if not stream:
+                    return mock_response
+                text = mock_response.to_dict()["output"][0]["content"][0]["text"]
+                deltas = [text[i:i + 16] for i in range(0, len(text), 16)]
+                return iter([Mock(type="response.created")]
+                            + [Mock(type="response.output_text.delta", delta=delta) for delta in deltas]
+                            + [Mock(type="response.completed", response=mock_response)])
+            
+            self.responses.create = Mock(side_effect=mock_create)
+
+            # Batch APIのモック（アップロードされたJSONLの各リクエストにmock_responseを返す）
+            files = {}
+            batches = {}
+
+            def mock_files_create(file=None, purpose=None):
+                file_id = f"file-mock-{len(files)}"
+                files[file_id] = file[1].decode("utf-8") if isinstance(file, tuple) else file.read().decode("utf-8")
+                return Mock(id=file_id, purpose=purpose)
+
+            def mock_files_content(file_id):
+                return Mock(text=files[file_id])
+
+            def mock_batches_create(input_file_id=None, endpoint=None, completion_window=None, **kwargs):
+                batch_id = f"batch-mock-{len(batches)}"
+                requests = [json.loads(line) for line in files[input_file_id].splitlines() if line.strip()]
+                output_file_id = f"file-mock-{len(files)}"
+                files[output_file_id] = "".join(json.dumps({
+                    "id": f"batch_req_{i}",
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 200, "request_id": f"req_{i}", "body": mock_response.to_dict()},
+                    "error": None
+                }, ensure_ascii=False) + "\n" for i, request in enumerate(requests))
+                batches[batch_id] = {"polls": 0, "total": len(requests), "output_file_id": output_file_id}
+                return Mock(id=batch_id, status="validating")
+
+            # 1回目の確認では処理中、2回目以降は完了を返す
+            def mock_batches_retrieve(batch_id):
+                batch = batches[batch_id]
+                batch["polls"] += 1
+                completed = batch["polls"] > 1
+                return Mock(id=batch_id,
+                            status="completed" if completed else "in_progress",
+                            output_file_id=batch["output_file_id"] if completed else None,
+                            error_file_id=None,
+                            request_counts=Mock(total=batch["total"], completed=batch["total"] if completed else 0,
+                                                failed=0))
+
+            def mock_batches_cancel(batch_id):
+                batches[batch_id]["cancelled"] = True
+                return Mock(id=batch_id, status="cancelling")
+
+            self.files = Mock()
+            self.files.create = Mock(side_effect=mock_files_create)
+            self.files.content = Mock(side_effect=mock_files_content)
+            self.batches = Mock()
+            self.batches.create = Mock(side_effect=mock_batches_create)
+            self.batches.retrieve = Mock(side_effect=mock_batches_retrieve)
+            self.batches.cancel = Mock(side_effect=mock_batches_cancel)
+
     return MockOpenAI
 
 
+def load_available_gdocs_mock_data():
+    """tests/fixtures/mock_data/gdocs/ にあるGoogle Docsのモックドキュメントを読み込み"""
+    gdocs_dir = os.path.join(os.path.dirname(__file__), "mock_data", "gdocs")
+    json_files = sorted(f for f in os.listdir(gdocs_dir) if f.endswith('.json')) if os.path.exists(gdocs_dir) else []
+    
+    # ファイル存在チェック（早期リターン）
+    if not json_files:
+        raise FileNotFoundError(f"No Google Docs mock data files found in {gdocs_dir}.")
+    
+    document = _load_cached_mock_data(os.path.join(gdocs_dir, json_files[0]))
+    print(f"[MOCK] Using available Google Docs mock data: {json_files[0]} ({len(document['body']['content'])} elements)")
+    return document
+
+
+def apply_field_mask(data, fields: str):
+    """Google APIのfieldsパラメータ（部分レスポンス）をデータに適用"""
+    return _select_fields(data, _parse_field_mask(fields))
+
+
+def _parse_field_mask(fields: str) -> dict:
+    """'a.b,c(d,e.f)' 形式のフィールドマスクを木構造に変換（空のdictは値全体を選択）"""
+    tree = {}
+    depth, start, items = 0, 0, []
+    for i, char in enumerate(fields):
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if char == "," and depth == 0:
+            items.append(fields[start:i])
+            start = i + 1
+    items.append(fields[start:])
+    
+    for item in filter(None, (item.strip() for item in items)):
+        path, _, inner = item.partition("(")
+        node = tree
+        for key in re.split(r"[./]", path):
+            node = node.setdefault(key, {})
+        if inner:
+            node.update(_parse_field_mask(inner[:-1]))
+    return tree
+
+
+def _select_fields(data, tree: dict):
+    if not tree:
+        return data
+    if isinstance(data, list):
+        return [_select_fields(item, tree) for item in data]
+    if isinstance(data, dict):
+        return {key: _select_fields(data[key], sub_tree) for key, sub_tree in tree.items() if key in data}
+    return data
+
+
+def export_document_as_text(document: dict) -> bytes:
+    """Drive APIのtext/plainエクスポートを再現
+    
+    BOM付きUTF-8、CRLF改行で、画像などのテキスト以外は除外する。箇条書きの段落は
+    ネストの深さに応じた字下げと「* 」を先頭に付け、ソフト改行（\\u000b）は改行として出力する。
+    """
+    lines = []
+    for element in document.get("body", {}).get("content", []):
+        paragraph = element.get("paragraph", {})
+        text = "".join(paragraph_element.get("textRun", {}).get("content", "")
+                       for paragraph_element in paragraph.get("elements", []))
+        if "bullet" in paragraph and text.strip():
+            text = "    " * paragraph["bullet"].get("nestingLevel", 0) + "* " + text
+        lines.append(text.replace("\u000b", "\n"))
+    return ("\ufeff" + "".join(lines).replace("\n", "\r\n")).encode("utf-8")
+
+
+def mock_google_api():
+    """Google APIのモック - Docsは利用可能なモックドキュメントを使用"""
+    document = load_available_gdocs_mock_data()
+    
+    class MockGoogleService:
+        def __init__(self):
+            self._document = document
+            # Drive APIのファイル情報（versionは閲覧者にも返る）
+            self._file = {"name": document.get("title"), "version": "1",
+                          "mimeType": "application/vnd.google-apps.document"}
+            
+            # documents().get()のモック（fieldsによる部分レスポンスに対応）
+            def mock_get_document(documentId=None, fields=None, **kwargs):
+                result = apply_field_mask(self._document, fields) if fields else self._document
+                return Mock(execute=Mock(return_value=copy.deepcopy(result)))
+            
+            # files().get()のモック（fieldsによる部分レスポンスに対応）
+            def mock_get_file(fileId=None, fields=None, **kwargs):
+                result = apply_field_mask(self._file, fields) if fields else self._file
+                return Mock(execute=Mock(return_value=copy.deepcopy(result)))
+            
+            # files().export_media()のモック（MediaIoBaseDownloadで受信できる実際のHttpRequestを返す）
+            def mock_export_media(fileId=None, mimeType=None):
+                http = HttpMockSequence([({"status": "200"}, export_document_as_text(self._document))])
+                return HttpRequest(http, lambda resp, content: content,
+                                   f"https://www.googleapis.com/drive/v3/files/{fileId}/export?mimeType={mimeType}")
+            
+            # new_batch_http_request()のモック（追加された呼び出しを順に実行し、結果をcallbackに渡す）
+            def mock_new_batch_http_request(callback=None):
+                requests = []
+                
+                def execute():
+                    for request, request_id in requests:
+                        try:
+                            response, exception = request.execute(), None
+                        except HttpError as e:
+                            response, exception = None, e
+                        callback(request_id, response, exception)
+                
+                return Mock(add=Mock(side_effect=lambda request, request_id=None: requests.append((request, request_id))),
+                            execute=Mock(side_effect=execute))
+            
+            self.documents = Mock(return_value=Mock(get=Mock(side_effect=mock_get_document)))
+            self.new_batch_http_request = Mock(side_effect=mock_new_batch_http_request)
+            self.files = Mock(return_value=Mock(get=Mock(side_effect=mock_get_file),
+                                                export_media=Mock(side_effect=mock_export_media)))
+            self.spreadsheets = Mock()
+    
+    return MockGoogleService
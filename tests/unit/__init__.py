@@ -0,0 +1 @@
+# ユニットテスト
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""ユニットテスト共通のフィクスチャ"""
+from unittest.mock import Mock
+import pytest
+from inputs.notion_input import NotionInput
+
+
+@pytest.fixture(autouse=True)
+def isolated_environment(monkeypatch, tmp_path):
+    """モックモードで実行し、ローカルキャッシュをテストごとに分離"""
+    monkeypatch.setenv("PICKLES_TEST_MODE", "1")
+    monkeypatch.setenv("PICKLES_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("PICKLES_CACHE_DISABLED", raising=False)
+    return tmp_path
+
+
+@pytest.fixture
+def make_notion_input():
+    """Notion APIクライアントをスタブしたNotionInputを作る
+
+    bodiesはページIDごとのページ本文（空・未登録のページは本文なし）、entriesはデータベースクエリの結果。
+    """
+    def make(bodies: dict = None, entries: list = (), **options) -> NotionInput:
+        bodies = {} if bodies is None else bodies
+        notion_input = NotionInput(api_key="secret_unit_test", **options)
+        notion_input._client = Mock()
+        notion_input._client.databases.query = Mock(return_value={"results": list(entries), "has_more": False})
+        notion_input._client.blocks.children.list = Mock(side_effect=lambda page_id, **kwargs: {
+            "results": [{"type": "paragraph", "paragraph": {"rich_text": [{"plain_text": bodies[page_id]}]}}]
+            if bodies.get(page_id) else []
+        })
+        notion_input._client.stats = Mock(return_value={})
+        return notion_input
+    return make
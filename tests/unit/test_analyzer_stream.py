@@ -0,0 +1,28 @@
+"""AI応答のストリーミング受信の有効・無効の判定のテスト"""
+from datetime import date
+import pytest
+from throughput import DocumentAnalyzer
+
+JOURNAL = [{"date": date.today().isoformat(), "text": "朝から散歩に出かけて、気持ちのよい一日だった。"}]
+
+
+@pytest.mark.parametrize("env_stream, interactive, expected", [
+    (None, False, False),
+    (None, True, True),
+    ("1", False, True),
+    ("0", True, False),
+], ids=["default-batch", "default-console", "env-on", "env-off"])
+def test_streams_only_for_interactive_console_unless_configured(monkeypatch, env_stream, interactive, expected):
+    """未設定時は生成中の表示先がある場合のみストリーミングし、環境変数の指定があればそれに従う"""
+    if env_stream is None:
+        monkeypatch.delenv("PICKLES_OPENAI_STREAM", raising=False)
+    else:
+        monkeypatch.setenv("PICKLES_OPENAI_STREAM", env_stream)
+    deltas = []
+
+    analyzer = DocumentAnalyzer(user_name="テスト", language="japanese", use_cache=False)
+    analyzer.analyze_documents(JOURNAL, analysis_type="domi", language="japanese",
+                               on_text_delta=deltas.append if interactive else None)
+
+    assert bool(analyzer._client.responses.create.call_args.kwargs.get("stream")) == expected
+    assert bool(deltas) == (expected and interactive)
@@ -0,0 +1,117 @@
+"""OpenAI Batch APIによる一括分析のテスト（モックのBatch APIを使用）"""
+import json
+from unittest.mock import Mock
+import pytest
+from throughput import BatchAnalysisClient, BatchAnalysisError, DocumentAnalyzer
+
+MESSAGES = [{"role": "user", "content": "今週の日誌を分析してください"}]
+
+
+@pytest.fixture
+def client():
+    return BatchAnalysisClient(poll_interval=0)
+
+
+@pytest.fixture
+def request_body():
+    return DocumentAnalyzer(user_name="テスト").build_request_body(MESSAGES)
+
+
+def rewrite_results(client: BatchAnalysisClient, keep_ids: set, error_lines: list):
+    """完了したバッチの結果ファイルを、指定したcustom_idの成功結果とエラー結果に差し替える"""
+    retrieve = client._client.batches.retrieve
+
+    def retrieve_with_errors(batch_id):
+        batch = retrieve(batch_id)
+        if batch.status != "completed":
+            return batch
+        lines = [line for line in client._client.files.content(batch.output_file_id).text.splitlines()
+                 if json.loads(line)["custom_id"] in keep_ids]
+        output = client._client.files.create(file=("output.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+        errors = client._client.files.create(
+            file=("errors.jsonl", "\n".join(json.dumps(line) for line in error_lines).encode("utf-8")),
+            purpose="batch")
+        return Mock(id=batch_id, status="completed", output_file_id=output.id, error_file_id=errors.id)
+
+    client._client.batches.retrieve = Mock(side_effect=retrieve_with_errors)
+
+
+def test_results_are_mapped_to_custom_ids(client, request_body):
+    """すべてのリクエストの応答をcustom_idごとに返し、インサイトとして解析できる"""
+    results = client.run({"run-1": request_body, "run-2": request_body})
+
+    assert set(results) == {"run-1", "run-2"}
+    assert all(result["error"] is None for result in results.values())
+    insights = DocumentAnalyzer().parse_response_body(results["run-2"]["body"])
+    assert "モックデータでの分析結果" in insights
+
+    uploaded = client._client.files.create.call_args_list[0].kwargs["file"][1].decode("utf-8")
+    lines = [json.loads(line) for line in uploaded.splitlines()]
+    assert [line["custom_id"] for line in lines] == ["run-1", "run-2"]
+    assert {line["url"] for line in lines} == {BatchAnalysisClient.ENDPOINT}
+
+
+def test_errored_and_missing_custom_ids_are_failures(client, request_body):
+    """エラーファイルの結果と、結果ファイルに含まれないリクエストは失敗として返す"""
+    rewrite_results(client, keep_ids={"run-1"}, error_lines=[
+        {"custom_id": "run-2", "response": {"status_code": 400, "body": {"error": {"message": "invalid"}}},
+         "error": None},
+        {"custom_id": "run-3", "response": None, "error": {"code": "batch_expired", "message": "expired"}},
+    ])
+
+    results = client.run({f"run-{i}": request_body for i in range(1, 5)})
+
+    assert results["run-1"]["error"] is None and results["run-1"]["body"]
+    assert results["run-2"] == {"body": None, "error": {"message": "invalid"}}
+    assert results["run-3"] == {"body": None, "error": {"code": "batch_expired", "message": "expired"}}
+    assert results["run-4"]["body"] is None and results["run-4"]["error"]
+
+
+def test_unfinished_batch_raises(client, request_body):
+    """バッチが完了せずに終了した場合（期限切れなど）はBatchAnalysisErrorを送出する"""
+    client._client.batches.retrieve = Mock(return_value=Mock(status="expired"))
+
+    with pytest.raises(BatchAnalysisError):
+        client.run({"run-1": request_body})
+
+
+@pytest.mark.parametrize("error, retrieve", [
+    (BatchAnalysisError, Mock(return_value=Mock(status="in_progress", request_counts=None))),
+    (KeyboardInterrupt, Mock(side_effect=KeyboardInterrupt)),
+])
+def test_abandoned_batch_is_cancelled(request_body, error, retrieve):
+    """完了待ちがタイムアウト・中断した場合は、バッチジョブを取り消してから例外を送出する"""
+    client = BatchAnalysisClient(poll_interval=0, timeout=-1)
+    client._client.batches.retrieve = retrieve
+
+    with pytest.raises(error):
+        client.run({"run-1": request_body})
+
+    client._client.batches.cancel.assert_called_once_with("batch-mock-0")
+
+
+def test_preparation_failure_of_one_user_does_not_stop_batch(monkeypatch):
+    """1人のユーザーのプロンプト作成で例外が起きても、他のユーザーの分析は完了する"""
+    import read_spreadsheet_and_execute as execution
+    from models.user import User
+
+    class FakePicklesSystem:
+        def __init__(self, user_config, **kwargs):
+            if user_config["user_name"] == "失敗ユーザー":
+                raise RuntimeError("Supabase接続エラー")
+
+        def prepare_analysis(self, user_id, **kwargs):
+            return {"analysis_run": Mock(id=f"run-{user_id}"), "analysis": {"messages": None}}
+
+        def build_request_body(self, prepared):
+            return None
+
+        def complete_analysis(self, prepared, response_body=None, delivery_methods=None):
+            return {"console": "配信完了"}
+
+    monkeypatch.setattr(execution, "PicklesSystem", FakePicklesSystem)
+    monkeypatch.setattr(User, "update_last_analysis_at", lambda self: None)
+    users = [User(id=user_id, email=f"{user_id}@example.com", user_name=name, notion_api_key="secret_test")
+             for user_id, name in [("user-1", "失敗ユーザー"), ("user-2", "成功ユーザー")]]
+
+    assert execution.execute_pickles_with_openai_batch(users, "domi", "console") == 1
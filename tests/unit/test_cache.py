@@ -0,0 +1,115 @@
+"""ローカルキャッシュとNotionページキャッシュのテスト"""
+import itertools
+import pytest
+from types import SimpleNamespace
+from inputs.notion_input import NotionInput
+from utils import CacheStore, cache_store, fingerprint
+
+
+def test_cache_store_evicts_least_recently_used(monkeypatch):
+    """上限を超えた場合は最終アクセスが最も古いエントリから追い出す"""
+    clock = itertools.count(1, CacheStore.ACCESS_UPDATE_INTERVAL)
+    monkeypatch.setattr(cache_store, "time", SimpleNamespace(time=lambda: float(next(clock))))
+    store = CacheStore("lru_test", max_entries=3)
+
+    for key in ("a", "b", "c"):
+        store.set(key, key)
+    assert store.get("a") == "a"  # aに最近アクセスしたため、最も古いのはb
+    store.set("d", "d")
+
+    assert store.get("b") is None
+    assert [store.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+
+
+def test_cache_store_updates_access_time_at_most_once_per_interval(monkeypatch):
+    """最終アクセス日時は更新間隔を過ぎた読み込みでのみ書き込み、接続は操作ごとに閉じる"""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cache_store, "time", SimpleNamespace(time=lambda: clock.now))
+    connections = []
+    connect = cache_store.sqlite3.connect
+
+    def record_connect(*args, **kwargs):
+        connections.append(connect(*args, **kwargs))
+        return connections[-1]
+
+    monkeypatch.setattr(cache_store.sqlite3, "connect", record_connect)
+    store = CacheStore("access_test")
+    store.set("key", "value")
+
+    def accessed_at():
+        with store._connect() as conn:
+            return conn.execute("select accessed_at from cache_entries where key = 'key'").fetchone()[0]
+
+    clock.now += CacheStore.ACCESS_UPDATE_INTERVAL - 1
+    assert store.get("key") == "value"
+    assert accessed_at() == 1000.0
+
+    clock.now += 1
+    assert store.get("key") == "value"
+    assert accessed_at() == clock.now
+
+    for conn in connections:
+        with pytest.raises(cache_store.sqlite3.ProgrammingError):
+            conn.execute("select 1")
+
+
+def test_cache_store_max_age():
+    """有効秒数を超えたエントリは存在しないものとして扱う"""
+    store = CacheStore("max_age_test")
+    store.set("key", {"value": 1})
+
+    assert store.get("key", max_age=60) == {"value": 1}
+    assert store.get("key", max_age=-1) is None
+
+
+def make_page(last_edited_time: str) -> dict:
+    return {
+        "id": "page-cache-1",
+        "created_time": "2026-10-10T00:00:00.000Z",
+        "last_edited_time": last_edited_time,
+        "properties": {"title": {"type": "title", "title": [{"plain_text": "日誌"}]}}
+    }
+
+
+def test_page_cache_hits_while_last_edited_time_is_unchanged(make_notion_input):
+    """last_edited_timeが同じページは本文を再取得せずキャッシュを使う"""
+    bodies = {"page-cache-1": "最初の本文"}
+    notion_input = make_notion_input(bodies)
+    page = make_page("2026-10-16T09:00:00.000Z")
+
+    first = notion_input._extract_document_info(page)
+    bodies["page-cache-1"] = "APIを呼べば変わる本文"
+    second = notion_input._extract_document_info(page)
+
+    assert second["text"] == first["text"] == "最初の本文"
+    assert notion_input._client.blocks.children.list.call_count == 1
+    assert notion_input._cache_stats == {"hits": 1, "misses": 1}
+
+
+def test_page_cache_misses_when_last_edited_time_changes(make_notion_input):
+    """last_edited_timeが変わったページは本文を再取得する（別プロセスの新しいインスタンスでも同じ）"""
+    bodies = {"page-cache-1": "最初の本文"}
+    make_notion_input(bodies)._extract_document_info(make_page("2026-10-16T09:00:00.000Z"))
+
+    bodies["page-cache-1"] = "編集後の本文"
+    notion_input = make_notion_input(bodies)
+    edited = notion_input._extract_document_info(make_page("2026-10-16T09:01:00.000Z"))
+
+    assert edited["text"] == "編集後の本文"
+    assert notion_input._cache_stats == {"hits": 0, "misses": 1}
+
+
+def test_refresh_notion_databases_flag_invalidates_database_cache(monkeypatch):
+    """--refresh-notion-databasesを指定すると、キャッシュ済みのデータベース選択を破棄してから取得する"""
+    from main import PicklesSystem, parse_command_args
+
+    api_key = "secret_refresh_databases"
+    NotionInput(api_key=api_key)._database_cache.set(fingerprint(api_key), {"databases": ["db-old"]})
+    monkeypatch.setattr(NotionInput, "fetch_notion_documents", lambda self, days: [])
+
+    args = parse_command_args(["main.py", "--refresh-notion-databases"])
+    system = PicklesSystem(user_config={"notion_api_key": api_key},
+                           refresh_notion_databases=args["refresh_notion_databases"])
+    system._fetch_data("notion", 7)
+
+    assert NotionInput(api_key=api_key)._database_cache.get(fingerprint(api_key)) is None
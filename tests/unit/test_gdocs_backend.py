@@ -0,0 +1,179 @@
+"""Google Docs本文の取得方法（Docs API・テキストエクスポート）のテスト"""
+import pytest
+from inputs.gdocs_input import GdocsInput
+from tests.fixtures.mock_handlers import load_available_gdocs_mock_data
+
+DOC_URL = "https://docs.google.com/document/d/mock-gdocs-journal-0001/edit"
+
+
+@pytest.fixture
+def gdocs_input(monkeypatch):
+    """取得に使った方法とフィールド（Docs API・Drive APIの個別取得）を記録するGdocsInput"""
+    gdocs_input = GdocsInput(backend="auto")
+    gdocs_input.calls = {"fields": [], "backends": []}
+
+    get_document = gdocs_input._get_document
+    get_file = gdocs_input._get_file
+    fetch_paragraphs = gdocs_input._fetch_paragraphs
+
+    def record_get_document(doc_id, **params):
+        gdocs_input.calls["fields"].append(params.get("fields"))
+        return get_document(doc_id, **params)
+
+    def record_get_file(doc_id, **params):
+        gdocs_input.calls["fields"].append(params.get("fields"))
+        return get_file(doc_id, **params)
+
+    def record_fetch_paragraphs(doc_id, backend):
+        gdocs_input.calls["backends"].append(backend)
+        return fetch_paragraphs(doc_id, backend)
+
+    monkeypatch.setattr(gdocs_input, "_get_document", record_get_document)
+    monkeypatch.setattr(gdocs_input, "_get_file", record_get_file)
+    monkeypatch.setattr(gdocs_input, "_fetch_paragraphs", record_fetch_paragraphs)
+    return gdocs_input
+
+
+def test_first_fetch_selects_export_for_large_document(gdocs_input, monkeypatch):
+    """初回取得でも、構造要素数が閾値以上の長い文書はテキストエクスポートを使う"""
+    element_count = len(load_available_gdocs_mock_data()["body"]["content"])
+    monkeypatch.setattr(GdocsInput, "EXPORT_AUTO_MIN_PARAGRAPHS", element_count)
+
+    gdocs_input.fetch_gdocs_documents(DOC_URL, days=36500)
+
+    assert gdocs_input.calls["fields"] == [GdocsInput.VERSION_FIELDS, GdocsInput.SIZE_PROBE_FIELDS]
+    assert gdocs_input.calls["backends"] == [GdocsInput.BACKEND_EXPORT]
+
+
+def test_first_fetch_selects_docs_for_small_document(gdocs_input, monkeypatch):
+    """初回取得で構造要素数が閾値未満の文書はDocs APIを使い、以降は更新確認のみ行う"""
+    element_count = len(load_available_gdocs_mock_data()["body"]["content"])
+    monkeypatch.setattr(GdocsInput, "EXPORT_AUTO_MIN_PARAGRAPHS", element_count + 1)
+
+    gdocs_input.fetch_gdocs_documents(DOC_URL, days=36500)
+    gdocs_input.fetch_gdocs_documents(DOC_URL, days=36500)
+
+    assert gdocs_input.calls["fields"] == [GdocsInput.VERSION_FIELDS, GdocsInput.SIZE_PROBE_FIELDS,
+                                           GdocsInput.DOCUMENT_FIELDS, GdocsInput.VERSION_FIELDS]
+    assert gdocs_input.calls["backends"] == [GdocsInput.BACKEND_DOCS]
+
+
+def test_viewer_without_revision_id_reuses_cached_paragraphs(gdocs_input, monkeypatch):
+    """閲覧者にはrevisionIdが返らないが、Drive APIのversionで未更新の文書はキャッシュを使う"""
+    monkeypatch.setattr(GdocsInput, "EXPORT_AUTO_MIN_PARAGRAPHS", 10 ** 6)
+    service = gdocs_input._google_service.get_docs_service()
+    monkeypatch.setattr(service, "_document",
+                        {key: value for key, value in service._document.items() if key != "revisionId"})
+
+    first = gdocs_input.fetch_gdocs_documents(DOC_URL, days=36500)
+    second = gdocs_input.fetch_gdocs_documents(DOC_URL, days=36500)
+
+    assert second == first
+    assert gdocs_input.calls["backends"] == [GdocsInput.BACKEND_DOCS]
+    assert gdocs_input.calls["fields"][-1] == GdocsInput.VERSION_FIELDS
+
+
+def test_new_version_refetches_paragraphs(gdocs_input, monkeypatch):
+    """Drive APIのversionが変わった文書は本文を取得し直す"""
+    monkeypatch.setattr(GdocsInput, "EXPORT_AUTO_MIN_PARAGRAPHS", 10 ** 6)
+    gdocs_input.fetch_gdocs_documents(DOC_URL, days=36500)
+    monkeypatch.setitem(gdocs_input._google_service.get_drive_service()._file, "version", "2")
+
+    gdocs_input.fetch_gdocs_documents(DOC_URL, days=36500)
+
+    assert gdocs_input.calls["backends"] == [GdocsInput.BACKEND_DOCS, GdocsInput.BACKEND_DOCS]
+
+
+def fetch_entries(backend: str) -> list:
+    return GdocsInput(backend=backend).fetch_gdocs_documents(DOC_URL, days=36500)
+
+
+def make_paragraph(text: str, bullet: bool = False) -> dict:
+    paragraph = {"elements": [{"textRun": {"content": text}}]}
+    if bullet:
+        paragraph["bullet"] = {"listId": "kix.mocklist0001"}
+    return {"paragraph": paragraph}
+
+
+@pytest.fixture
+def journal_document(monkeypatch):
+    """Docs API・Drive APIのモックが返す文書を差し替える"""
+    def use(*paragraphs):
+        document = {"title": "Mock Journal", "body": {"content": list(paragraphs)}}
+        google_service = GdocsInput()._google_service
+        for service in (google_service.get_docs_service(), google_service.get_drive_service()):
+            monkeypatch.setattr(service, "_document", document)
+        return document
+    return use
+
+
+def test_export_and_docs_backends_return_identical_entries(monkeypatch, journal_document):
+    """箇条書きを含む文書で、テキストエクスポートとDocs APIの日誌エントリが一致する"""
+    monkeypatch.setenv("PICKLES_CACHE_DISABLED", "1")
+    journal_document(
+        make_paragraph("# 2025-01-15\n"),
+        make_paragraph("Productivity ideas:\n"),
+        make_paragraph("Time blocking for deep work\n", bullet=True),
+        make_paragraph("Pomodoro Technique\n", bullet=True),
+        make_paragraph("# 2025-01-16\n"),
+        make_paragraph("Reviewed system design notes\n"),
+    )
+
+    docs_entries = fetch_entries(GdocsInput.BACKEND_DOCS)
+    export_entries = fetch_entries(GdocsInput.BACKEND_EXPORT)
+
+    assert export_entries == docs_entries
+    texts = "\n".join(entry["text"] for entry in docs_entries)
+    assert "Time blocking for deep work" in texts and "* Time blocking" not in texts
+
+
+def test_docs_backend_keeps_soft_line_breaks_within_paragraph(monkeypatch, journal_document):
+    """Docs APIではソフト改行を含む段落を分割せず、そのまま1段落として扱う"""
+    monkeypatch.setenv("PICKLES_CACHE_DISABLED", "1")
+    journal_document(
+        make_paragraph("# 2025-01-15\n"),
+        make_paragraph("System design concepts to review:\u000bfocus on trade-offs\n"),
+    )
+
+    texts = "\n".join(entry["text"] for entry in fetch_entries(GdocsInput.BACKEND_DOCS))
+
+    assert "System design concepts to review:\u000bfocus on trade-offs" in texts
+
+
+@pytest.mark.parametrize("fetch_run_id, expected_fields", [
+    ("run-1", []),
+    ("run-2", [GdocsInput.VERSION_FIELDS]),
+    (None, [GdocsInput.VERSION_FIELDS]),
+])
+def test_prefetched_metadata_is_used_only_within_same_run(gdocs_input, monkeypatch, fetch_run_id, expected_fields):
+    """事前取得したバージョンは同じ実行の間だけ使い、別の実行では更新を確認し直す"""
+    gdocs_input.prefetch_documents([DOC_URL], run_id="run-1")
+    if fetch_run_id:
+        monkeypatch.setenv(GdocsInput.PREFETCH_RUN_ID_ENV, fetch_run_id)
+    else:
+        monkeypatch.delenv(GdocsInput.PREFETCH_RUN_ID_ENV, raising=False)
+
+    gdocs_input.fetch_gdocs_documents(DOC_URL, days=36500)
+
+    assert gdocs_input.calls["fields"] == expected_fields
+    assert gdocs_input.calls["backends"] == []
+
+
+def test_prefetched_body_without_version_is_used_within_same_run(gdocs_input, monkeypatch):
+    """バージョンを取得できない文書も、事前取得した本文を同じ実行の間は再取得しない"""
+    monkeypatch.setattr(GdocsInput, "EXPORT_AUTO_MIN_PARAGRAPHS", 10 ** 6)
+    drive = gdocs_input._google_service.get_drive_service()
+    monkeypatch.setattr(drive, "_file", {key: value for key, value in drive._file.items() if key != "version"})
+
+    summary = gdocs_input.prefetch_documents([DOC_URL], run_id="run-1")
+    monkeypatch.setenv(GdocsInput.PREFETCH_RUN_ID_ENV, "run-1")
+    gdocs_input.fetch_gdocs_documents(DOC_URL, days=36500)
+
+    assert summary["refreshed"] == 1
+    assert gdocs_input.calls["fields"] == []
+    assert gdocs_input.calls["backends"] == []
+
+    # 別の実行では本文を取得し直す
+    monkeypatch.setenv(GdocsInput.PREFETCH_RUN_ID_ENV, "run-2")
+    gdocs_input.fetch_gdocs_documents(DOC_URL, days=36500)
+    assert gdocs_input.calls["backends"] == [GdocsInput.BACKEND_DOCS]
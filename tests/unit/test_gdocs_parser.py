@@ -0,0 +1,39 @@
+"""Google Docs日誌パーサー（末尾からのパース）のテスト"""
+import pytest
+from inputs.gdocs_input import GdocsInput
+
+ORDERED_DATES = ["2026-09-01", "2026-09-15", "2026-10-01", "2026-10-10", "2026-10-16"]
+UNORDERED_DATES = ["2026-10-10", "2026-09-01", "2026-10-16", "2026-09-15", "2026-10-01"]
+CUTOFFS = ["2026-08-01", "2026-09-15", "2026-10-02", "2026-10-16", "2026-11-01"]
+
+
+def build_paragraphs(dates: list) -> list:
+    """日付ヘッダーと本文の段落（ヘッダー前の前書きと空段落を含む）"""
+    paragraphs = ["日誌の前書き\n", "\n"]
+    for entry_date in dates:
+        paragraphs += [f"# {entry_date}\n", f"{entry_date}の1段落目\n", "\n", f"{entry_date}の2段落目\n"]
+    return paragraphs
+
+
+@pytest.fixture(scope="module")
+def gdocs_input():
+    return GdocsInput.__new__(GdocsInput)
+
+
+@pytest.mark.parametrize("dates", [ORDERED_DATES, UNORDERED_DATES], ids=["ordered", "unordered"])
+@pytest.mark.parametrize("cutoff_date", CUTOFFS)
+def test_tail_parser_matches_full_parse(gdocs_input, dates, cutoff_date):
+    """末尾からのパースは、日付ヘッダーの並びによらず全体のパースと同じ結果を返す"""
+    paragraphs = build_paragraphs(dates)
+    header_index = gdocs_input._build_header_index(paragraphs)
+
+    expected = gdocs_input._parse_paragraphs(paragraphs, cutoff_date)
+    assert gdocs_input._parse_from_tail(paragraphs, header_index, cutoff_date) == expected
+    assert [entry["date"] for entry in expected] == sorted((d for d in dates if d >= cutoff_date), reverse=True)
+
+
+def test_header_index_records_positions_and_dates(gdocs_input):
+    """日付ヘッダーの段落位置と日付を記録し、日付でない見出しは含めない"""
+    paragraphs = ["# メモ\n", "# 2026-10-01\n", "本文\n", "  #2026-10-02 朝\n"]
+
+    assert gdocs_input._build_header_index(paragraphs) == [(1, "2026-10-01"), (3, "2026-10-02")]
@@ -0,0 +1,90 @@
+"""Notionデータベースエントリの本文取得モード判定のテスト"""
+import pytest
+from inputs.notion_input import NotionInput
+
+DATABASE_ID = "db-content-mode"
+SCHEMA = {"date_property": None, "properties": {}}
+
+
+def make_entry(index: int, notes: str = None) -> dict:
+    """タイトル・テキストプロパティと、常に値を持つチェックボックスプロパティを持つエントリ"""
+    return {
+        "id": f"page-{index}",
+        "created_time": f"2026-10-{index + 1:02d}T00:00:00.000Z",
+        "last_edited_time": f"2026-10-{index + 1:02d}T12:00:00.000Z",
+        "properties": {
+            "Name": {"type": "title", "title": [{"plain_text": f"日誌 {index}"}]},
+            "Notes": {"type": "rich_text", "rich_text": [{"plain_text": notes}] if notes else []},
+            "Done": {"type": "checkbox", "checkbox": False}
+        }
+    }
+
+
+@pytest.fixture
+def make_database_input(make_notion_input):
+    """データベースクエリとページ本体の取得をスタブした、本文取得モード自動判定のNotionInput"""
+    return lambda entries, bodies: make_notion_input(bodies, entries, content_mode="auto", max_workers=2)
+
+
+def cached_mode(notion_input: NotionInput):
+    cached = notion_input._content_mode_cache.get(notion_input._content_mode_key(DATABASE_ID))
+    return cached["mode"] if cached else None
+
+
+def test_page_bodies_after_sample_size_select_blocks_mode(make_database_input):
+    """6件目以降のエントリにだけページ本文があるデータベースはblocksモードと判定する"""
+    entries = [make_entry(i) for i in range(8)]
+    bodies = {f"page-{i}": f"本文 {i}" for i in range(NotionInput.CONTENT_MODE_SAMPLE_SIZE, 8)}
+
+    notion_input = make_database_input(entries, bodies)
+    first = notion_input._query_database_entries(DATABASE_ID, SCHEMA, "2026-10-01")
+    assert cached_mode(notion_input) == NotionInput.CONTENT_MODE_BLOCKS
+    assert all(f"本文 {i}" in first[i]["text"] for i in range(NotionInput.CONTENT_MODE_SAMPLE_SIZE, 8))
+
+    # 判定結果を使う次回の実行でもページ本文を取得する（本文を変えてページキャッシュを無効化）
+    entries = [{**entry, "last_edited_time": "2026-10-17T00:00:00.000Z"} for entry in entries]
+    second_input = make_database_input(entries, bodies)
+    second = second_input._query_database_entries(DATABASE_ID, SCHEMA, "2026-10-01")
+    assert [entry["text"] for entry in second] == [entry["text"] for entry in first]
+    assert second_input._client.blocks.children.list.call_count == len(entries)
+
+
+def test_empty_page_bodies_with_text_properties_select_properties_mode(make_database_input):
+    """テキストプロパティに本文があり、ページ本体がすべて空の場合のみpropertiesモードと判定する"""
+    entries = [make_entry(i, notes=f"メモ {i}") for i in range(NotionInput.CONTENT_MODE_SAMPLE_SIZE)]
+
+    notion_input = make_database_input(entries, {})
+    notion_input._query_database_entries(DATABASE_ID, SCHEMA, "2026-10-01")
+    assert cached_mode(notion_input) == NotionInput.CONTENT_MODE_PROPERTIES
+
+
+def test_title_and_checkbox_only_properties_do_not_select_properties_mode(make_database_input):
+    """タイトル・チェックボックスのみのエントリはプロパティに本文があるとみなさない（タイトルは本文に含まれない）"""
+    entries = [make_entry(i) for i in range(8)]
+
+    notion_input = make_database_input(entries, {})
+    notion_input._query_database_entries(DATABASE_ID, SCHEMA, "2026-10-01")
+    assert cached_mode(notion_input) is None
+
+
+def test_properties_mode_fetches_bodies_of_entries_without_text_property(make_database_input):
+    """propertiesと判定済みでも、テキストプロパティが空のエントリはページ本文を取得し、本文があればblocksに切り替える"""
+    size = NotionInput.CONTENT_MODE_SAMPLE_SIZE
+    entries = [make_entry(i, notes=f"メモ {i}") for i in range(size)]
+    make_database_input(entries, {})._query_database_entries(DATABASE_ID, SCHEMA, "2026-10-01")
+
+    # 次の実行: テキストプロパティのあるエントリは本文を取得せず、タイトルのみのエントリは本文を取得する
+    entries = [make_entry(i, notes=f"メモ {i}") for i in range(size, size * 2)] + [make_entry(size * 2)]
+    bodies = {f"page-{size}": "メモと一緒に書いた本文", f"page-{size * 2}": "ページ本体に書いた日誌"}
+    notion_input = make_database_input(entries, bodies)
+    result = notion_input._query_database_entries(DATABASE_ID, SCHEMA, "2026-10-01")
+
+    assert "ページ本体に書いた日誌" in result[-1]["text"]
+    assert notion_input._client.blocks.children.list.call_count == 1
+    assert cached_mode(notion_input) == NotionInput.CONTENT_MODE_BLOCKS
+
+    # blocksに切り替えた後は、ページ本体を取得せずにキャッシュしたエントリも本文を取得し直す
+    third_input = make_database_input(entries, bodies)
+    third = third_input._query_database_entries(DATABASE_ID, SCHEMA, "2026-10-01")
+    assert "メモと一緒に書いた本文" in third[0]["text"]
+    assert third_input._client.blocks.children.list.call_count == size
@@ -0,0 +1,77 @@
+"""Notionデータベースの検索結果キャッシュとクエリ条件のテスト"""
+from types import SimpleNamespace
+from unittest.mock import Mock
+import pytest
+from inputs.notion_input import NotionInput
+from utils import cache_store
+
+
+def make_database(database_id: str, title: str) -> dict:
+    return {"object": "database", "id": database_id, "title": [{"plain_text": title}],
+            "properties": {"Date": {"type": "date"}}}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(cache_store, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def resolve_ids(notion_input: NotionInput) -> list:
+    return [database["id"] for database in notion_input._resolve_databases()]
+
+
+def test_multi_database_mode_finds_new_database_after_ttl(clock, make_notion_input):
+    """複数データベースモードでは、TTLを過ぎると再検索して新しく作られたデータベースも統合する"""
+    notion_input = make_notion_input(multi_database=True)
+    notion_input._client.search = Mock(return_value={"results": [make_database("db-2025", "Journal 2025")]})
+    assert resolve_ids(notion_input) == ["db-2025"]
+
+    notion_input._client.search = Mock(return_value={"results": [make_database("db-2026", "Journal 2026"),
+                                                                 make_database("db-2025", "Journal 2025")]})
+    clock.now += NotionInput.DATABASE_CACHE_TTL - 1
+    assert resolve_ids(notion_input) == ["db-2025"]
+    notion_input._client.search.assert_not_called()
+
+    clock.now += 2
+    assert resolve_ids(notion_input) == ["db-2026", "db-2025"]
+
+
+def test_single_database_cache_expires_and_keeps_previous_selection(clock, make_notion_input):
+    """通常のモードでもTTLを過ぎると再検索し、以前のデータベースが残っていれば選択を変えない"""
+    notion_input = make_notion_input(multi_database=False)
+    notion_input._client.search = Mock(return_value={"results": [make_database("db-journal", "Journal")]})
+    assert resolve_ids(notion_input) == ["db-journal"]
+
+    # 共有された別のデータベースが検索結果の先頭に来ても、以前のデータベースを使い続ける
+    notion_input._client.search = Mock(return_value={"results": [make_database("db-tasks", "Tasks"),
+                                                                 make_database("db-journal", "Journal (renamed)")]})
+    clock.now += NotionInput.DATABASE_CACHE_TTL + 1
+    databases = notion_input._resolve_databases()
+    notion_input._client.search.assert_called_once()
+    assert [(db["id"], db["title"]) for db in databases] == [("db-journal", "Journal (renamed)")]
+
+    # 以前のデータベースが共有解除された場合は新しい検索結果から選ぶ
+    notion_input._client.search = Mock(return_value={"results": [make_database("db-tasks", "Tasks")]})
+    clock.now += NotionInput.DATABASE_CACHE_TTL + 1
+    assert resolve_ids(notion_input) == ["db-tasks"]
+
+
+def test_filter_properties_are_decoded_property_ids(make_notion_input):
+    """スキーマのパーセントエンコードされたプロパティIDは、復号してfilter_propertiesに渡す"""
+    schema = {
+        "date_property": {"name": "Date", "id": "%3AUPp"},
+        "properties": {
+            "Name": {"id": "title", "type": "title"},
+            "Date": {"id": "%3AUPp", "type": "date"},
+            "Body": {"id": "b%7Dd%3F", "type": "rich_text"},
+            "Week": {"id": "W%3Fek", "type": "relation"},
+        }
+    }
+    notion_input = make_notion_input(content_mode="properties")
+
+    notion_input._query_database_entries("db-journal", schema, "2026-10-01")
+
+    query = notion_input._client.databases.query.call_args.kwargs
+    assert query["filter_properties"] == ["title", ":UPp", "b}d?"]
@@ -0,0 +1,101 @@
+"""Notion APIのレート制限・リトライのテスト"""
+from types import SimpleNamespace
+from unittest.mock import Mock
+import httpx
+import pytest
+from notion_client.errors import APIErrorCode, APIResponseError
+from inputs import notion_api
+from inputs.notion_api import RateLimitedNotionClient, NotionRetryError
+from utils import fingerprint, rate_limiter
+
+
+class FakeClock:
+    """sleepで進む仮想時計（実際には待機しない）"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    fake_time = SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep)
+    monkeypatch.setattr(rate_limiter, "time", fake_time)
+    monkeypatch.setattr(notion_api, "time", fake_time)
+    # バックオフのジッターを上限値に固定
+    monkeypatch.setattr(notion_api.random, "uniform", lambda low, high: high)
+    return clock
+
+
+def api_error(status: int, headers: dict = None) -> APIResponseError:
+    response = httpx.Response(status, headers=headers or {}, request=httpx.Request("POST", "https://api.notion.com"))
+    return APIResponseError(response, f"status {status}", APIErrorCode.InternalServerError)
+
+
+def make_client(search: Mock, api_key: str) -> RateLimitedNotionClient:
+    raw_client = Mock()
+    raw_client.search = search
+    return RateLimitedNotionClient(raw_client, api_key)
+
+
+def test_retries_server_errors_with_backoff(clock):
+    """5xxはバックオフして再試行し、成功した結果を返す"""
+    search = Mock(side_effect=[api_error(503), api_error(502), {"results": []}])
+    client = make_client(search, "secret_retry_5xx")
+
+    assert client.search() == {"results": []}
+    assert search.call_count == 3
+    assert clock.sleeps == [RateLimitedNotionClient.BASE_DELAY, RateLimitedNotionClient.BASE_DELAY * 2]
+    assert client.stats()["retries"] == 2
+
+
+def test_honors_retry_after_on_throttle(clock):
+    """429はRetry-Afterの秒数だけ共有バケットを止めてから再試行する"""
+    search = Mock(side_effect=[api_error(429, {"retry-after": "7"}), {"results": []}])
+    client = make_client(search, "secret_retry_after")
+
+    assert client.search() == {"results": []}
+    assert search.call_count == 2
+    assert clock.now == pytest.approx(7.0)
+    assert client.stats()["throttled"] == 1
+
+
+def test_raises_after_max_retries(clock):
+    """MAX_RETRIES回再試行しても失敗する場合はNotionRetryErrorを送出する"""
+    search = Mock(side_effect=api_error(500))
+    client = make_client(search, "secret_retry_exhausted")
+
+    with pytest.raises(NotionRetryError):
+        client.search()
+    assert search.call_count == RateLimitedNotionClient.MAX_RETRIES + 1
+    assert client.stats()["retries"] == RateLimitedNotionClient.MAX_RETRIES
+
+
+def test_does_not_retry_client_errors(clock):
+    """4xx（429以外）は再試行せずにそのまま送出する"""
+    search = Mock(side_effect=api_error(400))
+    client = make_client(search, "secret_no_retry")
+
+    with pytest.raises(APIResponseError):
+        client.search()
+    assert search.call_count == 1
+
+
+def test_token_bucket_is_shared_per_key_fingerprint():
+    """同じAPIキーのクライアントはトークンバケットを共有し、APIキー自体は保持しない"""
+    first = make_client(Mock(), "secret_shared_bucket")
+    second = make_client(Mock(), "secret_shared_bucket")
+    other = make_client(Mock(), "secret_other_bucket")
+
+    assert first._bucket is second._bucket
+    assert first._bucket is not other._bucket
+    assert fingerprint("secret_shared_bucket") in notion_api._token_buckets
+    assert "secret_shared_bucket" not in notion_api._token_buckets
@@ -0,0 +1,40 @@
+"""Notionページ検索（データベースなしのフォールバック）の対象期間判定のテスト"""
+from unittest.mock import Mock
+from inputs.notion_input import NotionInput
+
+CUTOFF = "2026-10-10"
+
+
+def make_page(index: int, last_edited: str, date: str = None) -> dict:
+    properties = {"Name": {"type": "title", "title": [{"plain_text": f"ページ {index}"}]}}
+    if date:
+        properties["Date"] = {"type": "date", "date": {"start": date}}
+    return {"id": f"page-{index}", "created_time": f"{last_edited}T00:00:00.000Z",
+            "last_edited_time": f"{last_edited}T12:00:00.000Z", "properties": properties}
+
+
+def search_page_ids(pages: list) -> list:
+    notion_input = NotionInput(api_key="secret_search_test", max_workers=2)
+    notion_input._client = Mock()
+    notion_input._client.search = Mock(return_value={"results": pages, "has_more": False})
+    stats = {"total_pages": 0, "filtered_by_date": 0}
+    return [page["id"] for page in notion_input._iter_recent_search_pages(CUTOFF, stats)]
+
+
+def test_date_property_page_edited_before_cutoff_is_found():
+    """最終編集日がカットオフより前でも、日付プロパティが対象期間のページは返す"""
+    pages = [make_page(0, "2026-10-12"),
+             make_page(1, "2026-10-01"),
+             make_page(2, "2026-09-30", date="2026-10-11")]
+
+    assert search_page_ids(pages) == ["page-0", "page-2"]
+
+
+def test_search_stops_after_consecutive_old_pages():
+    """最終編集日がカットオフより前のページが一定数連続して対象外なら、以降は確認しない"""
+    window = NotionInput.SEARCH_MAX_CONSECUTIVE_OLD_PAGES
+    pages = [make_page(0, "2026-10-12")]
+    pages += [make_page(i, "2026-10-01") for i in range(1, window + 1)]
+    pages.append(make_page(window + 1, "2026-09-01", date="2026-10-11"))
+
+    assert search_page_ids(pages) == ["page-0"]
@@ -0,0 +1,51 @@
+"""コンテキストデータからの直近7日間の切り出しのテスト"""
+from datetime import date, timedelta
+from main import PicklesSystem
+
+
+def days_ago(days: int) -> str:
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+def make_page(page_id: str, created: str, edited: str, date_property: str = None) -> dict:
+    properties = {"title": {"type": "title", "title": [{"plain_text": page_id}]}}
+    if date_property:
+        properties["Date"] = {"type": "date", "date": {"start": date_property}}
+    return {
+        "id": page_id,
+        "created_time": f"{created}T00:00:00.000Z",
+        "last_edited_time": f"{edited}T09:00:00.000Z",
+        "properties": properties
+    }
+
+
+def page_bodies(pages: list) -> dict:
+    return {page["id"]: f"{page['id']}の本文" for page in pages}
+
+
+def test_old_page_edited_this_week_is_in_week_data(make_notion_input):
+    """30日前に作成し今週編集したページは、入力層と同じく直近7日間に含める"""
+    pages = [
+        make_page("edited-old-page", created=days_ago(20), edited=days_ago(1)),
+        make_page("old-page", created=days_ago(20), edited=days_ago(15)),
+        make_page("new-page", created=days_ago(2), edited=days_ago(2)),
+    ]
+    notion_input = make_notion_input(page_bodies(pages))
+    assert [notion_input._is_recent_page(page, days_ago(7)) for page in pages] == [True, False, True]
+
+    context_data = [notion_input._extract_document_info(page) for page in pages]
+    week_data = PicklesSystem()._extract_recent_days_from_context(context_data, 7)
+
+    assert [item["title"] for item in week_data] == ["edited-old-page", "new-page"]
+
+
+def test_date_property_takes_precedence_over_last_edited_time(make_notion_input):
+    """日付プロパティのあるページは、最近編集されていても日付プロパティで判定する"""
+    pages = [make_page("dated-page", created=days_ago(20), edited=days_ago(1), date_property=days_ago(20))]
+
+    notion_input = make_notion_input(page_bodies(pages))
+    context_data = [notion_input._extract_document_info(page) for page in pages]
+    week_data = PicklesSystem()._extract_recent_days_from_context(context_data, 7)
+
+    assert "last_edited_time" not in context_data[0]
+    assert week_data == []
@@ -0,0 +1,79 @@
+"""AI応答キャッシュのテスト"""
+import time
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from main import PicklesSystem, parse_command_args
+from throughput import DocumentAnalyzer, ResponseCache
+from utils import cache_store
+
+MESSAGES = [{"role": "user", "content": "今週の日誌を分析してください"}]
+
+
+def journal(text: str = "朝から散歩に出かけて、気持ちのよい一日だった。") -> list:
+    return [{"date": date.today().isoformat(), "text": text}]
+
+
+def api_calls(*analyzers: DocumentAnalyzer) -> int:
+    return sum(analyzer._client.responses.create.call_count for analyzer in analyzers)
+
+
+def analyze(data: list, analysis_type: str = "domi", use_cache: bool = True) -> DocumentAnalyzer:
+    """新しいDocumentAnalyzer（別プロセスの再実行に相当）で分析を実行"""
+    analyzer = DocumentAnalyzer(user_name="テスト", language="japanese", use_cache=use_cache, stream=False)
+    analyzer.analyze_documents(data, analysis_type=analysis_type, language="japanese")
+    return analyzer
+
+
+@pytest.mark.parametrize("changes", [
+    {"model": "gpt-5-mini"},
+    {"reasoning": {"effort": "high"}},
+    {"messages": [{"role": "user", "content": "今週の日誌を分析してください。"}]},
+    {"analysis_type": "aga"},
+], ids=["model", "reasoning", "messages", "analysis_type"])
+def test_key_changes_with_every_input(changes):
+    """モデル・推論設定・メッセージ・分析タイプのどれかが異なれば別のキーになる"""
+    base = {"model": "gpt-5", "reasoning": {"effort": "medium"}, "messages": MESSAGES, "analysis_type": "domi"}
+
+    assert ResponseCache.make_key(**base) == ResponseCache.make_key(**dict(base))
+    assert ResponseCache.make_key(**{**base, **changes}) != ResponseCache.make_key(**base)
+
+
+def test_identical_request_hits_cache():
+    """同じ日誌・分析タイプの再実行ではAPIを呼ばずに同じ応答を返す"""
+    first = analyze(journal())
+    second = analyze(journal())
+
+    assert api_calls(first) == 1
+    assert api_calls(second) == 0
+
+
+def test_changed_input_misses_cache():
+    """日誌の内容や分析タイプが変わった場合はAPIを呼ぶ"""
+    first = analyze(journal())
+    edited = analyze(journal("夜は友人と長く話し込んだ。"))
+    other_type = analyze(journal(), analysis_type="aga")
+
+    assert api_calls(first, edited, other_type) == 3
+
+
+def test_expired_entry_misses_cache(monkeypatch):
+    """有効期間（既定24時間）を過ぎた応答は使わない"""
+    first = analyze(journal())
+    later = time.time() + ResponseCache.DEFAULT_TTL + 1
+    monkeypatch.setattr(cache_store, "time", SimpleNamespace(time=lambda: later))
+    second = analyze(journal())
+
+    assert api_calls(first, second) == 2
+
+
+def test_no_cache_option_bypasses_cache():
+    """--no-cacheを指定した実行はキャッシュ済みの応答を使わない"""
+    analyze(journal())
+
+    args = parse_command_args(["main.py", "--user-id", "user-1", "--no-cache"])
+    system = PicklesSystem(use_response_cache=not args["no_cache"])
+    system._analyzer.analyze_documents(journal(), analysis_type="domi", language="japanese")
+
+    assert args["no_cache"] is True
+    assert api_calls(system._analyzer) == 1
@@ -0,0 +1,48 @@
+"""入力トークン予算によるコンテキスト調整のテスト"""
+import datetime
+import random
+from throughput import DocumentAnalyzer, TokenBudget
+
+DAYS = 30
+WEEK_DAYS = 7
+
+
+def build_entries(days: int = DAYS) -> list:
+    """1日1エントリの長い日誌（入力層と同じく新しい順）"""
+    rng = random.Random(0)
+    today = datetime.date.today()
+    return [{
+        "date": (today - datetime.timedelta(days=offset)).isoformat(),
+        "text": f"[{offset}] " + "今日の出来事を振り返る。" * rng.randint(200, 600)
+    } for offset in range(days)]
+
+
+def test_select_entries_keeps_protected_entries():
+    """予算が足りなくても保護されたエントリは必ず選ばれ、結果は古い順のまま"""
+    entry_tokens = [500] * 10
+    protected = [False] * 7 + [True] * 3
+
+    selected = TokenBudget(budget=1).select_entries(entry_tokens, available=1200, protected=protected)
+
+    assert selected == [7, 8, 9]
+
+
+def test_fit_context_keeps_every_week_entry_in_order():
+    """予算を超える場合も直近7日間のエントリはすべて元の順序で残る"""
+    analyzer = DocumentAnalyzer(user_name="テスト", language="japanese")
+    context_data = build_entries()
+    week_data = context_data[:WEEK_DAYS]
+    week_tokens = TokenBudget.estimate_tokens(analyzer._format_data_for_analysis(week_data))
+    analyzer._token_budget = TokenBudget(budget=week_tokens + 20_000)
+
+    fitted, token_counts = analyzer._fit_context_to_budget(week_data, context_data, "domi", "japanese")
+
+    assert token_counts["input_tokens_before_fit"] > token_counts["input_token_budget"]
+    assert token_counts["input_tokens_after_fit"] <= token_counts["input_token_budget"]
+    assert len(fitted) < len(context_data)
+    assert [item for item in fitted if item in week_data] == week_data
+
+    # 残したエントリ全体も元の並び順を保つ（切り詰めたエントリは日付で位置を特定）
+    dates = [item["date"] for item in context_data]
+    positions = [dates.index(item["date"]) for item in fitted]
+    assert positions == sorted(positions)
@@ -5,5 +5,8 @@ Throughput パッケージ - データ処理層
 """
 
 from .analyzer import DocumentAnalyzer, AnalysisError
+from .response_cache import ResponseCache
+from .token_budget import TokenBudget
+from .batch import BatchAnalysisClient, BatchAnalysisError
 
-__all__ = ["DocumentAnalyzer", "AnalysisError"]
+__all__ = ["DocumentAnalyzer", "AnalysisError", "ResponseCache", "TokenBudget", "BatchAnalysisClient", "BatchAnalysisError"]
@@ -1,5 +1,6 @@
 import os
-from typing import List, Dict
+import time
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from openai import OpenAI
 from dotenv import load_dotenv
 
@@ -7,6 +8,8 @@ from dotenv import load_dotenv
 from utils import AnalysisTypes, logger
 # プロンプト管理クラスをインポート
 from .prompts import DomiPrompts, AgaPrompts
+from .response_cache import ResponseCache
+from .token_budget import TokenBudget
 
 load_dotenv()
 
@@ -19,7 +22,16 @@ class AnalysisError(Exception):
 class DocumentAnalyzer:
     """ドキュメント分析クラス"""
     
-    def __init__(self, user_name: str = None, language: str = None):
+    # AI APIのリクエスト設定
+    MODEL = "gpt-5-mini"
+    REASONING = {"effort": "high"}
+    MAX_OUTPUT_TOKENS = 50000
+    
+    # 分析対象のデータがない場合のインサイト
+    NO_DATA_INSIGHTS = "分析対象のデータがありません。"
+    NO_CONTEXT_DATA_INSIGHTS = "分析対象のデータがありません。指定期間にジャーナルエントリが見つかりませんでした。"
+    
+    def __init__(self, user_name: str = None, language: str = None, use_cache: bool = True, stream: bool = None):
         # テストモードの場合はモックを使用
         if os.getenv('PICKLES_TEST_MODE') == '1':
             from tests.fixtures.mock_handlers import mock_openai_api
@@ -29,13 +41,23 @@ class DocumentAnalyzer:
         
         self._user_name = user_name
         self._language = language
+        # 同一プロンプトの再実行時はAPIを呼ばずに応答を再利用（use_cache=Falseで再生成）
+        self._response_cache = ResponseCache()
+        self._use_cache = use_cache
+        self._token_budget = TokenBudget()
+        # 応答をストリーミングで受信するか（未指定時は環境変数PICKLES_OPENAI_STREAM、1で有効・0で無効）
+        # どちらも未指定の場合は、生成中の表示先（on_text_delta）が渡されたときのみストリーミングする
+        env_stream = os.getenv("PICKLES_OPENAI_STREAM")
+        self._stream = stream if stream is not None else (env_stream != "0" if env_stream else None)
+        self._generation_metrics = self._empty_generation_metrics()
     
     def analyze_documents(self, 
                          raw_data: List[Dict[str, str]], 
                          analysis_type: str = AnalysisTypes.DOMI,
                          language: str = None,
                          apply_filters: bool = True,
-                         context_data: List[Dict[str, str]] = None) -> Dict[str, str]:
+                         context_data: List[Dict[str, str]] = None,
+                         on_text_delta: Callable[[str], None] = None) -> Dict[str, str]:
         """ドキュメントを総合的に分析
         
         Args:
@@ -44,14 +66,99 @@ class DocumentAnalyzer:
             language: 出力言語
             apply_filters: フィルタリングを適用するか
             context_data: コンテキスト用データ（7日より長い期間のデータ、オプション）
+            on_text_delta: ストリーミング受信時に生成途中のテキスト断片を受け取るコールバック（オプション）
         """
         
         logger.debug(f"言語設定 @ analyser.py, analyze_document内", "ai", language=language)
         
+        result, filtered_data, filtered_context_data = self._prepare_result(raw_data, analysis_type, language,
+                                                                            context_data)
+        
+        # AI分析実行（キャッシュ使用時やデータなしの場合は生成時間を記録しない）
+        self._generation_metrics = self._empty_generation_metrics()
+        if filtered_context_data:
+            insights = self._generate_context_insights(filtered_data, filtered_context_data, analysis_type, language,
+                                                       on_text_delta)
+        else:
+            insights = self._generate_insights(filtered_data, analysis_type, language, on_text_delta)
+        
+        return {**result, "insights": insights, **self._generation_metrics}
+    
+    def prepare_analysis(self,
+                         raw_data: List[Dict[str, str]],
+                         analysis_type: str = AnalysisTypes.DOMI,
+                         language: str = None,
+                         context_data: List[Dict[str, str]] = None) -> Dict[str, Any]:
+        """AI APIへのリクエスト直前までの分析処理（OpenAI Batch APIでまとめて送信する場合に使用）
+        
+        Returns:
+            result: インサイト以外の分析結果
+            messages: AI APIに送信するメッセージ（キャッシュ済み・データなしの場合はNone）
+            insights: APIを呼ばずに決まったインサイト（キャッシュ済み・データなしの場合）
+            cache_key: 応答キャッシュのキー
+        """
+        result, filtered_data, filtered_context_data = self._prepare_result(raw_data, analysis_type, language,
+                                                                            context_data)
+        prepared = {"result": result, "messages": None, "insights": None, "cache_key": None,
+                    "analysis_type": analysis_type}
+        
+        if filtered_context_data:
+            prepared["messages"] = self._create_messages(filtered_data, filtered_context_data, analysis_type, language)
+        elif filtered_data:
+            prepared["messages"] = self._create_messages(filtered_data, None, analysis_type, language)
+        else:
+            prepared["insights"] = self.NO_DATA_INSIGHTS
+            return prepared
+        
+        prepared["cache_key"] = ResponseCache.make_key(self.MODEL, self.REASONING, prepared["messages"], analysis_type)
+        cached_insights = self._get_cached_insights(prepared["cache_key"])
+        if cached_insights is not None:
+            prepared["messages"] = None
+            prepared["insights"] = cached_insights
+        
+        return prepared
+    
+    def complete_analysis(self, prepared: Dict[str, Any], insights: str, latency: float = None) -> Dict[str, Any]:
+        """prepare_analysisの結果とAI APIの応答から分析結果を作成し、応答をキャッシュに保存"""
+        if prepared["messages"] is not None:
+            self._response_cache.set(prepared["cache_key"], insights, latency or 0.0, self.MODEL,
+                                     prepared["analysis_type"])
+        
+        return {**prepared["result"], "insights": insights, **self._empty_generation_metrics(),
+                "generation_seconds": latency}
+    
+    def build_request_body(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """AI API（/v1/responses）のリクエストボディを作成"""
+        return {
+            "model": self.MODEL,
+            "reasoning": self.REASONING,
+            "input": messages,
+            "max_output_tokens": self.MAX_OUTPUT_TOKENS
+        }
+    
+    def parse_response_body(self, body: Dict[str, Any]) -> str:
+        """AI API（/v1/responses）のレスポンスボディからインサイトを抽出"""
+        try:
+            return self._parse_api_response(body)
+        except Exception as e:
+            raise AnalysisError(f"AI分析エラー: {e}")
+    
+    def _prepare_result(self, raw_data: List[Dict[str, str]], analysis_type: str, language: str,
+                        context_data: Optional[List[Dict[str, str]]]):
+        """フィルタリング・トークン予算調整・統計情報作成を行い、インサイト以外の分析結果を作成
+        
+        Returns:
+            (インサイト以外の分析結果, 分析対象データ, 調整後のコンテキストデータ)
+        """
         # フィルタリングは一旦無効化
         # filtered_data = self._filter_data(raw_data) if apply_filters else raw_data
         filtered_data = raw_data
         filtered_context_data = context_data if context_data else None
+        
+        # プロンプト作成前に、コンテキスト期間の古いエントリを入力トークン予算内に収める（直近7日間は変更しない）
+        filtered_context_data, token_counts = self._fit_context_to_budget(
+            filtered_data, filtered_context_data, analysis_type, language
+        )
 
         # 統計情報生成
         if filtered_context_data:
@@ -59,26 +166,82 @@ class DocumentAnalyzer:
         else:
             stats = self._generate_statistics(raw_data, filtered_data)
         
-        # AI分析実行
-        if filtered_context_data:
-            insights = self._generate_context_insights(filtered_data, filtered_context_data, analysis_type, language)
-        else:
-            insights = self._generate_insights(filtered_data, analysis_type, language)
-        
         # 平均文字数を計算
         total_length = sum(len(item.get("text", "")) for item in filtered_data)
         avg_length = total_length // len(filtered_data) if filtered_data else 0
 
-        return {
+        result = {
             "statistics": stats,
-            "insights": insights,
             "raw_data_count": len(raw_data),
             "filtered_data_count": len(filtered_data),
             "avg_text_length": avg_length,
             # 後方互換性のため残す
             "data_count": len(filtered_data),
-            "context_data_count": len(filtered_context_data) if filtered_context_data else 0
+            "context_data_count": len(filtered_context_data) if filtered_context_data else 0,
+            **token_counts
         }
+        return result, filtered_data, filtered_context_data
+    
+    @staticmethod
+    def _empty_generation_metrics() -> Dict[str, Optional[float]]:
+        """生成時間（秒）の初期値"""
+        return {"generation_seconds": None, "time_to_first_token_seconds": None}
+    
+    def _fit_context_to_budget(self, week_data: List[Dict[str, str]], context_data: Optional[List[Dict[str, str]]],
+                               analysis_type: str, language: str) -> Tuple[Optional[List[Dict[str, str]]], Dict[str, Any]]:
+        """コンテキスト期間のエントリを入力トークン予算内に収める
+        
+        予算を超える場合は、直近7日間以外の長いエントリを切り詰め、さらに超える分は
+        古いエントリを間引く。エントリの並び順は変えない。
+        
+        Returns:
+            (調整後のコンテキストデータ, 調整前後の入力トークン数)
+        """
+        budget = self._token_budget
+        week_tokens = budget.estimate_tokens(self._format_data_for_analysis(week_data))
+        if context_data:
+            overhead = budget.estimate_tokens(self._create_context_analysis_prompt("", "", analysis_type, language))
+        else:
+            overhead = budget.estimate_tokens(self._create_analysis_prompt("", analysis_type, language))
+        
+        # 直近7日間のエントリはコンテキスト側には含めないため数えない
+        protected = [item in week_data for item in context_data or []]
+        has_titles = any("title" in item and item["title"] for item in context_data or [])
+        entry_tokens = [0 if protected[i] else budget.estimate_tokens(self._format_entry(item, has_titles))
+                        for i, item in enumerate(context_data or [])]
+        tokens_before = overhead + week_tokens + sum(entry_tokens)
+        token_counts = {"input_tokens_before_fit": tokens_before, "input_tokens_after_fit": tokens_before,
+                        "input_token_budget": budget.budget}
+        
+        if tokens_before <= budget.budget:
+            return context_data, token_counts
+        if not context_data:
+            logger.warning("直近7日間のデータだけで入力トークン予算を超過", "ai",
+                          estimated_tokens=tokens_before, budget=budget.budget)
+            return context_data, token_counts
+        
+        # 直近7日間以外の長いエントリを切り詰め
+        fitted = list(context_data)
+        for i, item in enumerate(context_data):
+            if not protected[i] and entry_tokens[i] > budget.MAX_ENTRY_TOKENS:
+                fitted[i] = dict(item, text=budget.truncate(item.get("text", ""), budget.MAX_ENTRY_TOKENS))
+                entry_tokens[i] = budget.estimate_tokens(self._format_entry(fitted[i], has_titles))
+        
+        # 日付の古い順に並べて予算内に収まるエントリを選択
+        order = sorted(range(len(fitted)), key=lambda i: str(fitted[i].get("date", ""))[:10])
+        selected = budget.select_entries([entry_tokens[i] for i in order],
+                                         budget.budget - overhead - week_tokens,
+                                         [protected[i] for i in order])
+        keep = {order[j] for j in selected}
+        fitted = [item for i, item in enumerate(fitted) if i in keep]
+        
+        token_counts["input_tokens_after_fit"] = overhead + week_tokens + sum(entry_tokens[i] for i in keep)
+        logger.info("コンテキストを入力トークン予算内に調整", "ai",
+                   budget=budget.budget,
+                   tokens_before=tokens_before,
+                   tokens_after=token_counts["input_tokens_after_fit"],
+                   kept=len(fitted), dropped=len(context_data) - len(fitted))
+        return fitted, token_counts
     
     def _filter_data(self, data: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """データをフィルタリング"""
@@ -194,42 +357,105 @@ class DocumentAnalyzer:
         logger.error(error_msg, "ai", available_types=available_types)
         raise RuntimeError(f"{error_msg}。利用可能なタイプ: {available_types}")
 
-    def _generate_insights(self, data: List[Dict[str, str]], analysis_type: str, language: str = "日本語") -> str:
+    def _request_analysis(self, messages: List[Dict[str, str]], analysis_type: str,
+                          on_text_delta: Callable[[str], None] = None) -> str:
+        """AI APIにリクエストして応答テキストを取得（同一プロンプトの応答はキャッシュから返す）"""
+        cache_key = ResponseCache.make_key(self.MODEL, self.REASONING, messages, analysis_type)
+        cached_insights = self._get_cached_insights(cache_key)
+        if cached_insights is not None:
+            return cached_insights
+        
+        started_at = time.monotonic()
+        first_token_seconds = None
+        stream = self._stream if self._stream is not None else on_text_delta is not None
+        if stream:
+            resp, first_token_seconds = self._receive_stream(messages, started_at, on_text_delta)
+        else:
+            resp = self._client.responses.create(
+                model=self.MODEL,
+                reasoning=self.REASONING,
+                input=messages,
+                max_output_tokens=self.MAX_OUTPUT_TOKENS
+            )
+        latency = time.monotonic() - started_at
+        self._generation_metrics = {"generation_seconds": round(latency, 2),
+                                    "time_to_first_token_seconds": first_token_seconds}
+        
+        logger.success("AI APIレスポンス受信", "ai", elapsed_seconds=round(latency, 1),
+                      time_to_first_token=first_token_seconds)
+        data_dict = resp.to_dict()
+        logger.debug("レスポンス構造解析", "ai", response_keys=list(data_dict.keys()))
+        
+        # 統一的なレスポンスパース処理を使用
+        insights = self._parse_api_response(data_dict)
+        self._response_cache.set(cache_key, insights, latency, self.MODEL, analysis_type)
+        return insights
+    
+    def _get_cached_insights(self, cache_key: str) -> Optional[str]:
+        """キャッシュ済みの応答を取得（use_cache=Falseの場合は常にNone）"""
+        if not self._use_cache:
+            return None
+        
+        cached = self._response_cache.get(cache_key)
+        if cached:
+            logger.info("AI応答キャッシュヒット", "ai", saved_seconds=round(cached["latency"], 1))
+            return cached["text"]
+        logger.info("AI応答キャッシュミス", "ai")
+        return None
+    
+    def _receive_stream(self, messages: List[Dict[str, str]], started_at: float,
+                        on_text_delta: Callable[[str], None] = None) -> Tuple[Any, Optional[float]]:
+        """ストリーミングで応答を受信し、テキスト断片をコールバックに渡す
+        
+        Returns:
+            (完了時のレスポンス, 最初のテキスト断片までの秒数)
+        """
+        first_token_seconds = None
+        stream = self._client.responses.create(
+            model=self.MODEL,
+            reasoning=self.REASONING,
+            input=messages,
+            max_output_tokens=self.MAX_OUTPUT_TOKENS,
+            stream=True
+        )
+        
+        for event in stream:
+            if event.type == "response.output_text.delta":
+                if first_token_seconds is None:
+                    first_token_seconds = round(time.monotonic() - started_at, 2)
+                    logger.info("AI応答の生成開始", "ai", time_to_first_token=first_token_seconds)
+                if on_text_delta:
+                    on_text_delta(event.delta)
+            elif event.type in ("response.completed", "response.incomplete"):
+                # 逐次表示の後に続くログが同じ行にならないよう改行で終える
+                if on_text_delta and first_token_seconds is not None:
+                    on_text_delta("\n")
+                # 上限到達などで不完全な場合も、非ストリーミング時と同様に受信済みの出力を使う
+                return event.response, first_token_seconds
+            elif event.type == "response.failed":
+                raise RuntimeError(f"AI応答の生成に失敗しました: {event.response.error}")
+            elif event.type == "error":
+                raise RuntimeError(f"AI応答のストリーミングエラー: {event.message}")
+        
+        raise RuntimeError("AI応答のストリーミングが完了前に終了しました")
+    
+    def _generate_insights(self, data: List[Dict[str, str]], analysis_type: str, language: str = "日本語",
+                           on_text_delta: Callable[[str], None] = None) -> str:
         """AI分析を実行してインサイトを生成"""
         if not data:
-            return "分析対象のデータがありません。"
-        
-        # データをフォーマット
-        formatted_data = self._format_data_for_analysis(data)
+            return self.NO_DATA_INSIGHTS
         
-        logger.info("AI分析を実行", "ai", analysis_type=analysis_type, language=language)
-        # プロンプト作成
-        prompt = self._create_analysis_prompt(formatted_data, analysis_type, language)
-        # 単一メッセージとして送信
-        messages = [{"role": "user", "content": prompt}]
-
-        logger.debug(f"言語設定 @ analyser.py, _generate_insights", "ai", language=language)
+        messages = self._create_messages(data, None, analysis_type, language)
+        prompt = messages[0]["content"]
 
         # AI分析実行
         try:
             logger.start("AI APIリクエスト送信", "ai", 
-                        data_length=len(formatted_data), 
-                        max_tokens=50000, 
+                        prompt_length=len(prompt), 
+                        max_tokens=self.MAX_OUTPUT_TOKENS, 
                         message_count=len(messages))
             
-            resp = self._client.responses.create(
-                model="gpt-5-mini",
-                reasoning={"effort": "high"},
-                input=messages,
-                max_output_tokens=50000
-            )
-            
-            logger.success("AI APIレスポンス受信", "ai")
-            data_dict = resp.to_dict()
-            logger.debug("レスポンス構造解析", "ai", response_keys=list(data_dict.keys()))
-            
-            # 統一的なレスポンスパース処理を使用
-            insights = self._parse_api_response(data_dict)
+            insights = self._request_analysis(messages, analysis_type, on_text_delta)
             
             logger.complete("AI分析処理", "ai", result_length=len(insights))
             
@@ -241,49 +467,30 @@ class DocumentAnalyzer:
             logger.error("AI分析処理でエラーが発生", "ai",
                         error_type=type(e).__name__,
                         error_message=str(e),
-                        data_length=len(formatted_data),
+                        prompt_length=len(prompt),
                         analysis_type=analysis_type)
             raise AnalysisError(f"AI分析エラー: {e}")
     
     def _generate_context_insights(self, week_data: List[Dict[str, str]], context_data: List[Dict[str, str]],
-                                  analysis_type: str, language: str = "日本語") -> str:
+                                  analysis_type: str, language: str = "日本語",
+                                  on_text_delta: Callable[[str], None] = None) -> str:
         """コンテキスト付きAI分析を実行してインサイトを生成"""
         if not week_data and not context_data:
-            return "分析対象のデータがありません。指定期間にジャーナルエントリが見つかりませんでした。"
+            return self.NO_CONTEXT_DATA_INSIGHTS
         
-        # データをフォーマット
-        formatted_week_data = self._format_data_for_analysis(week_data)
-        formatted_context_data = self._format_data_for_analysis(context_data)
-        
-        logger.info("コンテキスト付きAI分析を実行", "ai", analysis_type=analysis_type, language=language)
-        # プロンプト作成
-        prompt = self._create_context_analysis_prompt(formatted_week_data, formatted_context_data, analysis_type, language)
-        # 単一メッセージとして送信
-        messages = [{"role": "user", "content": prompt}]
-
-        logger.debug(f"言語設定 @ analyser.py, _generate_context_insights", "ai", language=language)
+        messages = self._create_messages(week_data, context_data, analysis_type, language)
+        prompt = messages[0]["content"]
 
         # AI分析実行
         try:
             logger.start("AI APIリクエスト送信（コンテキスト付き）", "ai", 
-                        week_data_length=len(formatted_week_data),
-                        context_data_length=len(formatted_context_data), 
-                        max_tokens=50000, 
+                        week_count=len(week_data),
+                        context_count=len(context_data),
+                        prompt_length=len(prompt), 
+                        max_tokens=self.MAX_OUTPUT_TOKENS, 
                         message_count=len(messages))
             
-            resp = self._client.responses.create(
-                model="gpt-5-mini",
-                reasoning={"effort": "high"},
-                input=messages,
-                max_output_tokens=50000
-            )
-            
-            logger.success("AI APIレスポンス受信（コンテキスト付き）", "ai")
-            data_dict = resp.to_dict()
-            logger.debug("レスポンス構造解析", "ai", response_keys=list(data_dict.keys()))
-            
-            # 統一的なレスポンスパース処理を使用
-            insights = self._parse_api_response(data_dict)
+            insights = self._request_analysis(messages, analysis_type, on_text_delta)
             
             logger.complete("AI分析処理（コンテキスト付き）", "ai", result_length=len(insights))
             
@@ -295,11 +502,33 @@ class DocumentAnalyzer:
             logger.error("AI分析処理でエラーが発生（コンテキスト付き）", "ai",
                         error_type=type(e).__name__,
                         error_message=str(e),
-                        week_data_length=len(formatted_week_data),
-                        context_data_length=len(formatted_context_data),
+                        prompt_length=len(prompt),
                         analysis_type=analysis_type)
             raise AnalysisError(f"AI分析エラー: {e}")
     
+    def _create_messages(self, week_data: List[Dict[str, str]], context_data: Optional[List[Dict[str, str]]],
+                         analysis_type: str, language: str) -> List[Dict[str, str]]:
+        """AI APIに送信するメッセージを作成（context_dataがある場合はコンテキスト付き）"""
+        if context_data:
+            # データをフォーマット
+            formatted_week_data = self._format_data_for_analysis(week_data)
+            formatted_context_data = self._format_context_data(context_data, week_data)
+            
+            logger.info("コンテキスト付きAI分析を実行", "ai", analysis_type=analysis_type, language=language)
+            # プロンプト作成
+            prompt = self._create_context_analysis_prompt(formatted_week_data, formatted_context_data,
+                                                          analysis_type, language)
+        else:
+            # データをフォーマット
+            formatted_data = self._format_data_for_analysis(week_data)
+            
+            logger.info("AI分析を実行", "ai", analysis_type=analysis_type, language=language)
+            # プロンプト作成
+            prompt = self._create_analysis_prompt(formatted_data, analysis_type, language)
+        
+        # 単一メッセージとして送信
+        return [{"role": "user", "content": prompt}]
+    
     def _format_data_for_analysis(self, data: List[Dict[str, str]]) -> str:
         """分析用にデータをフォーマット"""
         if not data:
@@ -308,20 +537,32 @@ class DocumentAnalyzer:
         # タイトルを持つデータがあるかチェック
         has_titles = any("title" in item and item["title"] for item in data)
         
-        formatted_items = []
-        for item in data:
-            if has_titles:
-                # ドキュメント形式
-                title = item.get("title", "Untitled")
-                text = f"日付: {item['date']}\nタイトル: {title}\n内容: {item['text']}"
-            else:
-                # 日誌形式
-                text = f"{item['date']}: {item['text']}"
-            
-            formatted_items.append(text)
+        formatted_items = [self._format_entry(item, has_titles) for item in data]
         
         return "\n\n".join(formatted_items)
     
+    def _format_context_data(self, context_data: List[Dict[str, str]], week_data: List[Dict[str, str]]) -> str:
+        """コンテキスト期間のデータをフォーマット（直近7日間のエントリは重複させず日付で参照）"""
+        week_entries = [item for item in context_data if item in week_data]
+        formatted = self._format_data_for_analysis([item for item in context_data if item not in week_data])
+        if not week_entries:
+            return formatted
+        
+        week_dates = sorted(str(item.get("date", ""))[:10] for item in week_entries)
+        reference = (f"（{week_dates[0]}〜{week_dates[-1]}の{len(week_entries)}件は、"
+                     f"直近7日間の日誌として全文を掲載）")
+        return f"{formatted}\n\n{reference}" if formatted else reference
+    
+    def _format_entry(self, item: Dict[str, str], has_titles: bool) -> str:
+        """1エントリを分析用にフォーマット"""
+        if has_titles:
+            # ドキュメント形式
+            title = item.get("title", "Untitled")
+            return f"日付: {item['date']}\nタイトル: {title}\n内容: {item['text']}"
+        
+        # 日誌形式
+        return f"{item['date']}: {item['text']}"
+    
     def _create_analysis_prompt(self, formatted_data: str, analysis_type: str, language: str = "japanese") -> str:
         
         # 言語コードを自然言語名に変換
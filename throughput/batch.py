@@ -0,0 +1,153 @@
+"""OpenAI Batch APIによる一括分析"""
+import os
+import json
+import time
+from typing import Any, Dict
+from openai import OpenAI
+from dotenv import load_dotenv
+
+from utils import logger
+
+load_dotenv()
+
+
+class BatchAnalysisError(Exception):
+    """Batch API実行時のエラー"""
+    pass
+
+
+class BatchAnalysisClient:
+    """複数ユーザーのAI分析リクエストをOpenAI Batch APIでまとめて実行するクラス
+
+    責務:
+    - リクエストのJSONL作成とアップロード、バッチジョブの作成
+    - 完了までのポーリング
+    - 結果ファイル・エラーファイルからcustom_idごとの結果への対応付け
+
+    Batch APIは24時間以内の完了を条件に通常の半額で処理されるため、
+    即時性の不要な週次の一括配信に使う。
+    """
+
+    ENDPOINT = "/v1/responses"
+    COMPLETION_WINDOW = "24h"
+    # 完了確認の間隔（秒）
+    DEFAULT_POLL_INTERVAL = 30
+    # 完了を待つ最大秒数（COMPLETION_WINDOWと同じ）
+    DEFAULT_TIMEOUT = 24 * 60 * 60
+    TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+    def __init__(self, poll_interval: float = None, timeout: float = None):
+        """
+        Args:
+            poll_interval: 完了確認の間隔秒数（未指定時は環境変数PICKLES_BATCH_POLL_INTERVAL）
+            timeout: 完了を待つ最大秒数（未指定時は環境変数PICKLES_BATCH_TIMEOUT）
+        """
+        # テストモードの場合はモックを使用
+        if os.getenv('PICKLES_TEST_MODE') == '1':
+            from tests.fixtures.mock_handlers import mock_openai_api
+            self._client = mock_openai_api()(api_key=os.getenv("OPENAI_API_KEY"))
+        else:
+            self._client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+        self._poll_interval = float(poll_interval if poll_interval is not None
+                                    else os.getenv("PICKLES_BATCH_POLL_INTERVAL", self.DEFAULT_POLL_INTERVAL))
+        self._timeout = float(timeout if timeout is not None
+                              else os.getenv("PICKLES_BATCH_TIMEOUT", self.DEFAULT_TIMEOUT))
+
+    def run(self, request_bodies: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """リクエストをまとめて送信し、完了後にcustom_idごとの結果を返す
+
+        Args:
+            request_bodies: custom_idごとの/v1/responsesリクエストボディ
+
+        Returns:
+            custom_idごとの {"body": レスポンスボディ, "error": エラー内容}（成功時はerrorがNone）
+        """
+        batch = self._submit(request_bodies)
+        try:
+            batch = self._wait(batch.id)
+        except BaseException:
+            # タイムアウト・中断で結果を受け取らないジョブは、処理と課金が続かないよう取り消す
+            self._cancel(batch.id)
+            raise
+
+        if batch.status != "completed":
+            raise BatchAnalysisError(f"バッチ処理が完了しませんでした: status={batch.status}")
+
+        results = {}
+        if batch.output_file_id:
+            results.update(self._read_results(batch.output_file_id))
+        if batch.error_file_id:
+            results.update(self._read_results(batch.error_file_id))
+
+        # 結果ファイルに含まれないリクエストも失敗として扱う
+        for custom_id in request_bodies:
+            results.setdefault(custom_id, {"body": None, "error": "バッチ結果にリクエストが含まれていません"})
+
+        logger.complete("バッチ処理", "ai", batch_id=batch.id, requests=len(request_bodies),
+                        failed=sum(1 for result in results.values() if result["error"]))
+        return results
+
+    def _submit(self, request_bodies: Dict[str, Dict[str, Any]]):
+        """リクエストのJSONLをアップロードしてバッチジョブを作成"""
+        lines = [json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": self.ENDPOINT,
+            "body": body
+        }, ensure_ascii=False) for custom_id, body in request_bodies.items()]
+        content = ("\n".join(lines) + "\n").encode("utf-8")
+
+        logger.start("バッチ処理", "ai", requests=len(request_bodies), input_bytes=len(content))
+        input_file = self._client.files.create(file=("pickles_batch.jsonl", content), purpose="batch")
+        batch = self._client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.ENDPOINT,
+            completion_window=self.COMPLETION_WINDOW
+        )
+        logger.info("バッチジョブ作成", "ai", batch_id=batch.id, status=batch.status)
+        return batch
+
+    def _wait(self, batch_id: str):
+        """バッチジョブの完了（または失敗・期限切れ）を待つ"""
+        started_at = time.monotonic()
+        while True:
+            batch = self._client.batches.retrieve(batch_id)
+            if batch.status in self.TERMINAL_STATUSES:
+                return batch
+
+            elapsed = time.monotonic() - started_at
+            if elapsed > self._timeout:
+                raise BatchAnalysisError(f"バッチ処理の完了待ちがタイムアウトしました: batch_id={batch_id}")
+
+            counts = batch.request_counts
+            logger.info("バッチ処理待機中", "ai", status=batch.status, elapsed_seconds=int(elapsed),
+                        completed=counts.completed if counts else None,
+                        total=counts.total if counts else None)
+            time.sleep(self._poll_interval)
+
+    def _cancel(self, batch_id: str):
+        """バッチジョブを取り消す（失敗しても元の例外を優先するためログのみ）"""
+        try:
+            self._client.batches.cancel(batch_id)
+            logger.warning("バッチジョブを取り消し", "ai", batch_id=batch_id)
+        except Exception as e:
+            logger.error("バッチジョブの取り消しに失敗", "ai", batch_id=batch_id, error=str(e))
+
+    def _read_results(self, file_id: str) -> Dict[str, Dict[str, Any]]:
+        """結果ファイル（JSONL）を読み込み、custom_idごとのレスポンスボディまたはエラーに変換"""
+        results = {}
+        for line in self._client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            error = record.get("error")
+            if error is None and response.get("status_code") != 200:
+                error = response.get("body", {}).get("error") or f"status_code={response.get('status_code')}"
+
+            results[record["custom_id"]] = {
+                "body": response.get("body") if error is None else None,
+                "error": error
+            }
+        return results
@@ -63,7 +63,7 @@ class DomiPrompts:
 "【過去30日間の日誌】\n"
 "{month_data}\n\n"
 "-------------------------\n"
-"【直近7日間の日誌（上記に含まれる）】\n"
+"【直近7日間の日誌（過去30日間の一部）】\n"
 "{week_data}\n\n"
     )
     
@@ -0,0 +1,100 @@
+"""AI応答のキャッシュ"""
+import os
+import json
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from db.client import get_supabase_client
+from utils import logger, CacheStore
+
+
+class ResponseCache:
+    """プロンプト内容をキーにAI応答を保持するキャッシュ
+
+    責務:
+    - モデル・推論設定・プロンプト（メッセージ）・分析タイプのハッシュによる応答の保存と取得
+    - ローカルキャッシュ（TTL・エントリ数上限付き）と、任意のSupabaseキャッシュの2段構成
+
+    配信失敗後の再実行など、同じプロンプトを再送する場合にAPI呼び出しを省略する。
+    Supabaseキャッシュは環境変数PICKLES_RESPONSE_CACHE_SUPABASE=1で有効になり、
+    GitHub Actionsのように実行ごとにローカルキャッシュが消える環境でも再利用できる。
+    """
+
+    # 応答の既定有効期間（秒）
+    DEFAULT_TTL = 24 * 60 * 60
+    # ローカルに保持する最大応答数
+    MAX_ENTRIES = 200
+    SUPABASE_TABLE = "llm_response_cache"
+
+    def __init__(self, ttl: float = None):
+        """
+        Args:
+            ttl: 応答の有効秒数（未指定時は環境変数PICKLES_RESPONSE_CACHE_TTL、0でキャッシュしない）
+        """
+        self._ttl = float(ttl if ttl is not None else os.getenv("PICKLES_RESPONSE_CACHE_TTL", self.DEFAULT_TTL))
+        self._store = CacheStore("llm_responses", max_entries=self.MAX_ENTRIES)
+        self._use_supabase = os.getenv("PICKLES_RESPONSE_CACHE_SUPABASE") == "1"
+
+    @staticmethod
+    def make_key(model: str, reasoning: Dict[str, Any], messages: List[Dict[str, str]], analysis_type: str) -> str:
+        """応答を特定するキーを生成（プロンプトが1文字でも異なれば別のキー）"""
+        payload = json.dumps({
+            "model": model,
+            "reasoning": reasoning,
+            "messages": messages,
+            "analysis_type": analysis_type
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """有効期間内の応答を取得（{"text": str, "latency": float}、存在しない場合はNone）"""
+        if self._ttl <= 0:
+            return None
+
+        cached = self._store.get(key, max_age=self._ttl)
+        if cached is None and self._use_supabase:
+            cached = self._get_from_supabase(key)
+            if cached is not None:
+                self._store.set(key, cached)
+        return cached
+
+    def set(self, key: str, text: str, latency: float, model: str, analysis_type: str):
+        """応答と生成にかかった秒数を保存"""
+        if self._ttl <= 0:
+            return
+
+        self._store.set(key, {"text": text, "latency": latency})
+        if self._use_supabase:
+            self._set_to_supabase(key, text, latency, model, analysis_type)
+
+    def _get_from_supabase(self, key: str) -> Optional[Dict[str, Any]]:
+        """Supabaseから有効期間内の応答を取得（失敗時はキャッシュなしとして扱う）"""
+        try:
+            expires_before = datetime.now(timezone.utc) - timedelta(seconds=self._ttl)
+            result = get_supabase_client().table(self.SUPABASE_TABLE) \
+                .select("response, latency_seconds") \
+                .eq("key", key) \
+                .gte("created_at", expires_before.isoformat()) \
+                .limit(1) \
+                .execute()
+            if not result.data:
+                return None
+            row = result.data[0]
+            return {"text": row["response"], "latency": row["latency_seconds"]}
+        except Exception as e:
+            logger.warning("Supabase応答キャッシュ読み込み失敗", "ai", error=str(e))
+            return None
+
+    def _set_to_supabase(self, key: str, text: str, latency: float, model: str, analysis_type: str):
+        """Supabaseに応答を保存（失敗しても処理は継続）"""
+        try:
+            get_supabase_client().table(self.SUPABASE_TABLE).upsert({
+                "key": key,
+                "model": model,
+                "analysis_type": analysis_type,
+                "response": text,
+                "latency_seconds": latency,
+                "created_at": datetime.now(timezone.utc).isoformat()
+            }).execute()
+        except Exception as e:
+            logger.warning("Supabase応答キャッシュ書き込み失敗", "ai", error=str(e))
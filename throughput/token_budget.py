@@ -0,0 +1,116 @@
+"""入力トークン数の見積もりと予算内への調整"""
+import os
+import math
+from functools import lru_cache
+from typing import List, Optional
+from utils import logger
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+@lru_cache(maxsize=1)
+def _load_encoding():
+    """トークナイザーを読み込み（読み込み失敗時はNone）"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(TokenBudget.ENCODING_NAME)
+    except Exception as e:
+        logger.warning("トークナイザー読み込み失敗（概算で見積もり）", "ai", error=str(e))
+        return None
+
+
+class TokenBudget:
+    """プロンプトの入力トークン数を見積もり、コンテキスト期間のエントリを予算内に収める
+
+    tiktokenのトークナイザーで数える。エンコーディングを読み込めない場合（オフライン環境など）のみ
+    文字種ごとの概算を使う。概算は日本語（非ASCII）1文字を1トークン、ASCII 4文字を1トークンとして多めに見積もる。
+    """
+
+    # 入力トークン数の既定予算（出力・推論トークンの余地を残す）
+    DEFAULT_INPUT_TOKEN_BUDGET = 100_000
+    # gpt-5系モデルのトークナイザー
+    ENCODING_NAME = "o200k_base"
+    # 予算超過時、1エントリあたりに残す最大トークン数
+    MAX_ENTRY_TOKENS = 2_000
+    # 予算超過時、新しい順にそのまま残すエントリに割り当てる予算の割合（残りは古いエントリから間引いて選ぶ）
+    RECENT_SHARE = 0.5
+    TRUNCATION_MARK = "…（以下省略）"
+
+    def __init__(self, budget: int = None):
+        """
+        Args:
+            budget: 入力トークン数の予算（未指定時は環境変数PICKLES_INPUT_TOKEN_BUDGET）
+        """
+        self.budget = int(budget or os.getenv("PICKLES_INPUT_TOKEN_BUDGET", self.DEFAULT_INPUT_TOKEN_BUDGET))
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """テキストのトークン数を見積もり"""
+        if not text:
+            return 0
+
+        encoding = _load_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+
+        ascii_chars = sum(1 for char in text if char.isascii())
+        return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """テキストを最大トークン数以内に切り詰め（先頭を残す）"""
+        tokens = self.estimate_tokens(text)
+        if tokens <= max_tokens:
+            return text
+
+        # トークン数に比例して文字数を減らし、収まるまで縮める
+        length = int(len(text) * max_tokens / tokens)
+        while length > 0 and self.estimate_tokens(text[:length] + self.TRUNCATION_MARK) > max_tokens:
+            length = int(length * 0.9)
+        return text[:length] + self.TRUNCATION_MARK
+
+    def select_entries(self, entry_tokens: List[int], available: int,
+                       protected: Optional[List[bool]] = None) -> List[int]:
+        """予算内に収まるエントリを選択（古い順に並んだエントリのインデックスを返す）
+
+        保護されたエントリ（直近7日間）は必ず残す。残りの予算の一部を新しいエントリに順に割り当て、
+        残りはそれより古いエントリから等間隔に間引いて選び、期間全体の流れが残るようにする。
+
+        Args:
+            entry_tokens: 古い順に並んだエントリごとのトークン数
+            available: エントリに使えるトークン数
+            protected: 必ず残すエントリかどうか
+        """
+        protected = protected or [False] * len(entry_tokens)
+        selected = {i for i, keep in enumerate(protected) if keep}
+        remaining = available - sum(entry_tokens[i] for i in selected)
+        candidates = [i for i in range(len(entry_tokens)) if i not in selected]
+
+        if sum(entry_tokens[i] for i in candidates) <= remaining:
+            return list(range(len(entry_tokens)))
+
+        # 新しい順に、予算の一定割合までそのまま残す
+        recent_budget = max(remaining, 0) * self.RECENT_SHARE
+        older = []
+        for i in reversed(candidates):
+            if not older and entry_tokens[i] <= recent_budget:
+                selected.add(i)
+                recent_budget -= entry_tokens[i]
+                remaining -= entry_tokens[i]
+            else:
+                older.append(i)
+        older.reverse()
+
+        # それより古いエントリは、残りの予算に収まる間隔で間引いて選ぶ
+        older_tokens = sum(entry_tokens[i] for i in older)
+        if older and remaining > 0:
+            stride = max(1, math.ceil(older_tokens / remaining))
+            for i in older[::-1][::stride]:
+                if entry_tokens[i] <= remaining:
+                    selected.add(i)
+                    remaining -= entry_tokens[i]
+
+        return sorted(selected)
@@ -7,5 +7,8 @@ Utils パッケージ - 共通ユーティリティ
 from .logger import Logger, logger
 from .printer import UsagePrinter, CommandArgs, DataSources, AnalysisTypes, DeliveryMethods
 from .google_service import GoogleAPIService, GoogleAPIError, get_google_service
+from .cache_store import CacheStore, fingerprint
+from .credential_cache import CredentialCache
+from .rate_limiter import TokenBucket
 
-__all__ = ["Logger", "logger", "UsagePrinter", "CommandArgs", "DataSources", "AnalysisTypes", "DeliveryMethods", "GoogleAPIService", "GoogleAPIError", "get_google_service"] 
\ No newline at end of file
+__all__ = ["Logger", "logger", "UsagePrinter", "CommandArgs", "DataSources", "AnalysisTypes", "DeliveryMethods", "GoogleAPIService", "GoogleAPIError", "get_google_service", "CacheStore", "CredentialCache", "fingerprint", "TokenBucket"] 
\ No newline at end of file
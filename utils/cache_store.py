@@ -0,0 +1,157 @@
+"""SQLiteによるローカル永続キャッシュ"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import closing, contextmanager
+from typing import Any, Iterator, Optional
+from utils.logger import logger
+
+
+def fingerprint(secret: str) -> str:
+    """APIキーなどの秘密情報からキャッシュ用の識別子を生成（元の値は復元不可）"""
+    return hashlib.sha256((secret or "").encode("utf-8")).hexdigest()[:16]
+
+
+class CacheStore:
+    """名前空間ごとにエントリ数上限付きで値を保持するキャッシュ
+
+    責務:
+    - JSONシリアライズ可能な値の永続化
+    - 上限超過時の最終アクセスが古い順の追い出し
+
+    並列ワーカーや複数プロセスから同時に使えるよう、操作ごとに接続を開く。
+    キャッシュの読み書きに失敗しても処理は継続し、キャッシュなしとして振る舞う。
+    """
+
+    DEFAULT_CACHE_DIR = ".cache"
+    DB_FILENAME = "pickles_cache.sqlite3"
+    # 最終アクセス日時を更新する最小間隔（秒）。読み込みのたびに書き込みロックを取らないため
+    ACCESS_UPDATE_INTERVAL = 60
+
+    def __init__(self, namespace: str, max_entries: int = 1000, cache_dir: str = None):
+        """
+        Args:
+            namespace: キャッシュの名前空間（用途・ユーザーごとに分ける）
+            max_entries: 名前空間あたりの最大エントリ数
+            cache_dir: 保存先ディレクトリ（未指定時は環境変数PICKLES_CACHE_DIR）
+        """
+        self._namespace = namespace
+        self._max_entries = max_entries
+        self._enabled = os.getenv("PICKLES_CACHE_DISABLED") != "1"
+
+        cache_dir = cache_dir or os.getenv("PICKLES_CACHE_DIR", self.DEFAULT_CACHE_DIR)
+        self._db_path = os.path.join(cache_dir, self.DB_FILENAME)
+
+        if self._enabled:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                self._init_schema()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("キャッシュ初期化失敗（キャッシュなしで継続）", "db", error=str(e))
+                self._enabled = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """接続を開き、トランザクションを確定（例外時はロールバック）してから閉じる"""
+        with closing(sqlite3.connect(self._db_path, timeout=30)) as conn, conn:
+            yield conn
+
+    def _init_schema(self):
+        """キャッシュテーブルを作成"""
+        with self._connect() as conn:
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("""
+                create table if not exists cache_entries (
+                    namespace text not null,
+                    key text not null,
+                    value text not null,
+                    created_at real not null,
+                    accessed_at real not null,
+                    primary key (namespace, key)
+                )
+            """)
+            conn.execute("""
+                create index if not exists idx_cache_entries_accessed
+                on cache_entries(namespace, accessed_at)
+            """)
+
+    def get(self, key: str, max_age: float = None) -> Optional[Any]:
+        """キャッシュから値を取得（存在しない場合はNone）
+
+        Args:
+            key: キャッシュキー
+            max_age: 保存からの有効秒数（超過したエントリは存在しないものとして扱う）
+        """
+        if not self._enabled:
+            return None
+
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "select value, created_at, accessed_at from cache_entries where namespace = ? and key = ?",
+                    (self._namespace, key)
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                if max_age is not None and now - row[1] > max_age:
+                    return None
+
+                if now - row[2] >= self.ACCESS_UPDATE_INTERVAL:
+                    conn.execute(
+                        "update cache_entries set accessed_at = ? where namespace = ? and key = ?",
+                        (now, self._namespace, key)
+                    )
+                return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning("キャッシュ読み込み失敗", "db", namespace=self._namespace, error=str(e))
+            return None
+
+    def set(self, key: str, value: Any):
+        """キャッシュに値を保存し、上限を超えた分を追い出す"""
+        if not self._enabled:
+            return
+
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "insert or replace into cache_entries "
+                    "(namespace, key, value, created_at, accessed_at) values (?, ?, ?, ?, ?)",
+                    (self._namespace, key, json.dumps(value, ensure_ascii=False), now, now)
+                )
+                self._evict(conn)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning("キャッシュ書き込み失敗", "db", namespace=self._namespace, error=str(e))
+
+    def delete(self, key: str):
+        """キャッシュから値を削除"""
+        if not self._enabled:
+            return
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "delete from cache_entries where namespace = ? and key = ?",
+                    (self._namespace, key)
+                )
+        except sqlite3.Error as e:
+            logger.warning("キャッシュ削除失敗", "db", namespace=self._namespace, error=str(e))
+
+    def _evict(self, conn: sqlite3.Connection):
+        """最終アクセスが古いエントリから上限を超えた分を削除"""
+        conn.execute("""
+            delete from cache_entries
+            where namespace = ? and key not in (
+                select key from cache_entries
+                where namespace = ?
+                order by accessed_at desc
+                limit ?
+            )
+        """, (self._namespace, self._namespace, self._max_entries))
@@ -0,0 +1,46 @@
+"""認証情報の検証結果キャッシュ"""
+import os
+from typing import Any, Dict, Optional
+from utils.cache_store import CacheStore, fingerprint
+
+
+class CredentialCache:
+    """外部APIの認証情報ごとの検証結果をTTL付きで保持するキャッシュ
+
+    接続確認専用のリクエストは送らず、実際のAPI呼び出しの成否を記録する。
+    失敗を記録した認証情報は、TTLが切れるまでAPIを呼ばずにエラーとして扱える。
+    キーには認証情報のフィンガープリントを使い、認証情報そのものは保存しない。
+    """
+
+    # 検証結果の既定有効期間（秒）
+    DEFAULT_TTL = 6 * 60 * 60
+
+    def __init__(self, service: str, ttl: float = None):
+        """
+        Args:
+            service: サービス名（notion, gdocsなど）
+            ttl: 検証結果の有効秒数（未指定時は環境変数PICKLES_CREDENTIAL_TTL、0でキャッシュしない）
+        """
+        self._service = service
+        self._ttl = float(ttl if ttl is not None else os.getenv("PICKLES_CREDENTIAL_TTL", self.DEFAULT_TTL))
+        self._store = CacheStore("credentials")
+
+    def get(self, credential: str, scope: str = "") -> Optional[Dict[str, Any]]:
+        """有効期間内の検証結果を取得（{"valid": bool, "error": str}、未検証の場合はNone）"""
+        if self._ttl <= 0:
+            return None
+        return self._store.get(self._key(credential, scope), max_age=self._ttl)
+
+    def mark_valid(self, credential: str, scope: str = ""):
+        """認証情報が有効だったことを記録"""
+        if self._ttl > 0:
+            self._store.set(self._key(credential, scope), {"valid": True, "error": None})
+
+    def mark_invalid(self, credential: str, error: str, scope: str = ""):
+        """認証情報が無効だったことを記録"""
+        if self._ttl > 0:
+            self._store.set(self._key(credential, scope), {"valid": False, "error": error})
+
+    def _key(self, credential: str, scope: str) -> str:
+        key = f"{self._service}:{fingerprint(credential)}"
+        return f"{key}:{scope}" if scope else key
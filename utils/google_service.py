@@ -1,10 +1,15 @@
 import os
-from typing import Optional
+import json
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
 from google.auth import default
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
 from utils import logger
+from utils.cache_store import fingerprint
 
 
 class GoogleAPIError(Exception):
@@ -12,15 +17,33 @@ class GoogleAPIError(Exception):
     pass
 
 
+@lru_cache(maxsize=None)
+def _load_discovery_document(api: str, version: str) -> Optional[str]:
+    """同梱のディスカバリードキュメント（JSON文字列）を読み込み（プロセス内で共有）
+    
+    build_from_documentは渡された辞書を書き換えるため、パース済みの辞書ではなく文字列を共有し、
+    サービスの構築ごとにパースさせる。
+    """
+    return get_static_doc(api, version)
+
+
 class GoogleAPIService:
-    """統一されたGoogle APIサービスクラス"""
+    """統一されたGoogle APIサービスクラス
+    
+    認証情報（アクセストークン）はインスタンス内のスレッド間で共有し、
+    スレッドセーフでないgoogleapiclientのサービスオブジェクトはスレッドごとに構築する。
+    """
     
     # 必要なスコープをすべて定義
     SCOPES = [
         'https://www.googleapis.com/auth/spreadsheets.readonly',  # Google Sheets読み取り
-        'https://www.googleapis.com/auth/documents.readonly'      # Google Docs読み取り
+        'https://www.googleapis.com/auth/documents.readonly',     # Google Docs読み取り
+        'https://www.googleapis.com/auth/drive.readonly'          # Google Docsのテキストエクスポート
     ]
     
+    # バッチリクエスト1回あたりの最大呼び出し数（Google APIの上限は100）
+    BATCH_MAX_REQUESTS = 50
+    
     def __init__(self, service_account_key: str = None):
         """
         Args:
@@ -37,22 +60,26 @@ class GoogleAPIService:
         else:
             logger.warning("Google API認証が設定されていません（GOOGLE_SERVICE_ACCOUNT_KEYを設定してください）", "google")
         
+        # サービスオブジェクトはスレッドごとに保持
+        self._local = threading.local()
+        
         # テストモードの場合はモックを使用
         if os.getenv('PICKLES_TEST_MODE') == '1':
             from tests.fixtures.mock_handlers import mock_google_api
-            mock_service = mock_google_api()
-            self._sheets_service = mock_service()
-            self._docs_service = mock_service()
+            self._mock_service = mock_google_api()
         else:
-            self._credentials = self._build_credentials()
-            self._sheets_service = None
-            self._docs_service = None
+            self._mock_service = None
+            self._credentials = self._synchronize_token_refresh(self._build_credentials())
         
         self._check_api_connection()
     
+    @property
+    def credential_fingerprint(self) -> str:
+        """キャッシュキー用の認証情報識別子（キーそのものは含まない）"""
+        return fingerprint(self._service_account_json or "default")
+    
     def _build_credentials(self):
         """Google API認証を構築（JSON文字列形式）"""
-        import json
         try:
             if self._service_account_json:
                 # Service Account JSON文字列から認証
@@ -77,6 +104,45 @@ class GoogleAPIService:
             logger.error("Google API認証構築失敗", "google", error=str(e))
             raise GoogleAPIError(f"Google API認証エラー: {e}")
     
+    @staticmethod
+    def _synchronize_token_refresh(credentials):
+        """トークン更新を直列化し、待機中に他のスレッドが更新したトークンを再利用する"""
+        refresh = credentials.refresh
+        lock = threading.Lock()
+        
+        def synchronized_refresh(request):
+            stale_token = credentials.token
+            with lock:
+                if credentials.token != stale_token and credentials.valid:
+                    return
+                refresh(request)
+        
+        credentials.refresh = synchronized_refresh
+        return credentials
+    
+    def _get_service(self, api: str, version: str, label: str):
+        """現在のスレッド用のサービスオブジェクトを取得（未構築なら構築）"""
+        service = getattr(self._local, api, None)
+        if service is not None:
+            return service
+        
+        if self._mock_service is not None:
+            service = self._mock_service()
+        else:
+            try:
+                # ディスカバリードキュメントは共有し、HTTP接続はサービスごとに作成
+                document = _load_discovery_document(api, version)
+                if document:
+                    service = build_from_document(document, credentials=self._credentials)
+                else:
+                    service = build(api, version, credentials=self._credentials)
+            except Exception as e:
+                logger.error(f"{label} APIサービス構築失敗", "google", error=str(e))
+                raise GoogleAPIError(f"{label} API構築エラー: {e}")
+        
+        setattr(self._local, api, service)
+        return service
+    
     def _check_api_connection(self):
         """Google API接続を確認"""
         try:
@@ -92,25 +158,72 @@ class GoogleAPIService:
     
     def get_sheets_service(self):
         """Google Sheets APIサービスを取得"""
-        if self._sheets_service is None:
-            try:
-                self._sheets_service = build('sheets', 'v4', credentials=self._credentials)
-            except Exception as e:
-                logger.error("Google Sheets APIサービス構築失敗", "google", error=str(e))
-                raise GoogleAPIError(f"Google Sheets API構築エラー: {e}")
-        
-        return self._sheets_service
+        return self._get_service('sheets', 'v4', "Google Sheets")
     
     def get_docs_service(self):
         """Google Docs APIサービスを取得"""
-        if self._docs_service is None:
+        return self._get_service('docs', 'v1', "Google Docs")
+    
+    def get_drive_service(self):
+        """Google Drive APIサービスを取得"""
+        return self._get_service('drive', 'v3', "Google Drive")
+    
+    def batch_get_documents(self, document_ids: List[str], **params) -> Dict[str, Dict[str, Any]]:
+        """複数のGoogle Docsをバッチリクエストでまとめて取得
+        
+        Args:
+            document_ids: ドキュメントIDのリスト
+            **params: documents().getに渡すパラメータ（fieldsなど）
+        
+        Returns:
+            ドキュメントIDごとの {"document": 取得結果, "error": 例外}（成功時はerrorがNone、失敗時はdocumentがNone）
+        """
+        service = self.get_docs_service()
+        return self._batch_get(service, document_ids, "document", "Google Docs",
+                               lambda document_id: service.documents().get(documentId=document_id, **params))
+    
+    def batch_get_files(self, file_ids: List[str], **params) -> Dict[str, Dict[str, Any]]:
+        """複数のファイル情報をDrive APIのバッチリクエストでまとめて取得
+        
+        Args:
+            file_ids: ファイルIDのリスト
+            **params: files().getに渡すパラメータ（fieldsなど）
+        
+        Returns:
+            ファイルIDごとの {"file": 取得結果, "error": 例外}（成功時はerrorがNone、失敗時はfileがNone）
+        """
+        service = self.get_drive_service()
+        return self._batch_get(service, file_ids, "file", "Google Drive",
+                               lambda file_id: service.files().get(fileId=file_id, **params))
+    
+    def _batch_get(self, service, ids: List[str], result_key: str, label: str,
+                   build_request: Callable[[str], Any]) -> Dict[str, Dict[str, Any]]:
+        """IDごとのリクエストをバッチリクエストでまとめて実行し、IDごとの結果と例外を返す"""
+        unique_ids = list(dict.fromkeys(ids))
+        results = {}
+        
+        def record(request_id, response, exception):
+            results[unique_ids[int(request_id)]] = {result_key: response if exception is None else None,
+                                                    "error": exception}
+        
+        for start in range(0, len(unique_ids), self.BATCH_MAX_REQUESTS):
+            chunk = range(start, min(start + self.BATCH_MAX_REQUESTS, len(unique_ids)))
+            batch = service.new_batch_http_request(callback=record)
+            for index in chunk:
+                batch.add(build_request(unique_ids[index]), request_id=str(index))
+            
             try:
-                self._docs_service = build('docs', 'v1', credentials=self._credentials)
+                batch.execute()
             except Exception as e:
-                logger.error("Google Docs APIサービス構築失敗", "google", error=str(e))
-                raise GoogleAPIError(f"Google Docs API構築エラー: {e}")
+                # バッチ全体が失敗した場合は未記録の呼び出しすべてにエラーを設定
+                logger.warning(f"{label}バッチ取得失敗", "google", error=str(e), requests=len(chunk))
+                for index in chunk:
+                    results.setdefault(unique_ids[index], {result_key: None, "error": e})
         
-        return self._docs_service
+        logger.info(f"{label}バッチ取得完了", "google", requests=len(unique_ids),
+                   round_trips=-(-len(unique_ids) // self.BATCH_MAX_REQUESTS),
+                   errors=sum(1 for result in results.values() if result["error"] is not None))
+        return results
     
     def test_sheets_access(self, spreadsheet_id: str) -> bool:
         """Google Sheetsへのアクセスをテスト"""
@@ -151,21 +264,22 @@ class GoogleAPIService:
             return False
 
 
-# シングルトンインスタンス（オプション）
-_google_service_instance: Optional[GoogleAPIService] = None
+# 認証情報のフィンガープリントごとのインスタンス
+_google_services: Dict[str, GoogleAPIService] = {}
+_google_services_lock = threading.Lock()
 
 
 def get_google_service(service_account_key: str = None) -> GoogleAPIService:
-    """統一されたGoogle APIサービスインスタンスを取得"""
-    global _google_service_instance
-    
-    if _google_service_instance is None:
-        _google_service_instance = GoogleAPIService(service_account_key)
+    """認証情報ごとのGoogle APIサービスインスタンスを取得（スレッドセーフ）"""
+    key = fingerprint(service_account_key or os.getenv("GOOGLE_SERVICE_ACCOUNT_KEY") or "default")
     
-    return _google_service_instance
+    with _google_services_lock:
+        if key not in _google_services:
+            _google_services[key] = GoogleAPIService(service_account_key)
+        return _google_services[key]
 
 
 def reset_google_service():
     """Google APIサービスインスタンスをリセット（主にテスト用）"""
-    global _google_service_instance
-    _google_service_instance = None
\ No newline at end of file
+    with _google_services_lock:
+        _google_services.clear()
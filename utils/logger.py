@@ -1,4 +1,5 @@
 import json
+import threading
 from datetime import datetime
 from typing import Dict, Any, Optional
 
@@ -37,6 +38,8 @@ class Logger:
             json_output: Trueならログを構造化JSON形式でも出力
         """
         self.json_output = json_output
+        # 並列取得時に複数スレッドの出力行が混ざらないようにする
+        self._lock = threading.Lock()
     
     def _log(self, level: str, category: str, message: str, extra_data: Dict[str, Any]):
         """内部ログメソッド"""
@@ -51,10 +54,6 @@ class Logger:
             **extra_data
         }
         
-        # JSON出力（分析用）
-        if self.json_output:
-            print(json.dumps(log_data, ensure_ascii=False))
-        
         # 人間が読みやすい出力
         level_text = self.LEVEL_TEXTS.get(level, "INFO")
         category_emoji = self.CATEGORY_EMOJIS.get(category, "📋")
@@ -67,7 +66,11 @@ class Logger:
             details = ", ".join(f"{k}={v}" for k, v in extra_data.items())
             human_readable += f" ({details})"
         
-        print(human_readable)
+        with self._lock:
+            # JSON出力（分析用）
+            if self.json_output:
+                print(json.dumps(log_data, ensure_ascii=False))
+            print(human_readable)
     
     # === 基本ログメソッド ===
     def debug(self, message: str, category: str = "system", **kwargs):
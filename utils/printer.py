@@ -11,7 +11,9 @@ CommandArgs = SimpleNamespace(
     EMAIL_TO="--email-to",
     NOTION_API_KEY="--notion-api-key",
     GDOCS_URL="--gdocs-url",
-    LANGUAGE="--language"
+    LANGUAGE="--language",
+    NO_CACHE="--no-cache",
+    REFRESH_NOTION_DATABASES="--refresh-notion-databases"
 )
 
 DataSources = SimpleNamespace(
@@ -68,6 +70,9 @@ class UsagePrinter:
                                     • japanese
                                     • english
   
+  {CommandArgs.NO_CACHE}                キャッシュ済みのAI応答を使わず再生成
+  {CommandArgs.REFRESH_NOTION_DATABASES}  キャッシュ済みのNotionデータベース選択を破棄して再検索
+  
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 🎯 指定実行設定
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -0,0 +1,51 @@
+"""トークンバケット方式のレート制限"""
+import time
+import threading
+
+
+class TokenBucket:
+    """複数スレッドで共有できるトークンバケット
+
+    rate件/秒でトークンを補充し、capacity件までのバーストを許可する。
+    サーバーから待機を指示された場合はpause()で全スレッドの取得を止める。
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self._rate = rate
+        self._capacity = capacity or rate
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """トークンを1つ取得（取得できるまで待機）し、待機した秒数を返す"""
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = max(self._paused_until - now, 0.0)
+
+                if wait == 0.0 and self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                if wait == 0.0:
+                    wait = (1 - self._tokens) / self._rate
+
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float):
+        """指定秒数のあいだトークンの払い出しを停止"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def _refill(self, now: float):
+        """経過時間に応じてトークンを補充"""
+        elapsed = now - self._updated_at
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        self._updated_at = now